@@ -1,10 +1,22 @@
 import os
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv, find_dotenv
 import uuid as uuid_lib
 
+from apps.app.config import settings
+from apps.app.core.generation_repository import get_generation_repository
+from apps.app.core.markdown_versions import (
+    MarkdownVersionError,
+    decode_stored,
+    encode_for_storage,
+    mark_checkpoint,
+    snapshot_key,
+    split_checkpoint,
+    stored_matches,
+)
+
 load_dotenv(find_dotenv(), override=True)
 logger = logging.getLogger(__name__)
 
@@ -224,34 +236,115 @@ def create_regeneration_row(
         logger.exception(f"create_regeneration_row failed for uuid={uuid}, gen_id={new_gen_id}")
         return False
 
-def save_generated_markdown(uuid: str, gen_id: str, markdown: str) -> bool:
-    """Save or overwrite markdown for a (uuid, gen_id)."""
+def save_generated_markdown(
+    uuid: str,
+    gen_id: str,
+    markdown: str,
+    base_gen_id: Optional[str] = None,
+    complete: bool = True,
+) -> bool:
+    """
+    Save or overwrite markdown for a (uuid, gen_id). With base_gen_id (the version
+    it was regenerated from) it may be stored as a delta against an immutable
+    snapshot, see core/markdown_versions. complete=False stores a mid-stream
+    checkpoint (marked inside the value), so a restore never passes it off as
+    a finished proposal.
+    """
     try:
+        if complete:
+            stored = encode_for_storage(
+                markdown,
+                gen_id,
+                base_gen_id,
+                lambda other_gen_id: _load_stored_markdown(uuid, other_gen_id),
+                lambda sha: _load_markdown_snapshot(uuid, sha),
+                lambda sha, text: _save_markdown_snapshot(uuid, sha, text),
+            )
+        else:
+            stored = mark_checkpoint(markdown)
         supabase.table(WORD_GEN_TABLE).update(
-            {"generated_markdown": markdown}
+            {"generated_markdown": stored}
         ).eq("uuid", uuid).eq("gen_id", gen_id).execute()
         logger.info(f"Saved markdown for uuid={uuid}, gen_id={gen_id}")
         return True
     except Exception:
         logger.exception(f"save_generated_markdown failed for uuid={uuid}, gen_id={gen_id}")
         return False
+    finally:
+        # Even a failed update may have reached the row; never serve the old markdown
+        get_generation_repository().invalidate_markdown(uuid, gen_id)
 
 
 def get_markdown_content(uuid: str, gen_id: str) -> Optional[str]:
-    """Fetch markdown for a specific (uuid, gen_id)."""
+    """Fetch markdown for a specific (uuid, gen_id) (through the generation repository cache)."""
+    return get_generation_repository().get_markdown(
+        uuid, gen_id, lambda: _load_markdown_content(uuid, gen_id)
+    )
+
+
+def get_markdown_checkpoint(uuid: str, gen_id: str) -> Optional[Tuple[str, bool]]:
+    """
+    (markdown, complete) as last saved for a (uuid, gen_id), read past the cache;
+    None if there is none. Values without the checkpoint marker count as complete.
+    """
     try:
-        res = (
-            supabase.table(WORD_GEN_TABLE)
-            .select("generated_markdown")
-            .eq("uuid", uuid)
-            .eq("gen_id", gen_id)
-            .maybe_single()
-            .execute()
-        )
-        if not res.data:
+        stored, complete = split_checkpoint(_load_stored_markdown(uuid, gen_id))
+        if not stored:
+            return None
+        markdown = decode_stored(stored, lambda sha: _load_markdown_snapshot(uuid, sha))
+        if not markdown:
+            return None
+        return markdown, complete
+    except Exception:
+        logger.exception(f"get_markdown_checkpoint failed for uuid={uuid}, gen_id={gen_id}")
+        return None
+
+
+def _load_stored_markdown(uuid: str, gen_id: str) -> Optional[str]:
+    """Internal: raw generated_markdown column (plain or delta-encoded); None if no row."""
+    res = (
+        supabase.table(WORD_GEN_TABLE)
+        .select("generated_markdown")
+        .eq("uuid", uuid)
+        .eq("gen_id", gen_id)
+        .maybe_single()
+        .execute()
+    )
+    if not res or not res.data:
+        return None
+    return res.data.get("generated_markdown") or ""
+
+
+def _load_markdown_snapshot(uuid: str, sha: str) -> Optional[str]:
+    """Internal: snapshot a delta-encoded version is built on; None if it cannot be read."""
+    try:
+        data = supabase.storage.from_(WORD_BUCKET).download(snapshot_key(uuid, sha))
+    except Exception:
+        logger.exception(f"Markdown snapshot download failed for uuid={uuid}, sha={sha}")
+        return None
+    return data.decode("utf-8") if data is not None else None
+
+
+def _save_markdown_snapshot(uuid: str, sha: str, markdown: str) -> None:
+    """Internal: write a content-addressed markdown snapshot (same key always holds same text)."""
+    supabase.storage.from_(WORD_BUCKET).upload(
+        snapshot_key(uuid, sha),
+        markdown.encode("utf-8"),
+        {"content-type": "text/markdown; charset=utf-8", "x-upsert": "true"},
+    )
+
+
+def _load_markdown_content(uuid: str, gen_id: str) -> Optional[str]:
+    """Internal: word_gen round-trip for get_markdown_content (delta versions reconstructed)."""
+    try:
+        stored = _load_stored_markdown(uuid, gen_id)
+        if stored is None:
             logger.warning(f"No markdown found for uuid={uuid}, gen_id={gen_id}")
             return None
-        return res.data.get("generated_markdown") or ""
+        return decode_stored(stored, lambda sha: _load_markdown_snapshot(uuid, sha))
+    except MarkdownVersionError:
+        logger.exception(f"Cannot reconstruct markdown for uuid={uuid}, gen_id={gen_id}")
+        return None
     except Exception:
         logger.exception(f"get_markdown_content failed for uuid={uuid}, gen_id={gen_id}")
         return None
@@ -268,6 +361,34 @@ def get_generated_markdown(uuid: str, gen_id: Optional[str] = None) -> Optional[
         logger.exception(f"get_generated_markdown failed for uuid={uuid}, gen_id={gen_id}")
         return None
 
+def _stored_markdown_is(uuid: str, gen_id: str, markdown: str) -> bool:
+    """
+    Internal: whether the row already holds this markdown, so a Word upload does not
+    rewrite the column (and replace a delta-encoded version with the full text).
+    """
+    if not settings.MARKDOWN_DELTA_ENABLED:
+        return False
+    try:
+        return stored_matches(_load_stored_markdown(uuid, gen_id), markdown)
+    except Exception:
+        logger.warning(f"Could not compare stored markdown for uuid={uuid}, gen_id={gen_id}")
+        return False
+
+
+def get_word_object_md5(uuid: str, gen_id: str, filename: str) -> Optional[str]:
+    """MD5 of a generation's Word object as storage reports it (eTag); None if missing or unreadable."""
+    try:
+        objects = supabase.storage.from_(WORD_BUCKET).list(f"{uuid}/{gen_id}", {"search": filename})
+    except Exception:
+        logger.exception(f"Listing Word objects failed for uuid={uuid}, gen_id={gen_id}")
+        return None
+    for obj in objects or []:
+        if obj.get("name") == filename:
+            etag = (obj.get("metadata") or {}).get("eTag")
+            return etag.strip('"') if etag else None
+    return None
+
+
 def upload_word_and_update_table(
     uuid: str,
     gen_id: str,
@@ -298,7 +419,7 @@ def upload_word_and_update_table(
         logger.info(f"Uploaded Word: {word_url}")
 
         payload = {"proposal": word_url}
-        if generated_markdown is not None:
+        if generated_markdown is not None and not _stored_markdown_is(uuid, gen_id, generated_markdown):
             payload["generated_markdown"] = generated_markdown
         if general_preference is not None:
             payload["general_preference"] = general_preference
@@ -309,3 +430,5 @@ def upload_word_and_update_table(
     except Exception:
         logger.exception(f"upload_word_and_update_table failed for uuid={uuid}, gen_id={gen_id}")
         return None
+    finally:
+        get_generation_repository().invalidate_markdown(uuid, gen_id)
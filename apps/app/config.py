@@ -30,12 +30,82 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_BUCKET: str = "proposal-ppts"
+    # "stub" swaps the PPT path's Supabase backend for an in-memory one (local runs/tests)
+    SUPABASE_BACKEND: Literal["supabase", "stub"] = "supabase"
+    # Read-through cache for word_gen markdown / ppt_gen content rows (0 disables)
+    GENERATION_CACHE_TTL_SECONDS: float = 120.0
+    # word_gen markdown is also written by other workers and the frontend, which this cache cannot see
+    GENERATION_MARKDOWN_CACHE_TTL_SECONDS: float = 30.0
+    GENERATION_CACHE_MAX_ENTRIES: int = 256
+    # Regenerated word_gen markdown stored as a line delta against an immutable snapshot (core/markdown_versions)
+    MARKDOWN_DELTA_ENABLED: bool = True
+    MARKDOWN_SNAPSHOT_INTERVAL: int = 8
+    MARKDOWN_DELTA_MAX_RATIO: float = 0.5
+    MARKDOWN_VERSION_CACHE_SIZE: int = 128
+    
+    # sha256 -> OpenAI file ID cache for uploaded RFP/supporting PDFs (SQLite in CACHE_DIR)
+    OPENAI_FILE_CACHE_ENABLED: bool = True
+    OPENAI_FILE_TTL_HOURS: float = 72.0
+    OPENAI_FILE_SWEEP_INTERVAL_SECONDS: float = 3600.0
+    # Streamed RFP/supporting PDF downloads, revalidated against CACHE_DIR/pdf_store
+    PDF_MAX_BYTES: int = 50 * 1024 * 1024
+    PDF_STORE_MAX_BYTES: int = 1024 * 1024 * 1024
+    # Send a stored CompanyDigest instead of the supporting PDF once one exists for its content
+    COMPANY_DIGEST_ENABLED: bool = True
+    # /initialgen resumability: partial markdown checkpoints + per-run SSE replay buffer
+    STREAM_CHECKPOINT_SECONDS: float = 15.0
+    STREAM_REPLAY_EVENTS: int = 2048
+    STREAM_RETENTION_SECONDS: float = 600.0
+    # Skip Word rebuild/upload when markdown, doc_config and language are unchanged
+    WORD_ARTIFACT_CACHE_ENABLED: bool = True
+    # /regenerate edits only the sections holding comment anchors, in parallel (whole document if off)
+    REGEN_SECTION_MODE: bool = True
+    REGEN_SECTION_WORKERS: int = 4
+    # Tokenized markdown (utils/markdown_ast) kept per process, keyed by markdown sha256 (0 disables)
+    MARKDOWN_AST_CACHE_SIZE: int = 64
     
     # Application Settings
     APP_NAME: str = "RFP Presentation Generator"
     DEBUG: bool = False
     DEFAULT_TEMPLATE: str = "arweqah"
     
+    # PPTX Render Pool (keeps python-pptx work off the event loop)
+    RENDER_POOL_MODE: Literal["thread", "process"] = "thread"
+    RENDER_POOL_WORKERS: int = 2
+    RENDER_QUEUE_SIZE: int = 8
+    # Streamed (pipelined) renders wait on the LLM most of the time: separate limit from the render queue
+    RENDER_STREAM_JOBS: int = 16
+    # Worker threads for streamed slide steps, separate from RENDER_POOL_WORKERS so they never hold render() workers
+    RENDER_STREAM_WORKERS: int = 2
+    RENDER_JOB_TIMEOUT_SECONDS: float = 300.0
+    # Rendered decks stay in memory up to this size, then spill to an anonymous temp file
+    PPTX_SPOOL_MAX_BYTES: int = 32 * 1024 * 1024
+    # /ppt-initialgen renders slides as the structure streams in, uploads and records concurrently (thread pool only)
+    PPT_PIPELINED_GENERATION: bool = True
+    # /ppt-regeneration edits only the slides comments point at, keeping the rest verbatim (whole deck if off)
+    PPT_SLIDE_REGEN_MODE: bool = True
+    # Output token budget per targeted slide in a slide-targeted regeneration
+    PPT_SLIDE_EDIT_TOKENS: int = 1500
+    # Prompts over this size are split at markdown sections and generated as concurrent chunks, then merged (0 disables)
+    # Chunked decks reach on_slide only after the merge, so PPT_PIPELINED_GENERATION gives them no overlap
+    PPT_CHUNK_THRESHOLD_TOKENS: int = 100000
+    PPT_CHUNK_MAX_TOKENS: int = 30000
+    PPT_CHUNK_CONCURRENCY: int = 4
+    
+    # Per-slide asset preparation (tinted icons, chart XML) in parallel
+    PPTX_PARALLEL_SLIDES: bool = False
+    PPTX_SLIDE_WORKERS: int = 4
+    
+    # Slide-resolution background/icon variants (built once per template into CACHE_DIR)
+    ASSET_VARIANTS_ENABLED: bool = True
+    ASSET_VARIANT_DPI: int = 150
+    ASSET_JPEG_QUALITY: int = 85
+    
+    # In-process LRU of tinted icon PNGs (entries; a template needs ~2 per icon)
+    ICON_TINT_CACHE_SIZE: int = 1024
+    # In-process LRU of rendered content slides spliced into later decks (entries; 0 disables)
+    SLIDE_RENDER_CACHE_SIZE: int = 512
+    
     # FIXED: Path resolution that works from any directory
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
     
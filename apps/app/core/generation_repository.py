@@ -0,0 +1,235 @@
+"""
+Generation Repository Module
+Single read path for word_gen markdown and ppt_gen content rows, with a short-TTL
+read-through cache shared by the Word (sync) and PPT (async) code paths.
+
+One user flow (/initialgen → /download → /ppt-initialgen) used to fetch the same
+multi-KB markdown row several times through three different helpers. Reads now go
+through this repository; writers (save_generated_markdown,
+upload_word_and_update_table) invalidate the affected (uuid, gen_id) entry. ppt_gen
+content rows are written once per ppt_genid and never updated, so they are cached
+on write as well.
+
+Every invalidation is stamped per key, and a read that started before the latest
+invalidation of its key does not store its (possibly stale) result.
+
+The cache is per process. Writes from other workers and the frontend's word_gen
+upsert do not invalidate it, so markdown reads use the shorter
+GENERATION_MARKDOWN_CACHE_TTL_SECONDS: that is how stale a cross-process write can
+be served.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger("generation_repository")
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class GenerationRepository:
+    """
+    Thread-safe TTL cache in front of generation row reads.
+
+    Loaders do the actual round-trip; empty results are never cached so a row that
+    is about to be written is not hidden for a TTL. Counters are exposed via stats().
+
+    Invalidation stamps come from one counter (_clock). Stamps of keys dropped from
+    the bounded stamp table are folded into _stamp_floor, which then stands in for
+    any key without a stamp, so eviction can only make a put more conservative.
+    """
+
+    _instance: Optional['GenerationRepository'] = None
+    _lock = Lock()
+
+    def __new__(cls):
+        """Singleton pattern for global repository access"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._entries_lock = Lock()
+        self.ttl_seconds = float(settings.GENERATION_CACHE_TTL_SECONDS)
+        self.markdown_ttl_seconds = float(settings.GENERATION_MARKDOWN_CACHE_TTL_SECONDS)
+        self.max_entries = max(1, int(settings.GENERATION_CACHE_MAX_ENTRIES))
+        self._clock = 0
+        self._stamps: "OrderedDict[CacheKey, int]" = OrderedDict()
+        self._stamp_floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_puts_skipped = 0
+        self._initialized = True
+
+    # ========================================================================
+    # CACHE PRIMITIVES
+    # ========================================================================
+
+    def _get(self, key: CacheKey) -> Tuple[bool, Any]:
+        with self._entries_lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def _read_started(self) -> int:
+        with self._entries_lock:
+            return self._clock
+
+    def _put(
+        self,
+        key: CacheKey,
+        value: Any,
+        read_started: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """Cache value; skipped if key was invalidated after read_started (a _read_started() token)"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0 or value is None or value == "":
+            return
+        with self._entries_lock:
+            if read_started is not None and self._stamps.get(key, self._stamp_floor) > read_started:
+                self.stale_puts_skipped += 1
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _invalidate(self, key: CacheKey) -> None:
+        with self._entries_lock:
+            self._clock += 1
+            self._stamps[key] = self._clock
+            self._stamps.move_to_end(key)
+            while len(self._stamps) > 4 * self.max_entries:
+                _, stamp = self._stamps.popitem(last=False)
+                self._stamp_floor = max(self._stamp_floor, stamp)
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def _read_through(
+        self,
+        key: CacheKey,
+        load: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        found, value = self._get(key)
+        if found:
+            return value
+        read_started = self._read_started()
+        value = load()
+        self._put(key, value, read_started, ttl_seconds)
+        return value
+
+    async def _aread_through(
+        self,
+        key: CacheKey,
+        load: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        found, value = self._get(key)
+        if found:
+            return value
+        read_started = self._read_started()
+        value = await load()
+        self._put(key, value, read_started, ttl_seconds)
+        return value
+
+    # ========================================================================
+    # word_gen: generated markdown
+    # ========================================================================
+
+    @staticmethod
+    def _markdown_key(uuid: str, gen_id: str) -> CacheKey:
+        return ("word_gen.generated_markdown", uuid, gen_id)
+
+    def get_markdown(self, uuid: str, gen_id: str, load: Callable[[], Optional[str]]) -> Optional[str]:
+        """Markdown for (uuid, gen_id); `load` performs the round-trip on a miss"""
+        return self._read_through(self._markdown_key(uuid, gen_id), load, self.markdown_ttl_seconds)
+
+    async def aget_markdown(
+        self,
+        uuid: str,
+        gen_id: str,
+        load: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        """Async variant of get_markdown"""
+        return await self._aread_through(self._markdown_key(uuid, gen_id), load, self.markdown_ttl_seconds)
+
+    def invalidate_markdown(self, uuid: str, gen_id: str) -> None:
+        """Drop cached markdown after the word_gen row was written"""
+        self._invalidate(self._markdown_key(uuid, gen_id))
+
+    # ========================================================================
+    # ppt_gen: generated content (immutable per ppt_genid)
+    # ========================================================================
+
+    @staticmethod
+    def _ppt_content_key(uuid: str, gen_id: str, ppt_genid: str) -> CacheKey:
+        return ("ppt_gen.generated_content", uuid, gen_id, ppt_genid)
+
+    async def aget_ppt_content(
+        self,
+        uuid: str,
+        gen_id: str,
+        ppt_genid: str,
+        load: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[Dict[str, Any]]:
+        """Generated content row for a ppt_genid; `load` performs the round-trip on a miss"""
+        return await self._aread_through(self._ppt_content_key(uuid, gen_id, ppt_genid), load)
+
+    def put_ppt_content(self, uuid: str, gen_id: str, ppt_genid: str, content: Dict[str, Any]) -> None:
+        """Cache a ppt_gen row on insert (rows are never updated)"""
+        self._put(self._ppt_content_key(uuid, gen_id, ppt_genid), content)
+
+    def invalidate_ppt_content(self, uuid: str, gen_id: str, ppt_genid: str) -> None:
+        """Drop a cached ppt_gen row whose insert was rolled back"""
+        self._invalidate(self._ppt_content_key(uuid, gen_id, ppt_genid))
+
+    # ========================================================================
+    # METRICS
+    # ========================================================================
+
+    def clear(self) -> None:
+        with self._entries_lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is a Supabase round-trip avoided"""
+        total = self.hits + self.misses
+        with self._entries_lock:
+            entries = len(self._entries)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "round_trips_avoided": self.hits,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "invalidations": self.invalidations,
+            "stale_puts_skipped": self.stale_puts_skipped,
+            "entries": entries,
+            "ttl_seconds": self.ttl_seconds,
+            "markdown_ttl_seconds": self.markdown_ttl_seconds,
+        }
+
+
+def get_generation_repository() -> GenerationRepository:
+    """Get the global generation repository instance"""
+    return GenerationRepository()
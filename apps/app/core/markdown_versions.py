@@ -0,0 +1,333 @@
+"""
+Markdown Versions Module
+Delta encoding of word_gen.generated_markdown against immutable full snapshots.
+
+Every regeneration stored a full copy of a proposal that is usually near-identical
+to the version it was derived from. A regenerated version is now stored as a
+line diff against a full snapshot, inside the same column:
+
+    <!--mdv1:{"base_sha": ..., "sha": ..., "depth": n,
+              "ops": [[line, count] | "inserted text", ...]}-->
+
+The snapshot is not another word_gen row: rows are overwritten by re-runs,
+checkpoints, Word uploads and the frontend upsert, which would orphan every delta
+built on them. Snapshots live in a content-addressed object store
+(<uuid>/markdown_snapshots/<sha256>.md in the Word bucket, see snapshot_key) and
+are never changed once written.
+
+Deltas never chain: a version derived from a delta is diffed against that delta's
+snapshot. A new full version is written once MARKDOWN_SNAPSHOT_INTERVAL versions
+hang off one snapshot, or when the delta would not be meaningfully smaller than
+the text. Reads reconstruct the text (verified against its sha256) and keep it in
+a process-wide LRU keyed by content hash, so a head is rebuilt at most once.
+Plain stored markdown passes through unchanged, so old rows and rows written by
+other clients keep working.
+
+A mid-stream checkpoint is stored as plain markdown followed by CHECKPOINT_MARKER
+(an HTML comment, invisible when rendered), so completeness is recorded without
+a schema change. Decoding strips the marker; split_checkpoint reports it.
+
+This module does no I/O: callers pass loaders for the raw stored value of another
+gen_id of the same uuid and for snapshot objects, and a writer for snapshots.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from ..config import settings
+
+logger = logging.getLogger("markdown_versions")
+
+ENVELOPE_PREFIX = "<!--mdv1:"
+ENVELOPE_SUFFIX = "-->"
+CHECKPOINT_MARKER = "\n<!--mdv1:checkpoint-->"
+
+DeltaOp = Union[List[int], str]
+StoredLoader = Callable[[str], Optional[str]]
+SnapshotLoader = Callable[[str], Optional[str]]
+AsyncSnapshotLoader = Callable[[str], Awaitable[Optional[str]]]
+SnapshotWriter = Callable[[str, str], None]
+
+SNAPSHOT_FOLDER = "markdown_snapshots"
+
+
+class MarkdownVersionError(RuntimeError):
+    """Raised when a delta-encoded version cannot be reconstructed."""
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def snapshot_key(uuid: str, sha: str) -> str:
+    """Storage key of a snapshot (the frontend decoder builds the same key)"""
+    return f"{uuid}/{SNAPSHOT_FOLDER}/{sha}.md"
+
+
+def mark_checkpoint(markdown: str) -> str:
+    """Stored value of a partial, mid-stream checkpoint"""
+    return markdown + CHECKPOINT_MARKER
+
+
+def split_checkpoint(stored: Optional[str]) -> Tuple[Optional[str], bool]:
+    """(stored value without the checkpoint marker, complete)"""
+    if stored and stored.endswith(CHECKPOINT_MARKER):
+        return stored[:-len(CHECKPOINT_MARKER)], False
+    return stored, True
+
+
+def split_lines(text: str) -> List[str]:
+    """Lines split on '\\n' only, newline kept (the frontend decoder splits the same way)"""
+    parts = text.split("\n")
+    lines = [part + "\n" for part in parts[:-1]]
+    if parts[-1]:
+        lines.append(parts[-1])
+    return lines
+
+
+def encode_delta(base: str, target: str) -> List[DeltaOp]:
+    """Ops rebuilding target from base: [line, count] copies base lines, a string is inserted"""
+    base_lines, target_lines = split_lines(base), split_lines(target)
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    ops: List[DeltaOp] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2 - i1])
+        elif j2 > j1:
+            ops.append("".join(target_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base: str, ops: List[DeltaOp]) -> str:
+    base_lines = split_lines(base)
+    parts: List[str] = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            start, count = op
+            parts.extend(base_lines[start:start + count])
+    return "".join(parts)
+
+
+@dataclass
+class DeltaRecord:
+    base_sha: str
+    sha: str
+    depth: int
+    ops: List[DeltaOp]
+
+    def to_stored(self) -> str:
+        payload = {
+            "base_sha": self.base_sha,
+            "sha": self.sha,
+            "depth": self.depth,
+            "ops": self.ops,
+        }
+        return ENVELOPE_PREFIX + json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + ENVELOPE_SUFFIX
+
+
+def parse_stored(stored: Optional[str]) -> Optional[DeltaRecord]:
+    """DeltaRecord for a delta-encoded stored value, None for plain markdown"""
+    if not stored or not stored.startswith(ENVELOPE_PREFIX) or not stored.endswith(ENVELOPE_SUFFIX):
+        return None
+    try:
+        payload = json.loads(stored[len(ENVELOPE_PREFIX):-len(ENVELOPE_SUFFIX)])
+        return DeltaRecord(
+            base_sha=payload["base_sha"],
+            sha=payload["sha"],
+            depth=int(payload["depth"]),
+            ops=payload["ops"],
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class ReconstructedMarkdownCache:
+    """Thread-safe LRU of markdown texts (snapshots and rebuilt heads) keyed by sha256"""
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._entries_lock = Lock()
+        self.max_entries = max(0, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.reconstructed = 0
+
+    def get(self, sha: str) -> Optional[str]:
+        with self._entries_lock:
+            text = self._entries.get(sha)
+            if text is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sha)
+            self.hits += 1
+            return text
+
+    def put(self, sha: str, text: str) -> None:
+        if self.max_entries == 0:
+            return
+        with self._entries_lock:
+            self._entries[sha] = text
+            self._entries.move_to_end(sha)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        with self._entries_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "reconstructed": self.reconstructed,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# ============================================================================
+# GLOBAL CACHE INSTANCE
+# ============================================================================
+
+_cache: Optional[ReconstructedMarkdownCache] = None
+_cache_lock = Lock()
+
+
+def get_version_cache() -> ReconstructedMarkdownCache:
+    """Get the per-process reconstructed markdown cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReconstructedMarkdownCache(settings.MARKDOWN_VERSION_CACHE_SIZE)
+    return _cache
+
+
+# ============================================================================
+# ENCODE / DECODE
+# ============================================================================
+
+def _snapshot_text(record: DeltaRecord, snapshot: Optional[str]) -> str:
+    if snapshot is None:
+        raise MarkdownVersionError(f"Snapshot {record.base_sha} is missing")
+    if sha256_text(snapshot) != record.base_sha:
+        raise MarkdownVersionError(f"Snapshot {record.base_sha} does not match its content hash")
+    get_version_cache().put(record.base_sha, snapshot)
+    return snapshot
+
+
+def _rebuild(record: DeltaRecord, snapshot: str) -> str:
+    text = apply_delta(snapshot, record.ops)
+    if sha256_text(text) != record.sha:
+        raise MarkdownVersionError(f"Delta against snapshot {record.base_sha} does not reproduce its content")
+    cache = get_version_cache()
+    cache.reconstructed += 1
+    cache.put(record.sha, text)
+    return text
+
+
+def decode_stored(stored: Optional[str], load_snapshot: SnapshotLoader) -> Optional[str]:
+    """Markdown for a stored generated_markdown value (reconstructing deltas)"""
+    stored, _ = split_checkpoint(stored)
+    record = parse_stored(stored)
+    if record is None:
+        return stored
+    cache = get_version_cache()
+    text = cache.get(record.sha)
+    if text is not None:
+        return text
+    snapshot = cache.get(record.base_sha)
+    if snapshot is None:
+        snapshot = _snapshot_text(record, load_snapshot(record.base_sha))
+    return _rebuild(record, snapshot)
+
+
+async def adecode_stored(stored: Optional[str], aload_snapshot: AsyncSnapshotLoader) -> Optional[str]:
+    """Async variant of decode_stored"""
+    stored, _ = split_checkpoint(stored)
+    record = parse_stored(stored)
+    if record is None:
+        return stored
+    cache = get_version_cache()
+    text = cache.get(record.sha)
+    if text is not None:
+        return text
+    snapshot = cache.get(record.base_sha)
+    if snapshot is None:
+        snapshot = _snapshot_text(record, await aload_snapshot(record.base_sha))
+    return _rebuild(record, snapshot)
+
+
+def encode_for_storage(
+    markdown: str,
+    gen_id: str,
+    base_gen_id: Optional[str],
+    load_stored: StoredLoader,
+    load_snapshot: SnapshotLoader,
+    save_snapshot: SnapshotWriter,
+) -> str:
+    """
+    Value to store in generated_markdown for a version derived from base_gen_id:
+    a delta against the base's snapshot, or the markdown itself when there is no
+    usable base, the snapshot already carries MARKDOWN_SNAPSHOT_INTERVAL versions,
+    or the delta is not smaller than MARKDOWN_DELTA_MAX_RATIO of the text.
+    A plain base is written to the snapshot store before the delta is returned.
+    """
+    if not settings.MARKDOWN_DELTA_ENABLED or not base_gen_id or base_gen_id == gen_id or not markdown:
+        return markdown
+    try:
+        base_stored, _ = split_checkpoint(load_stored(base_gen_id))
+        base_record = parse_stored(base_stored)
+        if base_record is None:
+            if not base_stored:
+                return markdown
+            snapshot, depth, needs_upload = base_stored, 1, True
+        else:
+            depth, needs_upload = base_record.depth + 1, False
+            snapshot = get_version_cache().get(base_record.base_sha)
+            if snapshot is None:
+                snapshot = _snapshot_text(base_record, load_snapshot(base_record.base_sha))
+        if depth > settings.MARKDOWN_SNAPSHOT_INTERVAL:
+            return markdown
+
+        record = DeltaRecord(
+            base_sha=sha256_text(snapshot),
+            sha=sha256_text(markdown),
+            depth=depth,
+            ops=encode_delta(snapshot, markdown),
+        )
+        stored = record.to_stored()
+        if len(stored) > settings.MARKDOWN_DELTA_MAX_RATIO * len(markdown):
+            return markdown
+        if needs_upload:
+            # Content-addressed, so rewriting an existing snapshot stores the same bytes
+            try:
+                save_snapshot(record.base_sha, snapshot)
+            except Exception as e:
+                raise MarkdownVersionError(f"Snapshot upload failed: {e}") from e
+        cache = get_version_cache()
+        cache.put(record.base_sha, snapshot)
+        cache.put(record.sha, markdown)
+        logger.info(
+            f"Storing {gen_id} as delta against snapshot {record.base_sha[:12]} (depth {depth}): "
+            f"{len(stored)} chars instead of {len(markdown)}"
+        )
+        return stored
+    except MarkdownVersionError as e:
+        logger.warning(f"Storing {gen_id} as full markdown: {e}")
+        return markdown
+
+
+def stored_matches(stored: Optional[str], markdown: str) -> bool:
+    """True if a stored value (plain or delta) already holds exactly this markdown"""
+    record = parse_stored(stored)
+    if record is not None:
+        return record.sha == sha256_text(markdown)
+    return stored == markdown
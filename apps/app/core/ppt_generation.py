@@ -1,13 +1,15 @@
+import asyncio
 import logging
 import json
-import os
+import time
 from uuid import uuid4
-from typing import Dict, Any, Optional
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 from pathlib import Path
 
-from ..services.pptx_generator import PptxGenerator
-from ..services.openai_service import get_openai_service
+from ..models.presentation import PresentationData
+from ..services.openai_service import OpenAIService, get_openai_service
 from .supabase_service import SupabaseService
+from .render_pool import RenderQueueFull, RenderResult, get_render_pool
 from ..config import settings
 
 logger = logging.getLogger("ppt_generation")
@@ -23,8 +25,10 @@ async def run_initial_generation(
     """
     Generate complete presentation using local backend template
     """
-    output_path: Optional[str] = None
+    output: Optional[BinaryIO] = None
     ppt_genid: Optional[str] = None
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
     
     try:
         logger.info("="*80)
@@ -76,63 +80,73 @@ async def run_initial_generation(
         
         logger.info(f"Fetched: {len(markdown_content)} characters")
         
+        timings["fetch_s"] = time.perf_counter() - started
+        pipelined = settings.PPT_PIPELINED_GENERATION and get_render_pool().supports_streaming
+        ppt_genid = str(uuid4())
+        
         # STEP 2: Generate structure with OpenAI (streaming enabled)
-        logger.info(f"\nSTEP 2: Generating presentation structure...")
+        logger.info("\nSTEP 2: Generating presentation structure...")
         logger.info(f"   Model: {settings.OPENAI_MODEL}")
         logger.info(f"   Language: {language}")
         logger.info(f"   Template: {template_id}")
-        logger.info(f"   Streaming: Enabled")
-        
-        presentation_data = await openai_service.generate_presentation_structure(
-            markdown_content=markdown_content,
-            template_id=template_id,
-            language=language,
-            user_preference=user_preference,
-            stream_output=True
-        )
+        logger.info("   Streaming: Enabled")
+        logger.info(f"   Pipelined rendering: {'Enabled' if pipelined else 'Disabled'}")
         
-        if not presentation_data or not presentation_data.slides:
-            raise RuntimeError("OpenAI returned empty presentation data")
+        if pipelined:
+            # STEP 2+3: slides are rendered as they stream in
+            presentation_data, render = await _generate_and_render_pipelined(
+                openai_service, markdown_content, template_id, language, user_preference, timings
+            )
+            output = render.output
+            stats = _calculate_presentation_stats(presentation_data)
+        else:
+            # Answer 429 before paying for the LLM call, not after it
+            get_render_pool().check_capacity()
+            stage_started = time.perf_counter()
+            presentation_data = await openai_service.generate_presentation_structure(
+                markdown_content=markdown_content,
+                template_id=template_id,
+                language=language,
+                user_preference=user_preference,
+                stream_output=True
+            )
+            timings["llm_s"] = time.perf_counter() - stage_started
+            
+            if not presentation_data or not presentation_data.slides:
+                raise RuntimeError("OpenAI returned empty presentation data")
+            
+            # STEP 2.5: Calculate stats ONCE (FIXED: removed duplicate calculation)
+            stats = _calculate_presentation_stats(presentation_data)
+            
+            # STEP 3: Generate PPTX with local template
+            logger.info(f"\nSTEP 3: Creating PPTX with local template '{template_id}'...")
+            logger.info(f"   Template directory: {template_path}")
+            logger.info("   Including:")
+            logger.info("      Template styling (colors, fonts, layouts)")
+            logger.info(f"      Icons ({stats['icons_count']} slides)")
+            logger.info(f"      Images (generating {stats['images']} via DALL-E)")
+            logger.info(f"      Charts ({stats['charts']} native PowerPoint charts)")
+            logger.info(f"      Tables ({stats['tables']} styled tables)")
+            
+            # PptxGenerator runs in the render pool (off the event loop)
+            stage_started = time.perf_counter()
+            render = await get_render_pool().render(template_id, language, presentation_data)
+            output = render.output
+            timings["render_s"] = render.render_s
+            timings["render_after_llm_s"] = time.perf_counter() - stage_started
+            timings["overlap_s"] = 0.0
         
         logger.info(f"\nStructure generated: {presentation_data.title}")
         logger.info(f"   Total slides: {len(presentation_data.slides)}")
-        
-        # STEP 2.5: Calculate stats ONCE (FIXED: removed duplicate calculation)
-        stats = _calculate_presentation_stats(presentation_data)
-        
         logger.info(f"   • Section headers: {stats['sections']}")
         logger.info(f"   • Content slides: {stats['content_slides']}")
         logger.info(f"   • Charts: {stats['charts']}")
         logger.info(f"   • Tables: {stats['tables']}")
         logger.info(f"   • Images to generate: {stats['images']}")
         
-        # STEP 3: Generate PPTX with local template
-        logger.info(f"\nSTEP 3: Creating PPTX with local template '{template_id}'...")
-        logger.info(f"   Template directory: {template_path}")
-        logger.info(f"   Including:")
-        logger.info(f"      Template styling (colors, fonts, layouts)")
-        logger.info(f"      Icons ({stats['icons_count']} slides)")
-        logger.info(f"      Images (generating {stats['images']} via DALL-E)")
-        logger.info(f"      Charts ({stats['charts']} native PowerPoint charts)")
-        logger.info(f"      Tables ({stats['tables']} styled tables)")
-        
-        ppt_genid = str(uuid4())
-        
-        # PptxGenerator will load local template from app/templates/{template_id}/
-        generator = PptxGenerator(template_id=template_id, language=language)
-        output_path = generator.generate(
-            presentation_data
-        )
-        
-        logger.info(f"PPTX generated: {output_path}")
+        logger.info(f"PPTX generated: {render.size_bytes / 1024:.0f} KB (in memory)")
+        logger.info(f"   Render queue wait: {render.queue_wait_s:.2f}s, render: {render.render_s:.2f}s")
         
-        # STEP 4: Upload to Supabase
-        logger.info(f"\n STEP 4: Uploading to Supabase storage...")
-        ppt_url = await supabase.upload_pptx(output_path, uuid, gen_id, ppt_genid)
-        logger.info(f"Uploaded: {ppt_url}")
-        
-        # STEP 5: Save record
-        logger.info(f"\nSTEP 5: Saving generation record...")
         generated_content = {
             "title": presentation_data.title,
             "template_id": template_id,
@@ -140,23 +154,35 @@ async def run_initial_generation(
             "slides": [slide.model_dump() for slide in presentation_data.slides],
             "stats": stats 
         }
+        record = {
+            "uuid_str": uuid,
+            "gen_id": gen_id,
+            "ppt_genid": ppt_genid,
+            "generated_content": generated_content,
+            "language": language,
+            "template_id": template_id,
+            "user_preference": user_preference,
+        }
         
-        await supabase.save_generation_record(
-            uuid_str=uuid,
-            gen_id=gen_id,
-            ppt_genid=ppt_genid,
-            ppt_url=ppt_url,
-            generated_content=generated_content,
-            language=language,
-            template_id=template_id,  
-            user_preference=user_preference
-        )
+        # STEP 4 + 5: Upload to Supabase and save record
+        stage_started = time.perf_counter()
+        if pipelined:
+            logger.info("\n STEP 4+5: Uploading to Supabase storage and saving record concurrently...")
+            ppt_url = await _upload_and_record_concurrently(supabase, output, record)
+        else:
+            logger.info("\n STEP 4: Uploading to Supabase storage...")
+            ppt_url = await supabase.upload_pptx(output, uuid, gen_id, ppt_genid)
+            logger.info(f"Uploaded: {ppt_url}")
+            
+            logger.info("\nSTEP 5: Saving generation record...")
+            await supabase.save_generation_record(ppt_url=ppt_url, **record)
+        timings["upload_and_record_s"] = time.perf_counter() - stage_started
         logger.info("\n" + "="*80)
         logger.info(f"Record saved: {ppt_genid}")
         logger.info("="*80)
         
-        # STEP 6: Cleanup (FIXED: delete local PPTX file after upload)
-        _cleanup_temp_file(output_path)
+        # STEP 6: Cleanup (release the in-memory / spooled PPTX after upload)
+        _release_output(output)
         
         logger.info("\n" + "="*80)
         logger.info("INITIAL GENERATION COMPLETE")
@@ -165,20 +191,102 @@ async def run_initial_generation(
         logger.info(f"   PPT URL: {ppt_url}")
         logger.info(f"   Template: {template_id}")
         logger.info(f"   Language: {language}")
+        timings["total_s"] = time.perf_counter() - started
+        _log_timings(timings)
         logger.info("="*80 + "\n")
         
         return {
             "ppt_genid": ppt_genid,
             "ppt_url": ppt_url,
-            "generated_content": json.dumps(generated_content)
+            "generated_content": json.dumps(generated_content),
+            "timings": timings,
         }
     
+    except RenderQueueFull:
+        logger.warning("Render queue full, rejecting initial generation")
+        raise
+    
     except Exception as e:
         logger.exception("Initial generation failed")
         
         # ROLLBACK: Cleanup on failure
-        if output_path:
-            _cleanup_temp_file(output_path)
+        _release_output(output)
+
+
+async def _generate_and_render_pipelined(
+    openai_service: OpenAIService,
+    markdown_content: str,
+    template_id: str,
+    language: str,
+    user_preference: str,
+    timings: Dict[str, float],
+) -> Tuple[PresentationData, RenderResult]:
+    """
+    Stream the structure and render each slide as it arrives, so the deck is
+    ready shortly after the last slide instead of one full render later.
+    Adds llm_s, render_s, render_after_llm_s and overlap_s to timings.
+    """
+    job = get_render_pool().start_streaming(template_id, language)
+    started = time.perf_counter()
+    try:
+        presentation_data = await openai_service.generate_presentation_structure(
+            markdown_content=markdown_content,
+            template_id=template_id,
+            language=language,
+            user_preference=user_preference,
+            stream_output=True,
+            on_header=job.start,
+            # The renderer validates slides in place; the stored content keeps the model's slides
+            on_slide=lambda index, slide: job.add_slide(slide.model_copy(deep=True)),
+        )
+        timings["llm_s"] = time.perf_counter() - started
+        
+        if not presentation_data or not presentation_data.slides:
+            raise RuntimeError("OpenAI returned empty presentation data")
+        
+        llm_done = time.perf_counter()
+        render = await job.finish()
+        timings["render_after_llm_s"] = time.perf_counter() - llm_done
+    except BaseException:
+        job.abort()
+        raise
+    
+    timings["render_s"] = render.render_s
+    # Render work done while the model was still writing
+    timings["overlap_s"] = max(0.0, render.render_s - timings["render_after_llm_s"])
+    return presentation_data, render
+
+
+async def _upload_and_record_concurrently(supabase: SupabaseService, output: BinaryIO, record: Dict[str, Any]) -> str:
+    """
+    Upload the deck and insert its ppt_gen row at the same time (the public URL
+    is known up front). A row whose upload failed is deleted again.
+    """
+    uuid_str, gen_id, ppt_genid = record["uuid_str"], record["gen_id"], record["ppt_genid"]
+    ppt_url = await supabase.pptx_public_url(uuid_str, gen_id, ppt_genid)
+    uploaded, saved = await asyncio.gather(
+        supabase.upload_pptx(output, uuid_str, gen_id, ppt_genid),
+        supabase.save_generation_record(ppt_url=ppt_url, **record),
+        return_exceptions=True,
+    )
+    if isinstance(uploaded, BaseException):
+        if not isinstance(saved, BaseException):
+            try:
+                await supabase.delete_generation_record(uuid_str, gen_id, ppt_genid)
+            except Exception as e:
+                logger.warning(f"Failed to roll back generation record {ppt_genid}: {e}")
+        raise uploaded
+    if isinstance(saved, BaseException):
+        raise saved
+    logger.info(f"Uploaded: {uploaded}")
+    return uploaded
+
+
+def _log_timings(timings: Dict[str, float]) -> None:
+    logger.info(
+        "   Stage timings: "
+        + ", ".join(f"{name}={value:.2f}s" for name, value in timings.items())
+    )
 
 
 def _calculate_presentation_stats(presentation_data) -> Dict[str, int]:
@@ -221,16 +329,14 @@ def _calculate_presentation_stats(presentation_data) -> Dict[str, int]:
     return stats
 
 
-def _cleanup_temp_file(file_path: Optional[str]) -> None:
+def _release_output(output: Optional[BinaryIO]) -> None:
     """
-    Cleanup temporary PPTX file
+    Close a rendered PPTX stream (frees the buffer or its anonymous spool file)
     """
-    if not file_path:
+    if output is None:
         return
     
     try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-            logger.info(f"Cleaned up temp file: {file_path}")
+        output.close()
     except Exception as e:
-        logger.warning(f"Failed to cleanup temp file {file_path}: {e}")
+        logger.warning(f"Failed to release PPTX output: {e}")
@@ -55,6 +55,49 @@ Content:
 """
 
 
+def get_chunk_user_prompt(
+    markdown_chunk: str,
+    language: str,
+    part: int,
+    total: int,
+    outline: List[str],
+    user_preference: str = "",
+) -> str:
+    """
+    User prompt for one chunk of a very large document (map-reduce generation):
+    slides for this part only, with the whole document's outline for context.
+    """
+    pref = f"\n\nUser preferences: {user_preference}" if user_preference else ""
+    outline_text = "\n".join(outline) or "(no headings)"
+    if part == 1:
+        scope = "This is the first part: start with the title slide and an agenda covering the whole outline. Do not add a closing or thank-you slide."
+    elif part == total:
+        scope = "This is the last part: do not add a title or agenda slide; end with a closing thank-you slide."
+    else:
+        scope = "This is a middle part: do not add a title, agenda, or closing/thank-you slide."
+    return f"""The source document is too large for one request, so it is converted in {total} parts. Convert ONLY part {part} of {total} below into slides. Output valid JSON matching the PresentationData schema; set the presentation title from the document. Each slide: title, layout_type, and the appropriate content (bullets, paragraph, table_data, chart_data, etc.).
+
+{scope} Use section slides for the major headings of this part.{pref}
+
+Whole document outline (for context only):
+{outline_text}
+
+Part {part} of {total}:
+---
+{markdown_chunk}
+---
+"""
+
+
+def _format_comments(regen_comments: List[Dict[str, str]]) -> str:
+    """Feedback lines: what the comment points at (comment1) and the requested change (comment2)"""
+    return "\n".join(
+        f"- {c.get('comment1') or c.get('slide') or 'General'}: "
+        f"{c.get('comment2') or c.get('comment') or c.get('feedback', '')}"
+        for c in regen_comments
+    )
+
+
 def get_regeneration_prompt(
     markdown_content: str,
     language: str,
@@ -65,10 +108,7 @@ def get_regeneration_prompt(
     User prompt for regeneration: apply feedback comments to the existing (markdown) content
     and output updated PresentationData.
     """
-    comments_text = "\n".join(
-        f"- {c.get('slide', 'General')}: {c.get('comment', c.get('feedback', ''))}"
-        for c in regen_comments
-    )
+    comments_text = _format_comments(regen_comments)
     pref = f"\n\nUser preferences: {user_preference}" if user_preference else ""
     return f"""Apply the following feedback to the presentation. Regenerate the full presentation structure (PresentationData JSON) incorporating these changes. Keep everything that was not mentioned in the feedback.{pref}
 
@@ -80,3 +120,35 @@ Original content (for context):
 {markdown_content[:12000]}
 ---
 Output the complete updated presentation as structured data (PresentationData)."""
+
+
+def get_slide_edit_prompt(
+    slides_json: str,
+    deck_outline: List[str],
+    markdown_content: str,
+    language: str,
+    regen_comments: List[Dict[str, str]],
+) -> str:
+    """
+    User prompt for slide-targeted regeneration: edit only the given slides of the
+    previous deck and output them as SlideEditSet.
+    """
+    outline = "\n".join(f"{i}. {title}" for i, title in enumerate(deck_outline))
+    return f"""Apply the following feedback to the targeted slides of an existing presentation. Only the targeted slides are shown; every other slide stays exactly as it is and must not be output.
+
+For each targeted slide, return one edit with the same index and the edited slide in "slides". Keep the slide's layout, fields and wording wherever the feedback does not ask for a change. Return more than one slide only if the feedback asks to split the slide, and an empty list only if it asks to remove it. Write all slide text in {language}.
+
+Feedback (the text or slide it points at: the requested change):
+{_format_comments(regen_comments)}
+
+Targeted slides (previous JSON):
+{slides_json}
+
+Deck outline (index. title), for context only:
+{outline}
+
+Original content (for context):
+---
+{markdown_content[:12000]}
+---
+Output the edited slides as structured data (SlideEditSet)."""
@@ -2,15 +2,16 @@ import logging
 import json
 import os
 from uuid import uuid4
-from typing import Dict, Any, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from pathlib import Path
 
-from ..services.pptx_generator import PptxGenerator
 from ..services.openai_service import get_openai_service
 from .supabase_service import SupabaseService
-from .ppt_prompts import get_system_prompt, get_regeneration_prompt
+from .render_pool import RenderQueueFull, get_render_pool
+from .ppt_prompts import get_system_prompt, get_regeneration_prompt, get_slide_edit_prompt
+from .slide_regen import apply_slide_edits, plan_slide_edits, targets_json
 from ..config import settings
-from ..models.presentation import PresentationData
+from ..models.presentation import PresentationData, SlideContent, SlideEditSet
 
 logger = logging.getLogger("ppt_regeneration")
 
@@ -26,7 +27,7 @@ async def run_regeneration(
     """
     Regenerate presentation with feedback using local backend template
     """
-    output_path: Optional[str] = None
+    output: Optional[BinaryIO] = None
     new_ppt_genid: Optional[str] = None
     
     try:
@@ -86,33 +87,23 @@ async def run_regeneration(
         for idx, comment in enumerate(regen_comments, 1):
             logger.info(f"   {idx}. {comment['comment1']}: {comment['comment2']}")
         
-        # STEP 4: Regenerate with OpenAI (FIXED: Single API call with structured output)
+        # STEP 4: Regenerate with OpenAI (only the commented slides when they can be located)
         logger.info(f"\nSTEP 4: Regenerating with OpenAI...")
-        logger.info(f"   Mode: Single structured API call (streaming disabled for parsing)")
-        logger.info(f"   FIXED: No more double API calls")
-        
-        system_prompt = get_system_prompt(language, template_id)
-        user_prompt = get_regeneration_prompt(
-            markdown_content=markdown_content,
-            language=language,
-            regen_comments=regen_comments,
-            user_preference=""
-        )
-        
-        # FIXED: Single API call with structured output (no double call)
-        logger.info("   Calling OpenAI with structured output...")
-        parse_response = await openai_service.client.beta.chat.completions.parse(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            response_format=PresentationData,
-            temperature=0.3,
-            max_tokens=8000,
-        )
-        
-        presentation_data = parse_response.choices[0].message.parsed
+        # Answer 429 before paying for the LLM call, not after it
+        get_render_pool().check_capacity()
+        edited_slides: Optional[List[int]] = None
+        presentation_data = None
+        if settings.PPT_SLIDE_REGEN_MODE:
+            result = await _regenerate_targeted_slides(
+                openai_service, prev_content, markdown_content, language, template_id, regen_comments
+            )
+            if result is not None:
+                presentation_data, edited_slides = result
+        
+        if presentation_data is None:
+            presentation_data = await _regenerate_full_deck(
+                openai_service, markdown_content, language, template_id, regen_comments
+            )
         
         if not presentation_data or not presentation_data.slides:
             raise RuntimeError("OpenAI returned empty presentation data")
@@ -136,17 +127,15 @@ async def run_regeneration(
         logger.info(f"\n STEP 5: Creating PPTX with local template '{template_id}'...")
         logger.info(f"   Template directory: {template_path}")
         
-        generator = PptxGenerator(template_id=template_id)
-        output_path = generator.generate(
-            presentation_data,
-            generate_images=True
-        )
+        render = await get_render_pool().render(template_id, language, presentation_data)
+        output = render.output
         
-        logger.info(f"PPTX generated: {output_path}")
+        logger.info(f"PPTX generated: {render.size_bytes / 1024:.0f} KB (in memory)")
+        logger.info(f"   Render queue wait: {render.queue_wait_s:.2f}s, render: {render.render_s:.2f}s")
         
         # STEP 6: Upload
         logger.info("\n STEP 6: Uploading to Supabase...")
-        ppt_url = await supabase.upload_pptx(output_path, uuid, gen_id, new_ppt_genid)
+        ppt_url = await supabase.upload_pptx(output, uuid, gen_id, new_ppt_genid)
         logger.info(f"Uploaded: {ppt_url}")
         
         # STEP 7: Save record
@@ -160,6 +149,8 @@ async def run_regeneration(
             "slides": [slide.model_dump() for slide in presentation_data.slides],
             "base_ppt_genid": base_ppt_genid,
             "regen_comments": regen_comments,
+            "regen_mode": "slides" if edited_slides is not None else "deck",
+            "edited_slides": edited_slides,
             "stats": stats
         }
         
@@ -175,9 +166,9 @@ async def run_regeneration(
         
         logger.info(f"Record saved: {new_ppt_genid}")
         
-        # STEP 8: Cleanup (FIXED: delete local PPTX file after upload)
-        from .ppt_generation import _cleanup_temp_file
-        _cleanup_temp_file(output_path)
+        # STEP 8: Cleanup (release the in-memory / spooled PPTX after upload)
+        from .ppt_generation import _release_output
+        _release_output(output)
         
         logger.info("\n" + "="*80)
         logger.info("REGENERATION COMPLETE")
@@ -194,11 +185,105 @@ async def run_regeneration(
             "generated_content": json.dumps(generated_content)
         }
     
+    except RenderQueueFull:
+        logger.warning("Render queue full, rejecting regeneration")
+        raise
+    
     except Exception as e:
         logger.exception(" Regeneration failed")
         
         # ROLLBACK: Cleanup on failure
-        if output_path:
-            from .ppt_generation import _cleanup_temp_file
-            _cleanup_temp_file(output_path)
+        from .ppt_generation import _release_output
+        _release_output(output)
+
+
+async def _regenerate_full_deck(
+    openai_service,
+    markdown_content: str,
+    language: str,
+    template_id: str,
+    regen_comments: List[Dict[str, str]],
+) -> PresentationData:
+    """Whole-deck regeneration: the model rewrites every slide from the markdown"""
+    logger.info("   Mode: whole deck (single structured API call)")
+    system_prompt = get_system_prompt(language, template_id)
+    user_prompt = get_regeneration_prompt(
+        markdown_content=markdown_content,
+        language=language,
+        regen_comments=regen_comments,
+        user_preference=""
+    )
+    
+    parse_response = await openai_service.client.beta.chat.completions.parse(
+        model=settings.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        response_format=PresentationData,
+        temperature=0.3,
+        max_tokens=8000,
+    )
+    return parse_response.choices[0].message.parsed
+
 
+async def _regenerate_targeted_slides(
+    openai_service,
+    prev_content: Dict[str, Any],
+    markdown_content: str,
+    language: str,
+    template_id: str,
+    regen_comments: List[Dict[str, str]],
+) -> Optional[Tuple[PresentationData, List[int]]]:
+    """
+    Slide-targeted regeneration: only the previous slides the comments point at
+    go to the model (as JSON) and come back edited; every other SlideContent is
+    kept verbatim. Returns (deck, edited slide indices), or None when the
+    previous deck cannot be reused and the whole deck must be regenerated.
+    """
+    if prev_content.get("language") not in (None, language):
+        logger.info("   Language changed since the base generation, regenerating the whole deck")
+        return None
+    try:
+        prev_slides = [SlideContent.model_validate(s) for s in prev_content.get("slides") or []]
+    except ValueError as e:
+        logger.warning(f"   Previous slides unreadable ({e}), regenerating the whole deck")
+        return None
+    
+    targets = plan_slide_edits(prev_slides, regen_comments)
+    if not targets:
+        return None
+    
+    edited = [t.index for t in targets]
+    logger.info(f"   Mode: slide-targeted ({len(targets)} of {len(prev_slides)} slides: {edited})")
+    user_prompt = get_slide_edit_prompt(
+        slides_json=targets_json(targets),
+        deck_outline=[slide.title for slide in prev_slides],
+        markdown_content=markdown_content,
+        language=language,
+        regen_comments=regen_comments,
+    )
+    parse_response = await openai_service.client.beta.chat.completions.parse(
+        model=settings.OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": get_system_prompt(language, template_id)},
+            {"role": "user", "content": user_prompt},
+        ],
+        response_format=SlideEditSet,
+        temperature=0.3,
+        max_tokens=min(8000, settings.PPT_SLIDE_EDIT_TOKENS * len(targets)),
+    )
+    edits = parse_response.choices[0].message.parsed
+    if edits is None:
+        logger.warning("   Empty slide edit response, regenerating the whole deck")
+        return None
+    usage = parse_response.usage
+    if usage:
+        logger.info(f"   Slide edit tokens: prompt {usage.prompt_tokens}, completion {usage.completion_tokens}")
+    
+    deck = PresentationData(
+        title=prev_content.get("title") or "Untitled Presentation",
+        subtitle=prev_content.get("subtitle"),
+        slides=apply_slide_edits(prev_slides, targets, edits),
+    )
+    return deck, edited
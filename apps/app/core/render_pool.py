@@ -0,0 +1,469 @@
+"""
+Render Pool Module
+Runs PptxGenerator.generate() off the event loop in a bounded worker pool.
+
+python-pptx XML building, PIL tinting and prs.save are CPU/IO heavy and
+synchronous; running them inline in an async route blocks the uvicorn loop
+(and every SSE stream with it). Jobs are submitted to a thread or process
+pool with a bounded number of in-flight + queued jobs; when that bound is
+reached render() raises RenderQueueFull so the route can answer 429.
+
+Decks are rendered into a spooled stream (see PptxGenerator.generate_to_stream)
+rather than OUTPUT_DIR, so nothing is left on disk if a request fails midway.
+
+StreamingRender (thread mode) builds a deck slide by slide as the structured
+output streams in, so rendering overlaps generation instead of following it.
+Streamed jobs spend most of their life waiting for the model, so they count
+against their own limit (max_streaming) rather than the render queue, and their
+steps run on their own worker threads (stream_workers), so streamed decks never
+occupy the workers render() and check_capacity() account for.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Dict, Optional, Union
+
+from ..config import settings
+from ..models.presentation import PresentationData, SlideContent
+from ..services.pptx_generator import PptxGenerator
+
+logger = logging.getLogger("render_pool")
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised when the render pool has no free worker or queue slot."""
+
+
+@dataclass
+class RenderResult:
+    """Output of a render job with per-job timing. The caller must close `output`."""
+    output: BinaryIO
+    size_bytes: int
+    queue_wait_s: float
+    render_s: float
+
+    @property
+    def total_s(self) -> float:
+        return self.queue_wait_s + self.render_s
+
+
+def _render_job(
+    template_id: str,
+    language: str,
+    presentation: Dict[str, Any],
+    submitted_at: float,
+    as_bytes: bool = False,
+) -> Dict[str, Any]:
+    """
+    Worker entry point. Module-level and dict-in/dict-out so it can run in a
+    ProcessPoolExecutor as well as a ThreadPoolExecutor. Process workers return
+    the deck as bytes (streams cannot cross the process boundary).
+    """
+    started_at = time.time()
+    generator = PptxGenerator(template_id=template_id, language=language)
+    stream = generator.generate_to_stream(PresentationData(**presentation))
+    output: Union[BinaryIO, bytes] = stream
+    if as_bytes:
+        with stream:
+            output = stream.read()
+    finished_at = time.time()
+    return {
+        "output": output,
+        "queue_wait_s": started_at - submitted_at,
+        "render_s": finished_at - started_at,
+    }
+
+
+def _as_stream(output: Union[BinaryIO, bytes]) -> BinaryIO:
+    """Wrap process-mode bytes in the same spooled stream thread mode returns"""
+    if not isinstance(output, bytes):
+        return output
+    # Closed here if the write fails; on success ownership passes to the caller
+    with ExitStack() as on_error:
+        stream = on_error.enter_context(
+            SpooledTemporaryFile(max_size=settings.PPTX_SPOOL_MAX_BYTES, suffix=".pptx")
+        )
+        stream.write(output)
+        stream.seek(0)
+        on_error.pop_all()
+    return stream
+
+
+def _stream_size(stream: BinaryIO) -> int:
+    size = stream.seek(0, 2)
+    stream.seek(0)
+    return size
+
+
+def _close_abandoned_output(future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        return
+    output = future.result()["output"]
+    if hasattr(output, "close"):
+        output.close()
+
+
+class RenderPool:
+    """
+    Bounded render stage for PPTX generation.
+
+    At most `max_workers` jobs render concurrently and at most `max_queue`
+    more wait for a worker; anything beyond that is rejected immediately.
+    At most `max_streaming` streamed jobs may be open at once, independently;
+    their steps run on `stream_workers` threads of their own.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        mode: str = "thread",
+        job_timeout: Optional[float] = None,
+        max_streaming: int = 16,
+        stream_workers: int = 2,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.max_streaming = max(1, int(max_streaming))
+        self.stream_workers = max(1, int(stream_workers))
+        self.mode = mode
+        self.job_timeout = job_timeout
+
+        self._stream_executor: Optional[ThreadPoolExecutor] = None
+        if mode == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="pptx-render",
+            )
+            self._stream_executor = ThreadPoolExecutor(
+                max_workers=self.stream_workers,
+                thread_name_prefix="pptx-stream",
+            )
+
+        self._lock = Lock()
+        self._pending = 0
+        self._streaming = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._total_render_s = 0.0
+        self._total_queue_wait_s = 0.0
+
+        logger.info(
+            f"RenderPool initialized: mode={mode}, workers={self.max_workers}, "
+            f"queue={self.max_queue}, streaming={self.max_streaming} "
+            f"on {self.stream_workers} workers, timeout={job_timeout}"
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def check_capacity(self) -> None:
+        """
+        Raise RenderQueueFull now if render() would be rejected. Callers run this
+        before a paid LLM call; the slot is not held (it would sit idle for the
+        whole call), so render() can still be rejected by a job that got in between.
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise RenderQueueFull(
+                    f"Render queue full ({self._pending}/{self.capacity} jobs pending), retry later"
+                )
+
+    def _acquire_slot(self) -> None:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self.rejected += 1
+                raise RenderQueueFull(
+                    f"Render queue full ({self._pending}/{self.capacity} jobs pending), retry later"
+                )
+            self._pending += 1
+
+    def _release_slot(self, future) -> None:
+        # Runs when the job really finishes, even if the awaiting request timed out
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                return
+            result = future.result()
+            self.completed += 1
+            self._total_render_s += result["render_s"]
+            self._total_queue_wait_s += result["queue_wait_s"]
+
+    async def render(
+        self,
+        template_id: str,
+        language: str,
+        presentation_data: PresentationData,
+    ) -> RenderResult:
+        """Render a presentation in the pool; the caller closes the result's output stream."""
+        self._acquire_slot()
+        try:
+            cf_future = self._executor.submit(
+                _render_job,
+                template_id,
+                language,
+                presentation_data.model_dump(),
+                time.time(),
+                self.mode == "process",
+            )
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        cf_future.add_done_callback(self._release_slot)
+
+        try:
+            raw = await asyncio.wait_for(asyncio.wrap_future(cf_future), timeout=self.job_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # The job may keep running; close its stream when it finishes so nothing leaks
+            cf_future.add_done_callback(_close_abandoned_output)
+            raise
+        output = _as_stream(raw["output"])
+        result = RenderResult(
+            output=output,
+            size_bytes=_stream_size(output),
+            queue_wait_s=raw["queue_wait_s"],
+            render_s=raw["render_s"],
+        )
+        logger.info(
+            f"Render job done: template={template_id}, size={result.size_bytes / 1024:.0f} KB, "
+            f"queue_wait={result.queue_wait_s:.2f}s, render={result.render_s:.2f}s"
+        )
+        return result
+
+    @property
+    def supports_streaming(self) -> bool:
+        """Streamed (slide-by-slide) jobs keep a generator in-process: thread mode only"""
+        return self.mode == "thread"
+
+    def start_streaming(self, template_id: str, language: str) -> "StreamingRender":
+        """
+        Reserve a streaming slot for a deck whose slides will arrive one by one
+        (see StreamingRender). Raises RenderQueueFull when max_streaming jobs are
+        open; render() capacity is not used.
+        """
+        if not self.supports_streaming:
+            raise RuntimeError(f"Streamed rendering needs thread mode (pool mode: {self.mode})")
+        with self._lock:
+            if self._streaming >= self.max_streaming:
+                self.rejected += 1
+                raise RenderQueueFull(
+                    f"Too many streamed renders ({self._streaming}/{self.max_streaming}), "
+                    "retry later"
+                )
+            self._streaming += 1
+        return StreamingRender(self, template_id, language)
+
+    def _release_streaming_slot(self, ok: bool, render_s: float, queue_wait_s: float) -> None:
+        with self._lock:
+            self._streaming -= 1
+            if not ok:
+                self.failed += 1
+                return
+            self.completed += 1
+            self._total_render_s += render_s
+            self._total_queue_wait_s += queue_wait_s
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, counters and average per-job timings"""
+        with self._lock:
+            done = self.completed
+            return {
+                "mode": self.mode,
+                "workers": self.max_workers,
+                "queue_size": self.max_queue,
+                "pending": self._pending,
+                "streaming": self._streaming,
+                "max_streaming": self.max_streaming,
+                "stream_workers": self.stream_workers,
+                "completed": done,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_render_s": (self._total_render_s / done) if done else 0.0,
+                "avg_queue_wait_s": (self._total_queue_wait_s / done) if done else 0.0,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._stream_executor is not None:
+            self._stream_executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_STREAM_DONE = object()
+
+
+class StreamingRender:
+    """
+    One deck rendered while its slides are still being generated.
+
+    start(), add_slide() and finish() only enqueue work and return immediately;
+    a consumer task runs the queued steps one at a time (a python-pptx
+    Presentation is not thread-safe) on the pool's streaming threads, so slide N
+    is built while the model writes slide N+1. The job holds one streaming slot
+    from RenderPool.start_streaming() until finish() or abort().
+
+    render_s is the time spent running build/save steps and queue_wait_s the
+    time those steps waited for a free streaming thread; tail_s is the wall time
+    from finish() to the saved deck, i.e. the render work the LLM stream could
+    not hide.
+    """
+
+    def __init__(self, pool: RenderPool, template_id: str, language: str):
+        self.pool = pool
+        self.template_id = template_id
+        self.language = language
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._generator: Optional[PptxGenerator] = None
+        self._output: Optional[BinaryIO] = None
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self.queue_wait_s = 0.0
+        self.render_s = 0.0
+        self.tail_s = 0.0
+        self.slides_received = 0
+        self.slides_built = 0
+        self._consumer = asyncio.get_running_loop().create_task(self._consume())
+
+    # ---- producer side (event loop) ---------------------------------------
+
+    def start(self, header: PresentationData) -> None:
+        """Begin the deck from its header fields (title slide)"""
+        self._queue.put_nowait(lambda: self._start(header))
+
+    def add_slide(self, slide: SlideContent) -> None:
+        """Queue one slide. The generator validates (and may mutate) it: pass a copy."""
+        self.slides_received += 1
+        self._queue.put_nowait(lambda: self._add(slide))
+
+    async def finish(self) -> RenderResult:
+        """Build what is left, save, and return the rendered deck (the caller closes it)"""
+        finish_called = time.time()
+        render_before = self.render_s
+        self._queue.put_nowait(self._save)
+        self._queue.put_nowait(_STREAM_DONE)
+        try:
+            await asyncio.wait_for(asyncio.shield(self._consumer), timeout=self.pool.job_timeout)
+        except BaseException:
+            self.abort()
+            raise
+        if self._error is not None:
+            raise self._error
+        if self._output is None:
+            raise RuntimeError("Streamed render produced no output")
+        self.tail_s = time.time() - finish_called
+        output, self._output = self._output, None
+        result = RenderResult(
+            output=output,
+            size_bytes=_stream_size(output),
+            queue_wait_s=self.queue_wait_s,
+            render_s=self.render_s,
+        )
+        logger.info(
+            f"Streamed render done: template={self.template_id}, slides={self.slides_built}, "
+            f"size={result.size_bytes / 1024:.0f} KB, queue_wait={self.queue_wait_s:.2f}s, "
+            f"render={self.render_s:.2f}s "
+            f"({self.render_s - render_before:.2f}s after the last slide arrived)"
+        )
+        return result
+
+    def abort(self) -> None:
+        """Drop queued work; the slot is released once a running step returns"""
+        if self._aborted:
+            return
+        self._aborted = True
+        self._queue.put_nowait(_STREAM_DONE)
+
+    # ---- consumer side ----------------------------------------------------
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                step = await self._queue.get()
+                if step is _STREAM_DONE:
+                    break
+                if self._aborted or self._error is not None:
+                    continue
+                try:
+                    await loop.run_in_executor(
+                        self.pool._stream_executor, self._run_step, step, time.perf_counter()
+                    )
+                except BaseException as e:
+                    self._error = e
+        finally:
+            ok = self._error is None and not self._aborted and self._output is not None
+            if not ok and self._output is not None:
+                self._output.close()
+                self._output = None
+            self.pool._release_streaming_slot(ok, self.render_s, self.queue_wait_s)
+
+    def _run_step(self, step: Callable[[], None], submitted_at: float) -> None:
+        # Steps run one at a time, so the timing counters need no lock
+        started_at = time.perf_counter()
+        self.queue_wait_s += started_at - submitted_at
+        try:
+            step()
+        finally:
+            self.render_s += time.perf_counter() - started_at
+
+    def _start(self, header: PresentationData) -> None:
+        self._generator = PptxGenerator(template_id=self.template_id, language=self.language)
+        self._generator.start_deck(header)
+
+    def _add(self, slide: SlideContent) -> None:
+        if self._generator is None:
+            raise RuntimeError("Slide streamed before the deck header")
+        self.slides_built += self._generator.add_slide(slide)
+
+    def _save(self) -> None:
+        if self._generator is None:
+            raise RuntimeError("No slides were streamed")
+        before = len(self._generator.prs.slides)
+        self._output = self._generator.finish_deck_to_stream()
+        self.slides_built += len(self._generator.prs.slides) - before
+
+
+# ============================================================================
+# GLOBAL POOL INSTANCE
+# ============================================================================
+
+_render_pool: Optional[RenderPool] = None
+_pool_lock = Lock()
+
+
+def get_render_pool() -> RenderPool:
+    """Get the process-wide render pool (created on first use from settings)"""
+    global _render_pool
+    if _render_pool is None:
+        with _pool_lock:
+            if _render_pool is None:
+                _render_pool = RenderPool(
+                    max_workers=settings.RENDER_POOL_WORKERS,
+                    max_queue=settings.RENDER_QUEUE_SIZE,
+                    mode=settings.RENDER_POOL_MODE,
+                    job_timeout=settings.RENDER_JOB_TIMEOUT_SECONDS,
+                    max_streaming=settings.RENDER_STREAM_JOBS,
+                    stream_workers=settings.RENDER_STREAM_WORKERS,
+                )
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Shut down the render pool (app shutdown)"""
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False)
+            _render_pool = None
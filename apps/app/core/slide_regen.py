@@ -0,0 +1,182 @@
+"""
+Slide Regen Module
+Plans slide-targeted PPT regeneration: which slides of the previous deck each comment touches.
+
+Comment-driven regeneration used to fetch the previous generation, ignore its
+slides and ask the model for the whole deck again from the markdown, so a
+one-word fix on slide 7 cost a full deck of output tokens. Each comment's anchor
+(comment1) is now located in the previous deck's slides; only the slides it
+touches are sent to the model, as their stored SlideContent JSON, and come back
+as replacements. Every other SlideContent is kept verbatim and the edited ones
+are spliced back in order.
+
+An anchor is either a slide reference ("Slide 7", numbered as in the rendered
+deck, title slide = 1) or text the user selected, matched against a plain-text
+projection of each slide; a slide title close enough to the anchor also counts.
+If any comment cannot be placed on a content slide, no plan is made and the
+caller falls back to the whole-deck regeneration.
+"""
+
+import difflib
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..models.presentation import SlideContent, SlideEditSet
+from ..utils.content_validator import SlideValidator
+
+logger = logging.getLogger("slide_regen")
+
+_SLIDE_REF = re.compile(r"^\s*(?:slide|page|شريحة|الشريحة)\s*(?:no\.?|#)?\s*(\d+)\b", re.IGNORECASE)
+_MARKUP_CHARS = re.compile(r"[*_`#|>•]")
+_WHITESPACE = re.compile(r"\s+")
+
+# Minimum difflib ratio for an anchor to match a slide title it does not contain
+TITLE_MATCH_RATIO = 0.75
+
+
+@dataclass
+class SlideTarget:
+    """One previous slide to edit, with the comments that point at it"""
+    index: int
+    slide: SlideContent
+    comments: List[Dict[str, str]] = field(default_factory=list)
+
+
+def _plain(text: str) -> str:
+    """Lowercased text with markdown markers and whitespace runs collapsed"""
+    return _WHITESPACE.sub(" ", _MARKUP_CHARS.sub(" ", text or "")).strip().lower()
+
+
+def slide_text(slide: SlideContent) -> str:
+    """Everything a user can see (and select) on a rendered slide, as one plain string"""
+    parts: List[str] = [slide.title or "", slide.subtitle or "", slide.content or "", slide.paragraph or ""]
+    for bullet in slide.bullets or []:
+        parts.append(bullet.text)
+        parts.extend(bullet.sub_bullets or [])
+    if slide.table_data:
+        parts.extend(slide.table_data.headers)
+        for row in slide.table_data.rows:
+            parts.extend(row)
+    if slide.chart_data:
+        chart = slide.chart_data
+        parts.extend([chart.title or "", chart.x_axis_label or "", chart.y_axis_label or ""])
+        parts.extend(chart.get_categories())
+        parts.extend(series.name for series in chart.get_series())
+    parts.extend(slide.left_content or [])
+    parts.extend(slide.right_content or [])
+    parts.append(slide.image_caption or "")
+    return _plain(" ".join(p for p in parts if p))
+
+
+def rendered_pages(slides: List[SlideContent]) -> Dict[int, List[int]]:
+    """
+    Page numbers each stored slide renders to. The validator drops orphaned
+    section headers and splits long slides, so stored index and page number
+    drift apart; this replays it on copies (page 1 is the title slide).
+    """
+    validator = SlideValidator()
+    pages: Dict[int, List[int]] = {i: [] for i in range(len(slides))}
+    page = 2
+    for i, slide in enumerate(slides):
+        for _ in validator.push(slide.model_copy(deep=True)):
+            pages[i - 1].append(page)
+            page += 1
+    for _ in validator.close():
+        pages[len(slides) - 1].append(page)
+        page += 1
+    return pages
+
+
+def locate_comment(
+    slides: List[SlideContent],
+    anchor: str,
+    texts: List[str],
+    pages: Dict[int, List[int]],
+) -> Optional[List[int]]:
+    """Indices of the slides an anchor points at, or None if it cannot be placed"""
+    ref = _SLIDE_REF.match(anchor or "")
+    if ref:
+        page = int(ref.group(1))
+        hits = [i for i, slide_pages in pages.items() if page in slide_pages]
+        return hits or None
+
+    needle = _plain(anchor)
+    if not needle:
+        return None
+    hits = [i for i, text in enumerate(texts) if needle in text]
+    if hits:
+        return hits
+
+    best_index, best_ratio = None, 0.0
+    for i, slide in enumerate(slides):
+        ratio = difflib.SequenceMatcher(None, needle, _plain(slide.title)).ratio()
+        if ratio > best_ratio:
+            best_index, best_ratio = i, ratio
+    if best_index is not None and best_ratio >= TITLE_MATCH_RATIO:
+        return [best_index]
+    return None
+
+
+def plan_slide_edits(slides: List[SlideContent], items: List[Dict[str, str]]) -> Optional[List[SlideTarget]]:
+    """
+    Targets (in deck order) for the regen comments, or None when some comment
+    cannot be placed and the whole deck has to be regenerated.
+    """
+    if not slides or not items:
+        return None
+    texts = [slide_text(slide) for slide in slides]
+    pages = rendered_pages(slides)
+    targets: Dict[int, SlideTarget] = {}
+    for item in items:
+        hits = locate_comment(slides, item.get("comment1", ""), texts, pages)
+        if not hits:
+            logger.info(f"Comment anchor not found in previous slides: {item.get('comment1', '')[:60]!r}")
+            return None
+        for i in hits:
+            targets.setdefault(i, SlideTarget(index=i, slide=slides[i])).comments.append(item)
+    plan = [targets[i] for i in sorted(targets)]
+    logger.info(f"Slide regen plan: {len(plan)} of {len(slides)} slides edited")
+    return plan
+
+
+def targets_json(targets: List[SlideTarget]) -> str:
+    """The targeted slides as the JSON the edit prompt embeds (defaults left out)"""
+    return json.dumps(
+        [
+            {"index": t.index, "slide": t.slide.model_dump(exclude_none=True)}
+            for t in targets
+        ],
+        ensure_ascii=False,
+        indent=1,
+    )
+
+
+def apply_slide_edits(
+    slides: List[SlideContent],
+    targets: List[SlideTarget],
+    edits: SlideEditSet,
+) -> List[SlideContent]:
+    """
+    The previous slides with every targeted one replaced by its edit. A target
+    the model left out keeps its previous slide; edits for slides that were not
+    targeted are ignored.
+    """
+    targeted = {t.index for t in targets}
+    replacements: Dict[int, List[SlideContent]] = {}
+    for edit in edits.edits:
+        if edit.index not in targeted:
+            logger.warning(f"Ignoring edit for untargeted slide index {edit.index}")
+            continue
+        replacements[edit.index] = list(edit.slides)
+
+    missing = targeted - set(replacements)
+    if missing:
+        logger.warning(f"No edit returned for slide indices {sorted(missing)}; keeping previous slides")
+
+    merged: List[SlideContent] = []
+    for i, slide in enumerate(slides):
+        merged.extend(replacements.get(i, [slide]))
+    return merged
@@ -0,0 +1,182 @@
+"""
+Supabase Backend Module
+Shared async data/storage backend for the PPT path.
+
+SupabaseService used to build a new synchronous client per request and call it
+from async methods, blocking the event loop on every query, upload and retry
+sleep. The backend wraps a single supabase AsyncClient per worker process (its
+PostgREST and storage HTTP clients keep their connection pools between requests)
+and exposes only the handful of operations the PPT path needs.
+
+StubSupabaseBackend implements the same operations in memory for local runs and
+tests (SUPABASE_BACKEND=stub).
+"""
+
+import asyncio
+import inspect
+import logging
+from threading import Lock
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple, Union
+
+from ..config import settings
+
+logger = logging.getLogger("supabase_backend")
+
+UploadBody = Union[bytes, BinaryIO]
+
+
+class SupabaseBackend:
+    """Async operations over one shared supabase AsyncClient"""
+
+    def __init__(self, url: str, key: str):
+        self.url = url
+        self.key = key
+        self._client = None
+        self._client_lock: Optional[asyncio.Lock] = None
+
+    async def _get_client(self):
+        """Create the AsyncClient on first use (it must be built inside the running loop)"""
+        if self._client is not None:
+            return self._client
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                from supabase import acreate_client
+                self._client = await acreate_client(self.url, self.key)
+                logger.info("Supabase async client created")
+        return self._client
+
+    async def select_one(
+        self,
+        table: str,
+        columns: str,
+        filters: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """First row matching all equality filters, or None"""
+        client = await self._get_client()
+        query = client.table(table).select(columns)
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        response = await query.limit(1).execute()
+        return response.data[0] if response.data else None
+
+    async def insert(self, table: str, payload: Dict[str, Any]) -> None:
+        client = await self._get_client()
+        await client.table(table).insert(payload).execute()
+
+    async def delete(self, table: str, filters: Dict[str, Any]) -> None:
+        """Delete rows matching all equality filters"""
+        client = await self._get_client()
+        query = client.table(table).delete()
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        await query.execute()
+
+    async def upload(self, bucket: str, key: str, body: UploadBody, file_options: Dict[str, str]) -> None:
+        client = await self._get_client()
+        await client.storage.from_(bucket).upload(key, body, file_options)
+
+    async def download(self, bucket: str, key: str) -> bytes:
+        client = await self._get_client()
+        return await client.storage.from_(bucket).download(key)
+
+    async def remove(self, bucket: str, keys: List[str]) -> None:
+        client = await self._get_client()
+        await client.storage.from_(bucket).remove(keys)
+
+    async def public_url(self, bucket: str, key: str) -> str:
+        client = await self._get_client()
+        url = client.storage.from_(bucket).get_public_url(key)
+        # Sync in older storage3 releases, a coroutine in newer ones
+        return await url if inspect.isawaitable(url) else url
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        if client is None:
+            return
+        try:
+            if client._postgrest is not None:
+                await client._postgrest.aclose()
+            if client._storage is not None:
+                await client._storage.__aexit__(None, None, None)
+        except Exception as e:
+            logger.warning(f"Supabase client close failed: {e}")
+
+
+class StubSupabaseBackend:
+    """In-memory stand-in for SupabaseBackend (tables as row lists, storage as a dict)"""
+
+    def __init__(self, url: str = "http://stub.local"):
+        self.url = url.rstrip("/")
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+
+    async def select_one(
+        self,
+        table: str,
+        columns: str,
+        filters: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        wanted = [c.strip() for c in columns.split(",")]
+        for row in self.tables.get(table, []):
+            if all(row.get(column) == value for column, value in filters.items()):
+                return row if columns.strip() == "*" else {c: row.get(c) for c in wanted}
+        return None
+
+    async def insert(self, table: str, payload: Dict[str, Any]) -> None:
+        self.tables.setdefault(table, []).append(dict(payload))
+
+    async def delete(self, table: str, filters: Dict[str, Any]) -> None:
+        self.tables[table] = [
+            row for row in self.tables.get(table, [])
+            if not all(row.get(column) == value for column, value in filters.items())
+        ]
+
+    async def upload(self, bucket: str, key: str, body: UploadBody, file_options: Dict[str, str]) -> None:
+        self.objects[(bucket, key)] = body if isinstance(body, bytes) else body.read()
+
+    async def download(self, bucket: str, key: str) -> bytes:
+        if (bucket, key) not in self.objects:
+            raise FileNotFoundError(f"{bucket}/{key}")
+        return self.objects[(bucket, key)]
+
+    async def remove(self, bucket: str, keys: List[str]) -> None:
+        for key in keys:
+            self.objects.pop((bucket, key), None)
+
+    async def public_url(self, bucket: str, key: str) -> str:
+        return f"{self.url}/storage/v1/object/public/{bucket}/{key}"
+
+    async def close(self) -> None:
+        return None
+
+
+# ============================================================================
+# GLOBAL BACKEND INSTANCE
+# ============================================================================
+
+_backend: Optional[Union[SupabaseBackend, StubSupabaseBackend]] = None
+_backend_lock = Lock()
+
+
+def get_supabase_backend() -> Union[SupabaseBackend, StubSupabaseBackend]:
+    """Get the per-process backend (SUPABASE_BACKEND selects supabase or stub)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if settings.SUPABASE_BACKEND == "stub":
+                    _backend = StubSupabaseBackend(settings.SUPABASE_URL)
+                    logger.info("Using in-memory Supabase stub backend")
+                else:
+                    _backend = SupabaseBackend(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return _backend
+
+
+async def close_supabase_backend() -> None:
+    """Close the shared client's connection pools (app shutdown)"""
+    global _backend
+    backend, _backend = _backend, None
+    if backend is not None:
+        await backend.close()
@@ -1,23 +1,29 @@
+import asyncio
+import copy
 import logging
 import os
 import json
-from typing import Any, Dict, List, Optional
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Dict, List, Optional, Union
 from datetime import datetime
 
-from supabase import Client, create_client
 from postgrest.exceptions import APIError
 from ..config import settings
+from .generation_repository import get_generation_repository
+from .markdown_versions import adecode_stored, snapshot_key
+from .supabase_backend import get_supabase_backend
 
 logger = logging.getLogger("supabase_service")
 
 
 class SupabaseService:
     """
-    Service for all Supabase database and storage operations
+    Service for all Supabase database and storage operations.
+    Cheap to construct: all instances share the per-process async backend.
     """
     
     def __init__(self):
-        """Initialize Supabase client with validation"""
+        """Validate settings and attach the shared Supabase backend"""
         if not settings.SUPABASE_URL or not settings.SUPABASE_KEY:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be configured")
         
@@ -25,10 +31,11 @@ class SupabaseService:
         if not settings.SUPABASE_URL.startswith(('http://', 'https://')):
             raise ValueError(f"Invalid SUPABASE_URL format: {settings.SUPABASE_URL}")
         
-        self.client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        self.backend = get_supabase_backend()
         self.word_table = os.getenv("WORD_TABLE", "word_gen")
         self.ppt_table = os.getenv("PPT_TABLE", "ppt_gen")
         self.ppt_bucket = os.getenv("PPT_BUCKET", "ppt")
+        self.word_bucket = os.getenv("SUPABASE_WORD_BUCKET", "word")
         
         logger.info("SupabaseService initialized")
         logger.info(f"   Word Table: {self.word_table}")
@@ -44,28 +51,35 @@ class SupabaseService:
         max_retries: int = 3
     ) -> str:
         """
-        Fetch markdown content from word_gen table with retry logic
+        Fetch markdown content from word_gen table (through the generation repository cache)
         """
         if not uuid_str or not gen_id:
             raise ValueError("UUID and Gen ID are required")
         
+        return await get_generation_repository().aget_markdown(
+            uuid_str, gen_id,
+            lambda: self._load_markdown_content(uuid_str, gen_id, max_retries)
+        )
+    
+    async def _load_markdown_content(self, uuid_str: str, gen_id: str, max_retries: int) -> str:
+        """Fetch markdown content from word_gen table with retry logic"""
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"Fetching markdown (attempt {attempt}/{max_retries}): uuid={uuid_str}, gen_id={gen_id}")
                 
-                response = (
-                    self.client.table(self.word_table)
-                    .select("generated_markdown")
-                    .eq("uuid", uuid_str)
-                    .eq("gen_id", gen_id)
-                    .single()
-                    .execute()
+                row = await self.backend.select_one(
+                    self.word_table,
+                    "generated_markdown",
+                    {"uuid": uuid_str, "gen_id": gen_id},
                 )
                 
-                if not response.data:
+                if not row:
                     raise RuntimeError(f"No data found for uuid={uuid_str}, gen_id={gen_id}")
                 
-                markdown = response.data.get("generated_markdown")
+                markdown = await adecode_stored(
+                    row.get("generated_markdown"),
+                    lambda sha: self._load_markdown_snapshot(uuid_str, sha),
+                )
                 
                 if not markdown:
                     raise RuntimeError(f"Markdown field is empty for uuid={uuid_str}, gen_id={gen_id}")
@@ -76,7 +90,6 @@ class SupabaseService:
             except APIError as e:
                 logger.warning(f"Supabase API error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -90,6 +103,15 @@ class SupabaseService:
         
         raise RuntimeError("Failed to fetch markdown after all retries")
     
+    async def _load_markdown_snapshot(self, uuid_str: str, sha: str) -> Optional[str]:
+        """Immutable snapshot a delta-encoded version is built on (None if unreadable)"""
+        try:
+            data = await self.backend.download(self.word_bucket, snapshot_key(uuid_str, sha))
+        except Exception as e:
+            logger.warning(f"Markdown snapshot download failed for uuid={uuid_str}, sha={sha}: {e}")
+            return None
+        return data.decode("utf-8") if data is not None else None
+    
     # ==================== INITIAL GENERATION ====================
     
     async def save_generation_record(
@@ -129,7 +151,8 @@ class SupabaseService:
                     "created_at": datetime.utcnow().isoformat()
                 }
                 
-                self.client.table(self.ppt_table).insert(payload).execute()
+                await self.backend.insert(self.ppt_table, payload)
+                _cache_ppt_content(uuid_str, gen_id, ppt_genid, generated_content, template_id)
                 logger.info(f"✅ Generation record saved: {ppt_genid}")
                 logger.info(f"   Template: {template_id}")
                 logger.info(f"   Language: {language}")
@@ -139,7 +162,6 @@ class SupabaseService:
             except APIError as e:
                 logger.warning(f"Supabase API error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -154,6 +176,13 @@ class SupabaseService:
         raise RuntimeError("Failed to save generation record after all retries")
 
     
+    async def delete_generation_record(self, uuid_str: str, gen_id: str, ppt_genid: str) -> None:
+        """Roll back a ppt_gen insert (e.g. when the concurrent PPTX upload failed)"""
+        await self.backend.delete(self.ppt_table, {"uuid": uuid_str, "gen_id": gen_id, "ppt_genid": ppt_genid})
+        get_generation_repository().invalidate_ppt_content(uuid_str, gen_id, ppt_genid)
+        logger.info(f"Generation record rolled back: {ppt_genid}")
+
+    
     # ==================== REGENERATION ====================
     
     async def save_regeneration_record(
@@ -192,7 +221,8 @@ class SupabaseService:
                     "created_at": datetime.utcnow().isoformat()
                 }
                 
-                self.client.table(self.ppt_table).insert(payload).execute()
+                await self.backend.insert(self.ppt_table, payload)
+                _cache_ppt_content(uuid_str, gen_id, ppt_genid, generated_content, generated_content.get("template_id"))
                 logger.info(f"Regeneration record saved: {ppt_genid}")
                 
                 return ppt_genid
@@ -200,7 +230,6 @@ class SupabaseService:
             except APIError as e:
                 logger.warning(f"Supabase API error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -224,29 +253,40 @@ class SupabaseService:
         max_retries: int = 3
     ) -> Dict[str, Any]:
         """
-        Retrieve generation content from ppt_gen table with retry logic
+        Retrieve generation content from ppt_gen table (through the generation repository cache)
         """
         if not all([uuid_str, gen_id, ppt_genid]):
             raise ValueError("UUID, Gen ID, and PPT Gen ID are required")
         
+        content = await get_generation_repository().aget_ppt_content(
+            uuid_str, gen_id, ppt_genid,
+            lambda: self._load_generation_content(uuid_str, gen_id, ppt_genid, max_retries)
+        )
+        # Callers may modify the content; keep the cached copy pristine
+        return copy.deepcopy(content)
+    
+    async def _load_generation_content(
+        self,
+        uuid_str: str,
+        gen_id: str,
+        ppt_genid: str,
+        max_retries: int
+    ) -> Dict[str, Any]:
+        """Retrieve generation content from ppt_gen table with retry logic"""
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"Fetching generation content (attempt {attempt}/{max_retries}): ppt_genid={ppt_genid}")
                 
-                response = (
-                    self.client.table(self.ppt_table)
-                    .select("generated_content, ppt_template")
-                    .eq("uuid", uuid_str)
-                    .eq("gen_id", gen_id)
-                    .eq("ppt_genid", ppt_genid)
-                    .single()
-                    .execute()
+                row = await self.backend.select_one(
+                    self.ppt_table,
+                    "generated_content, ppt_template",
+                    {"uuid": uuid_str, "gen_id": gen_id, "ppt_genid": ppt_genid},
                 )
                 
-                if not response.data:
+                if not row:
                     raise RuntimeError(f"No content found for ppt_genid={ppt_genid}")
                 
-                content_json = response.data.get("generated_content", "{}")
+                content_json = row.get("generated_content", "{}")
                 
                 # Parse JSON string
                 if isinstance(content_json, str):
@@ -255,8 +295,8 @@ class SupabaseService:
                     content = content_json
                 
                 # Add template_id from ppt_template field
-                if "template_id" not in content and response.data.get("ppt_template"):
-                    content["template_id"] = response.data["ppt_template"]
+                if "template_id" not in content and row.get("ppt_template"):
+                    content["template_id"] = row["ppt_template"]
                 
                 logger.info(f"Retrieved generation content")
                 return content
@@ -264,7 +304,6 @@ class SupabaseService:
             except APIError as e:
                 logger.warning(f"Supabase API error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -280,60 +319,75 @@ class SupabaseService:
     
     # ==================== FILE UPLOAD ====================
     
+    def _pptx_key(self, uuid_str: str, gen_id: str, ppt_genid: str) -> str:
+        return f"{uuid_str}/{gen_id}/{ppt_genid}.pptx"
+    
+    async def pptx_public_url(self, uuid_str: str, gen_id: str, ppt_genid: str) -> str:
+        """Public URL upload_pptx will return for this deck (known before the upload finishes)"""
+        return await self.backend.public_url(self.ppt_bucket, self._pptx_key(uuid_str, gen_id, ppt_genid))
+    
     async def upload_pptx(
         self, 
-        local_path: str, 
+        pptx: Union[str, BinaryIO], 
         uuid_str: str, 
         gen_id: str, 
         ppt_genid: str,
         max_retries: int = 3
     ) -> str:
         """
-        Upload PPTX file to Supabase storage with retry logic
+        Upload PPTX to Supabase storage with retry logic.
+        `pptx` is a local file path or a seekable stream (e.g. from generate_to_stream).
         """
-        if not all([local_path, uuid_str, gen_id, ppt_genid]):
+        if not all([pptx, uuid_str, gen_id, ppt_genid]):
             raise ValueError("All parameters are required")
         
-        if not os.path.exists(local_path):
-            raise FileNotFoundError(f"PPTX file not found: {local_path}")
+        if isinstance(pptx, str):
+            if not os.path.exists(pptx):
+                raise FileNotFoundError(f"PPTX file not found: {pptx}")
+            file_size = os.path.getsize(pptx)
+        else:
+            file_size = pptx.seek(0, 2)
+            pptx.seek(0)
         
         # Check file size
-        file_size = os.path.getsize(local_path)
         logger.info(f"📊 File size: {file_size / 1024 / 1024:.2f} MB")
         
         if file_size > 100 * 1024 * 1024:  # 100 MB limit
             raise ValueError(f"File too large: {file_size / 1024 / 1024:.2f} MB (max 100 MB)")
         
         # Create storage path
-        remote_key = f"{uuid_str}/{gen_id}/{ppt_genid}.pptx"
+        remote_key = self._pptx_key(uuid_str, gen_id, ppt_genid)
         
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"☁️ Uploading PPTX (attempt {attempt}/{max_retries}) to bucket={self.ppt_bucket}, key={remote_key}")
                 
-                # Read file
-                with open(local_path, "rb") as file_obj:
-                    file_data = file_obj.read()
+                file_data = _upload_body(pptx)
                 
                 # Remove existing file if present
                 try:
-                    self.client.storage.from_(self.ppt_bucket).remove([remote_key])
+                    await self.backend.remove(self.ppt_bucket, [remote_key])
                     logger.info(f"   Removed existing file: {remote_key}")
                 except Exception:
                     pass  # File doesn't exist, that's fine
                 
                 # Upload new file
-                self.client.storage.from_(self.ppt_bucket).upload(
-                    remote_key,
-                    file_data,
-                    {
-                        "content-type": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                        "upsert": "true"
-                    }
-                )
+                try:
+                    await self.backend.upload(
+                        self.ppt_bucket,
+                        remote_key,
+                        file_data,
+                        {
+                            "content-type": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                            "upsert": "true"
+                        }
+                    )
+                finally:
+                    if hasattr(file_data, "close"):
+                        file_data.close()
                 
                 # Get public URL
-                public_url = self.client.storage.from_(self.ppt_bucket).get_public_url(remote_key)
+                public_url = await self.backend.public_url(self.ppt_bucket, remote_key)
                 
                 logger.info(f"PPTX uploaded: {remote_key}")
                 logger.info(f"   Public URL: {public_url}")
@@ -343,7 +397,6 @@ class SupabaseService:
             except Exception as e:
                 logger.warning(f"Upload error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -372,21 +425,17 @@ class SupabaseService:
             try:
                 logger.info(f" Fetching proposal URL (attempt {attempt}/{max_retries}): ppt_genid={ppt_genid}")
                 
-                response = (
-                    self.client.table(self.ppt_table)
-                    .select("proposal_ppt")
-                    .eq("uuid", uuid_str)
-                    .eq("gen_id", gen_id)
-                    .eq("ppt_genid", ppt_genid)
-                    .single()
-                    .execute()
+                row = await self.backend.select_one(
+                    self.ppt_table,
+                    "proposal_ppt",
+                    {"uuid": uuid_str, "gen_id": gen_id, "ppt_genid": ppt_genid},
                 )
                 
-                if not response.data:
+                if not row:
                     logger.warning(f"No record found for ppt_genid={ppt_genid}")
                     return None
                 
-                url = response.data.get("proposal_ppt")
+                url = row.get("proposal_ppt")
                 
                 if url:
                     logger.info(f"Proposal URL found")
@@ -398,7 +447,6 @@ class SupabaseService:
             except APIError as e:
                 logger.warning(f"Supabase API error on attempt {attempt}: {e}")
                 if attempt < max_retries:
-                    import asyncio
                     wait_time = 2 ** attempt
                     logger.info(f"   Waiting {wait_time}s before retry...")
                     await asyncio.sleep(wait_time)
@@ -415,6 +463,37 @@ class SupabaseService:
 
 # ==================== STANDALONE FUNCTIONS ====================
 
+def _cache_ppt_content(
+    uuid_str: str,
+    gen_id: str,
+    ppt_genid: str,
+    generated_content: Dict[str, Any],
+    template_id: Optional[str]
+) -> None:
+    """Seed the repository with a just-inserted ppt_gen row, as get_generation_content would read it"""
+    content = json.loads(json.dumps(generated_content))
+    if "template_id" not in content and template_id:
+        content["template_id"] = template_id
+    get_generation_repository().put_ppt_content(uuid_str, gen_id, ppt_genid, content)
+
+
+def _upload_body(pptx: Union[str, BinaryIO]) -> Union[bytes, BinaryIO]:
+    """
+    Request body for a storage upload. storage3 streams BufferedReader bodies but
+    treats other file objects as paths, so a spooled stream that has spilled to disk
+    is re-opened as a reader on the same (anonymous) file instead of being read into memory.
+    """
+    if isinstance(pptx, str):
+        with open(pptx, "rb") as file_obj:
+            return file_obj.read()
+    pptx.seek(0)
+    if isinstance(pptx, SpooledTemporaryFile) and pptx._rolled:
+        reader = os.fdopen(os.dup(pptx.fileno()), "rb")
+        reader.seek(0)
+        return reader
+    return pptx.read()
+
+
 async def get_proposal_url(uuid_str: str, gen_id: str, ppt_genid: str) -> Optional[str]:
     """Standalone function for API endpoint"""
     service = SupabaseService()
@@ -141,3 +141,25 @@ class PresentationData(BaseModel):
 
     class Config:
         extra = "ignore"
+
+
+# ---------- Slide edits (regeneration) ----------
+
+class SlideEdit(BaseModel):
+    """Replacement for one targeted slide of the previous deck"""
+    index: int = Field(..., description="Index of the targeted slide, exactly as given in the request")
+    slides: List[SlideContent] = Field(
+        default_factory=list,
+        description="The edited slide; more than one only if the feedback asks to split it, none to remove it"
+    )
+
+    class Config:
+        extra = "ignore"
+
+
+class SlideEditSet(BaseModel):
+    """Edited slides returned by a slide-targeted regeneration"""
+    edits: List[SlideEdit] = Field(default_factory=list, description="One entry per targeted slide")
+
+    class Config:
+        extra = "ignore"
@@ -0,0 +1,124 @@
+"""
+Asset Store Module
+Slide-resolution variants of template backgrounds and icons, stored in CACHE_DIR.
+
+Template backgrounds ship at 2500px and icons at 460px, but a background only ever
+covers one slide and the largest icon box is ~1.2in. Variants are downscaled to the
+template's slide size (constraints.json) at ASSET_VARIANT_DPI and written once per
+source content, so they are reused across restarts. A variant is only used when it
+is actually smaller than its source.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger("asset_store")
+
+# Icon box size (inches) used when element_positions has no icon sizes
+DEFAULT_ICON_INCHES = 1.2
+
+
+def _max_icon_inches(element_positions: Dict[str, Any]) -> float:
+    """Largest icon width/height (inches) declared anywhere in element_positions"""
+    sizes = []
+
+    def walk(node: Any, is_icon: bool = False) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                key_is_icon = is_icon or 'icon' in str(key)
+                if key_is_icon and key in ('width', 'height') and isinstance(value, (int, float)):
+                    sizes.append(float(value))
+                walk(value, key_is_icon)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, is_icon)
+
+    walk(element_positions)
+    return max(sizes) if sizes else DEFAULT_ICON_INCHES
+
+
+def _variant_path(template_id: str, source: Path, blob: bytes, box: Tuple[int, int]) -> Path:
+    """Content-addressed cache path: a changed source never hits a stale variant"""
+    digest = hashlib.sha1(blob).hexdigest()[:12]
+    name = f"{source.stem}_{box[0]}x{box[1]}_{digest}{source.suffix.lower()}"
+    return Path(settings.CACHE_DIR) / "assets" / template_id / name
+
+
+def build_variant(template_id: str, source: Path, box: Tuple[int, int]) -> Optional[Path]:
+    """
+    Downscale `source` to fit inside `box` (pixels) and cache it.
+    Returns the variant path, or None when the source should be used as-is.
+    """
+    try:
+        from PIL import Image
+        blob = source.read_bytes()
+        out_path = _variant_path(template_id, source, blob, box)
+        if out_path.exists():
+            return out_path if out_path.stat().st_size < len(blob) else None
+
+        img = Image.open(source)
+        if img.width <= box[0] and img.height <= box[1]:
+            return None
+        img.thumbnail(box, Image.LANCZOS)
+
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+        if source.suffix.lower() in ('.jpg', '.jpeg'):
+            img.convert('RGB').save(tmp_path, 'JPEG', quality=settings.ASSET_JPEG_QUALITY, optimize=True)
+        else:
+            img.save(tmp_path, 'PNG', optimize=True)
+        tmp_path.replace(out_path)
+
+        return out_path if out_path.stat().st_size < len(blob) else None
+    except Exception as e:
+        logger.debug(f"Variant failed for {source}: {e}")
+        return None
+
+
+def build_asset_variants(
+    template_id: str,
+    template_dir: Path,
+    constraints: Dict[str, Any],
+    element_positions: Dict[str, Any],
+    background_paths: Iterable[str],
+    icon_paths: Iterable[str],
+) -> Dict[str, str]:
+    """
+    Build (or reuse) slide-resolution variants for a template's backgrounds and icons.
+    Returns {template-relative source path: absolute variant path}.
+    """
+    dpi = settings.ASSET_VARIANT_DPI
+    layout = constraints.get('layout', {})
+    slide_box = (
+        int(float(layout.get('slide_width', 13.333)) * dpi),
+        int(float(layout.get('slide_height', 7.5)) * dpi),
+    )
+    icon_px = int(_max_icon_inches(element_positions) * dpi)
+    icon_box = (icon_px, icon_px)
+
+    variants: Dict[str, str] = {}
+    source_bytes = variant_bytes = 0
+    jobs = [(p, slide_box) for p in sorted(set(background_paths))]
+    jobs += [(p, icon_box) for p in sorted(set(icon_paths))]
+    for rel_path, box in jobs:
+        source = template_dir / rel_path
+        if not source.is_file():
+            continue
+        variant = build_variant(template_id, source, box)
+        if variant is None:
+            continue
+        variants[rel_path] = str(variant)
+        source_bytes += source.stat().st_size
+        variant_bytes += variant.stat().st_size
+
+    if variants:
+        logger.info(
+            f"  Asset variants: {len(variants)}/{len(jobs)} downscaled "
+            f"(backgrounds {slide_box[0]}x{slide_box[1]}, icons {icon_px}px), "
+            f"{source_bytes / 1024:.0f} KB -> {variant_bytes / 1024:.0f} KB"
+        )
+    return variants
@@ -25,6 +25,29 @@ def _chart_data_to_dict(chart_data) -> Dict:
         return chart_data.dict()
     return {}
 
+class PrebuiltChartData(CategoryChartData):
+    """
+    CategoryChartData whose chart XML and embedded Excel workbook can be rendered
+    ahead of time (prebuild), so add_chart() only has to attach the finished parts.
+    """
+
+    _prebuilt: Optional[Tuple[XL_CHART_TYPE, bytes, bytes]] = None
+
+    def prebuild(self, chart_type: XL_CHART_TYPE) -> None:
+        self._prebuilt = (chart_type, super().xml_bytes(chart_type), super().xlsx_blob)
+
+    def xml_bytes(self, chart_type):
+        if self._prebuilt and self._prebuilt[0] == chart_type:
+            return self._prebuilt[1]
+        return super().xml_bytes(chart_type)
+
+    @property
+    def xlsx_blob(self):
+        if self._prebuilt:
+            return self._prebuilt[2]
+        return super().xlsx_blob
+
+
 class ChartService:
     """Service for creating native PowerPoint charts - fully dynamic from constraints.json"""
     
@@ -70,52 +93,79 @@ class ChartService:
         with open(path, "r", encoding="utf-8") as file:
             return json.load(file)
     
+    def build_chart_data(self, chart_data: Dict) -> Optional[Tuple[XL_CHART_TYPE, CategoryChartData]]:
+        """Build the python-pptx chart type and CategoryChartData for a chart dict"""
+        chart_type = chart_data.get('chart_type', 'column')
+        
+        # Extract data dynamically
+        categories, series_list = self._extract_chart_data(chart_data)
+        
+        if not categories or not series_list:
+            logger.error(f"❌ Chart data extraction failed!")
+            return None
+        
+        if len(categories) == 0 or len(series_list) == 0:
+            logger.error(f"❌ Chart data empty!")
+            return None
+        
+        # Map chart types
+        chart_type_map = {
+            'column': XL_CHART_TYPE.COLUMN_CLUSTERED,
+            'bar': XL_CHART_TYPE.BAR_CLUSTERED,
+            'line': XL_CHART_TYPE.LINE_MARKERS,
+            'pie': XL_CHART_TYPE.PIE,
+            'area': XL_CHART_TYPE.AREA
+        }
+        
+        xl_chart_type = chart_type_map.get(chart_type, XL_CHART_TYPE.COLUMN_CLUSTERED)
+        
+        # Create chart data object
+        chart_data_obj = PrebuiltChartData()
+        chart_data_obj.categories = categories
+        
+        # Add all series
+        for series_info in series_list:
+            chart_data_obj.add_series(series_info['name'], series_info['values'])
+        
+        return xl_chart_type, chart_data_obj
+    
+    def prepare_chart(self, chart_data) -> Optional[Tuple[XL_CHART_TYPE, CategoryChartData]]:
+        """
+        Build chart data and pre-render its chart XML and embedded workbook.
+        Touches no slide, so it can run on a worker thread ahead of slide assembly.
+        """
+        data = _chart_data_to_dict(chart_data)
+        if not data:
+            return None
+        built = self.build_chart_data(data)
+        if built is None:
+            return None
+        xl_chart_type, chart_data_obj = built
+        chart_data_obj.prebuild(xl_chart_type)
+        return built
+    
     def add_native_chart(
         self,
         slide,
         chart_data: Dict,
         position: Dict,
         size: Dict,
-        background_rgb: Optional[Tuple[int, int, int]] = None
+        background_rgb: Optional[Tuple[int, int, int]] = None,
+        prepared: Optional[Tuple[XL_CHART_TYPE, CategoryChartData]] = None
     ):
         """Add native PowerPoint chart - fully dynamic styling"""
         try:
             chart_type = chart_data.get('chart_type', 'column')
             title = chart_data.get('title', '')
             
-            # Extract data dynamically
-            categories, series_list = self._extract_chart_data(chart_data)
-            
-            if not categories or not series_list:
-                logger.error(f"❌ Chart data extraction failed!")
-                return None
-            
-            if len(categories) == 0 or len(series_list) == 0:
-                logger.error(f"❌ Chart data empty!")
+            built = prepared or self.build_chart_data(chart_data)
+            if built is None:
                 return None
+            xl_chart_type, chart_data_obj = built
             
             logger.info(f"✓ Creating {chart_type} chart")
-            logger.info(f"   Categories: {categories}")
-            logger.info(f"   Series count: {len(series_list)}")
-            
-            # Map chart types
-            chart_type_map = {
-                'column': XL_CHART_TYPE.COLUMN_CLUSTERED,
-                'bar': XL_CHART_TYPE.BAR_CLUSTERED,
-                'line': XL_CHART_TYPE.LINE_MARKERS,
-                'pie': XL_CHART_TYPE.PIE,
-                'area': XL_CHART_TYPE.AREA
-            }
-            
-            xl_chart_type = chart_type_map.get(chart_type, XL_CHART_TYPE.COLUMN_CLUSTERED)
-            
-            # Create chart data object
-            chart_data_obj = CategoryChartData()
-            chart_data_obj.categories = categories
-            
-            # Add all series
-            for series_info in series_list:
-                chart_data_obj.add_series(series_info['name'], series_info['values'])
+            logger.info(f"   Categories: {[c.label for c in chart_data_obj.categories]}")
+            logger.info(f"   Series count: {len(chart_data_obj)}")
             
             # Add chart to slide
             x = Inches(position['left'])
@@ -184,10 +234,12 @@ class ChartService:
         top: float,
         width: float,
         height: float,
+        prepared: Optional[Tuple[XL_CHART_TYPE, CategoryChartData]] = None,
     ):
         """
         Create a chart on the slide (API used by pptx_generator).
         Accepts position/size in inches and ChartData model or dict.
+        `prepared` is the result of prepare_chart() when chart XML was pre-rendered.
         """
         data = _chart_data_to_dict(chart_data)
         if not data:
@@ -195,7 +247,7 @@ class ChartService:
             return None
         position = {"left": left, "top": top}
         size = {"width": width, "height": height}
-        return self.add_native_chart(slide, data, position, size)
+        return self.add_native_chart(slide, data, position, size, prepared=prepared)
     
     def _extract_chart_data(self, chart_data: Dict) -> Tuple[List, List[Dict]]:
         """Dynamically extract chart data from multiple formats"""
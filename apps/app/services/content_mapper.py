@@ -1,5 +1,5 @@
 from typing import List, Dict, Optional, Tuple
-from ..models.presentation import SlideContent, BulletPoint, PresentationData
+from ..models.presentation import SlideContent, BulletPoint, PresentationData, TableData
 from ..utils.markdown_parser import MarkdownParser
 
 
@@ -71,9 +71,10 @@ class ContentMapper:
         )
     
     def _create_content_slide(self, title: str, content: List[Dict]) -> SlideContent:
-        """Create standard content slide with bullets"""
+        """Create standard content slide with bullets (the first table becomes table_data)"""
         bullets = []
         paragraph_text = []
+        table_data = None
         
         for item in content:
             if item['type'] in ['bullet', 'numbered']:
@@ -89,6 +90,12 @@ class ContentMapper:
                     text=item['text'],
                     sub_bullets=None
                 ))
+            elif item['type'] == 'table':
+                if table_data is None and item['rows']:
+                    table_data = TableData(headers=item['headers'], rows=item['rows'])
+                else:
+                    # A slide holds one table; further tables stay text as before
+                    paragraph_text.extend(self._table_lines(item))
         
         # Combine paragraphs
         content_text = ' '.join(paragraph_text) if paragraph_text else None
@@ -97,9 +104,16 @@ class ContentMapper:
             layout_type='content',
             title=title,
             content=content_text,
-            bullets=bullets if bullets else None
+            bullets=bullets if bullets else None,
+            table_data=table_data
         )
     
+    @staticmethod
+    def _table_lines(item: Dict) -> List[str]:
+        """Markdown row lines of a parsed table item (its paragraph form before tables were parsed)"""
+        rows = ([item['headers']] if item['headers'] else []) + item['rows']
+        return ['| ' + ' | '.join(row) + ' |' for row in rows]
+    
     def _create_section_header(self, title: str, content: List[Dict]) -> SlideContent:
         """Create section header slide"""
         # Extract first paragraph as subtitle
@@ -134,6 +148,15 @@ class ContentMapper:
                     left_items.append(text)
                 else:
                     right_items.append(text)
+            
+            elif item['type'] == 'table':
+                if len(item['headers']) == 2 and all(len(row) == 2 for row in item['rows']):
+                    # A two-column table is already the comparison
+                    left_items.extend(row[0] for row in item['rows'])
+                    right_items.extend(row[1] for row in item['rows'])
+                else:
+                    target = left_items if current_side == 'left' else right_items
+                    target.extend(self._table_lines(item))
         
         # If detection failed, split evenly
         if not right_items and len(left_items) > 4:
@@ -0,0 +1,155 @@
+"""
+Icon Tint Cache Module
+Process-wide bounded LRU of tinted icon PNG bytes.
+
+Icons are tinted to the slide foreground color (dark slide → light icon, light
+slide → dark icon). A template only has two foreground colors, so every icon is
+tinted at most twice per process; compiled templates prewarm the cache for all of
+their icons and colors, and slide building hands the bytes to python-pptx as an
+in-memory stream without touching the filesystem.
+"""
+
+import logging
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger("icon_tint_cache")
+
+TintKey = Tuple[str, int, int, str]
+
+
+def tint_icon_png(icon_path: Path, rgb: Tuple[int, int, int]) -> Optional[bytes]:
+    """
+    Treat PNG as alpha mask: replace RGB with the tint color, preserve alpha.
+    Returns the tinted PNG bytes, or None if tinting fails. Pure function, safe to
+    call from worker threads.
+    """
+    try:
+        from PIL import Image
+        r, g, b = rgb
+        img = Image.open(icon_path).convert("RGBA")
+        w, h = img.size
+        # Replace RGB with tint, keep original alpha (alpha-mask behavior)
+        r_band = Image.new("L", (w, h), r)
+        g_band = Image.new("L", (w, h), g)
+        b_band = Image.new("L", (w, h), b)
+        _, _, _, a_band = img.split()
+        tinted = Image.merge("RGBA", (r_band, g_band, b_band, a_band))
+        out = BytesIO()
+        tinted.save(out, "PNG")
+        return out.getvalue()
+    except Exception as e:
+        logger.debug(f"Icon tint failed {icon_path}: {e}")
+        return None
+
+
+def normalize_tint(tint_hex: str) -> Optional[str]:
+    """'#0d2026' -> '0D2026'; None if not a 6-digit hex color"""
+    hex_clean = (tint_hex or "").lstrip("#").upper()
+    if len(hex_clean) != 6:
+        return None
+    try:
+        int(hex_clean, 16)
+    except ValueError:
+        return None
+    return hex_clean
+
+
+class TintedIconCache:
+    """
+    Thread-safe LRU of tinted icon bytes keyed by (source file path, mtime, size,
+    tint hex).
+
+    Source paths are absolute (template dir or content-addressed asset variant),
+    so entries of different templates never collide. The file's mtime and size are
+    part of the key, so an icon edited in place is tinted afresh on its next use
+    (the stale entry ages out of the LRU).
+    """
+
+    _instance: Optional['TintedIconCache'] = None
+    _lock = Lock()
+
+    def __new__(cls):
+        """Singleton pattern for global cache access"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._entries: "OrderedDict[TintKey, bytes]" = OrderedDict()
+        self._entries_lock = Lock()
+        self.max_entries = max(1, int(settings.ICON_TINT_CACHE_SIZE))
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    def get(self, source_path: Path, tint_hex: str) -> Optional[bytes]:
+        """Tinted PNG bytes for an icon file, tinting on a miss. None if tinting fails."""
+        tint = normalize_tint(tint_hex)
+        if tint is None:
+            return None
+        try:
+            stat = Path(source_path).stat()
+        except OSError as e:
+            logger.debug(f"Icon not readable {source_path}: {e}")
+            return None
+        key = (str(source_path), stat.st_mtime_ns, stat.st_size, tint)
+        with self._entries_lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+            self.misses += 1
+
+        # Tint outside the lock; a concurrent miss on the same key just tints twice
+        rgb = (int(tint[0:2], 16), int(tint[2:4], 16), int(tint[4:6], 16))
+        png = tint_icon_png(source_path, rgb)
+        if png is None:
+            return None
+        with self._entries_lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return png
+
+    def prewarm(self, source_paths: Iterable[Path], tints: Iterable[str]) -> int:
+        """Tint every icon in every color; returns the number of entries now cached"""
+        tints = [t for t in {normalize_tint(t) for t in tints} if t]
+        for source_path in source_paths:
+            for tint in tints:
+                self.get(source_path, tint)
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._entries_lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache occupancy"""
+        total = self.hits + self.misses
+        with self._entries_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": sum(len(v) for v in self._entries.values()),
+            }
+
+
+def get_tinted_icon_cache() -> TintedIconCache:
+    """Get the global tinted icon cache instance"""
+    return TintedIconCache()
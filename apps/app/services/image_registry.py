@@ -0,0 +1,116 @@
+"""
+Image Registry Module
+Per-deck, content-addressed registry of picture parts.
+
+Backgrounds and tinted icons are added to nearly every slide. python-pptx only
+finds an existing part by walking every part in the package and re-hashing each
+image blob, and it re-reads and PIL-parses the source file on every add. The
+registry keeps one ImagePart per distinct image (SHA1 of its bytes, the same key
+python-pptx uses) and relates later slides straight to it, so each image is
+stored once in the package and read once per deck.
+"""
+
+import hashlib
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import IO, Any, Dict, Optional, Union
+
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.parts.image import Image, ImagePart
+
+logger = logging.getLogger("image_registry")
+
+ImageSource = Union[str, Path, IO[bytes]]
+
+
+class ImagePartRegistry:
+    """
+    Content-hash keyed ImagePart registry for one Presentation.
+
+    Must not be shared across presentations: parts belong to a single package.
+    """
+
+    def __init__(self, prs):
+        self._package = prs.part.package
+        self._by_sha1: Dict[str, ImagePart] = {}
+        # Source path -> SHA1, so repeated paths are not even re-read
+        self._path_sha1: Dict[str, str] = {}
+        self.pictures_added = 0
+        self.parts_created = 0
+        self.bytes_embedded = 0
+        self.bytes_saved = 0
+
+    def _get_or_add_image_part(self, image_file: ImageSource) -> ImagePart:
+        path_key = str(image_file) if isinstance(image_file, (str, Path)) else None
+        if path_key is not None:
+            sha1 = self._path_sha1.get(path_key)
+            if sha1 is not None and sha1 in self._by_sha1:
+                return self._reuse(self._by_sha1[sha1])
+            image = Image.from_file(path_key)
+        else:
+            image_file.seek(0)
+            image = Image.from_blob(image_file.read(), getattr(image_file, "name", None))
+
+        sha1 = hashlib.sha1(image.blob).hexdigest()
+        if path_key is not None:
+            self._path_sha1[path_key] = sha1
+
+        image_part = self._by_sha1.get(sha1)
+        if image_part is not None:
+            return self._reuse(image_part)
+
+        image_part = ImagePart.new(self._package, image)
+        self._by_sha1[sha1] = image_part
+        self.parts_created += 1
+        self.bytes_embedded += len(image.blob)
+        return image_part
+
+    def image_part_for_blob(self, blob: bytes, sha1: Optional[str] = None, filename: Optional[str] = None) -> ImagePart:
+        """
+        The deck's ImagePart for an image blob (created on first use), for parts
+        related outside add_picture() such as slides spliced from the slide cache.
+        """
+        image_part = self._by_sha1.get(sha1) if sha1 else None
+        if image_part is None:
+            stream = BytesIO(blob)
+            stream.name = filename
+            image_part = self._get_or_add_image_part(stream)
+        else:
+            self._reuse(image_part)
+        self.pictures_added += 1
+        return image_part
+
+    def sha1_of(self, image_part: ImagePart) -> str:
+        """SHA1 of an image part's blob (no rehash for parts created by this registry)"""
+        for sha1, part in self._by_sha1.items():
+            if part is image_part:
+                return sha1
+        return hashlib.sha1(image_part.blob).hexdigest()
+
+    def _reuse(self, image_part: ImagePart) -> ImagePart:
+        self.bytes_saved += len(image_part.blob)
+        return image_part
+
+    def add_picture(self, slide, image_file: ImageSource, left, top, width=None, height=None):
+        """
+        Drop-in replacement for slide.shapes.add_picture() that reuses the deck's
+        existing picture part for identical image content.
+        """
+        image_part = self._get_or_add_image_part(image_file)
+        rId = slide.part.relate_to(image_part, RT.IMAGE)
+        shapes = slide.shapes
+        # Same steps as SlideShapes.add_picture() after its image-part lookup
+        pic = shapes._add_pic_from_image_part(image_part, rId, left, top, width, height)
+        shapes._recalculate_extents()
+        self.pictures_added += 1
+        return shapes._shape_factory(pic)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pictures added, unique parts stored and bytes saved by reuse"""
+        return {
+            "pictures": self.pictures_added,
+            "unique_parts": self.parts_created,
+            "bytes_embedded": self.bytes_embedded,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -1,15 +1,33 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
 from openai import AsyncOpenAI, APIError, RateLimitError, APIConnectionError
 from ..config import settings
-from ..models.presentation import PresentationData
+from ..models.presentation import PresentationData, SlideContent
+from ..utils.deck_chunks import markdown_outline, merge_chunk_decks, split_markdown_chunks
+from ..utils.slide_stream import SlideStreamParser
 
 logger = logging.getLogger("openai_service")
 
+# on_slide(index, slide): called for each slide as soon as the model finishes it
+SlideCallback = Callable[[int, SlideContent], Optional[Awaitable[None]]]
+# on_header(deck): deck fields written before the slides (slides empty), called before the first slide
+HeaderCallback = Callable[[PresentationData], Optional[Awaitable[None]]]
+
+
+class SlideStreamInterrupted(RuntimeError):
+    """Raised when a streamed generation fails after slides were already handed out."""
+
+
+async def _maybe_await(result: Any) -> None:
+    if inspect.isawaitable(result):
+        await result
+
 
 class OpenAIService:
     """
@@ -32,7 +50,9 @@ class OpenAIService:
         language: str,
         user_preference: str = "",
         stream_output: bool = False,
-        max_retries: int = 3
+        max_retries: int = 3,
+        on_slide: Optional[SlideCallback] = None,
+        on_header: Optional[HeaderCallback] = None,
     ) -> PresentationData:
         """
         Generate complete presentation with SINGLE API call
@@ -42,8 +62,11 @@ class OpenAIService:
             template_id: Template to use (e.g., "standard")
             language: "English" or "Arabic"
             user_preference: User preferences
-            stream_output: Enable streaming for terminal display (optional)
+            stream_output: Stream the structured output and parse slides as they close
+                (ignored in chunked mode, see _generate_chunked)
             max_retries: Number of retry attempts
+            on_slide: Called with (index, SlideContent) for each streamed slide (optional)
+            on_header: Called once with the deck header before the first streamed slide (optional)
             
         Returns:
             PresentationData: Complete presentation structure
@@ -72,36 +95,59 @@ class OpenAIService:
         if estimated_tokens > 100000:
             logger.warning(f"  Large prompt: ~{estimated_tokens} tokens")
         
+        threshold = settings.PPT_CHUNK_THRESHOLD_TOKENS
+        if threshold and estimated_tokens > threshold:
+            chunks = split_markdown_chunks(markdown_content, settings.PPT_CHUNK_MAX_TOKENS * 4)
+            if len(chunks) > 1:
+                return await self._generate_chunked(
+                    chunks, markdown_content, system_prompt, language, user_preference,
+                    max_retries, on_slide, on_header
+                )
+            logger.warning("  No section boundaries to split at, sending a single call")
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        return await self._request_structure(messages, max_retries, stream_output, on_slide, on_header)
+
+    async def _request_structure(
+        self,
+        messages: List[Dict[str, str]],
+        max_retries: int = 3,
+        stream_output: bool = False,
+        on_slide: Optional[SlideCallback] = None,
+        on_header: Optional[HeaderCallback] = None,
+    ) -> PresentationData:
+        """One structured-output request for a deck, with retries on rate limits, connection and server errors"""
         # SINGLE API CALL with retry logic
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"📡 API Call attempt {attempt}/{max_retries}...")
                 
-                # FIXED: Single structured output call
                 start_time = datetime.now()
                 
-                parse_response = await self.client.beta.chat.completions.parse(
-                    model=settings.OPENAI_MODEL,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    response_format=PresentationData,
-                    # temperature=0.4,
-                    # max_tokens=8000,
-                )
+                if stream_output:
+                    result, usage = await self._stream_structure(messages, on_slide, on_header)
+                else:
+                    # Single structured output call
+                    parse_response = await self.client.beta.chat.completions.parse(
+                        model=settings.OPENAI_MODEL,
+                        messages=messages,
+                        response_format=PresentationData,
+                        # temperature=0.4,
+                        # max_tokens=8000,
+                    )
+                    result = parse_response.choices[0].message.parsed
+                    usage = parse_response.usage
                 
                 elapsed = (datetime.now() - start_time).total_seconds()
                 
-                # Extract result
-                result: PresentationData = parse_response.choices[0].message.parsed
-                
                 if not result:
                     raise RuntimeError("Empty response from OpenAI")
                 
                 # Track usage
                 self._call_count += 1
-                usage = parse_response.usage
                 if usage:
                     self._total_tokens += usage.total_tokens
                     logger.info(f"Token usage: {usage.total_tokens} tokens")
@@ -154,6 +200,128 @@ class OpenAIService:
         # Should not reach here
         raise RuntimeError("Failed to generate presentation after all retries")
 
+    async def _generate_chunked(
+        self,
+        chunks: List[str],
+        markdown_content: str,
+        system_prompt: str,
+        language: str,
+        user_preference: str,
+        max_retries: int,
+        on_slide: Optional[SlideCallback] = None,
+        on_header: Optional[HeaderCallback] = None,
+    ) -> PresentationData:
+        """
+        Map-reduce generation for very large markdown: one request per chunk (at
+        most PPT_CHUNK_CONCURRENCY in flight, each with its own retries), merged
+        in document order by merge_chunk_decks.
+
+        Chunked mode turns off pipelining: stream_output does not apply, and the
+        callbacks see the merged deck only after every chunk has finished. No slide
+        past the title is final before then (the folded agenda goes to the front and
+        section numbers are rewritten across all chunks), so a pipelined render gets
+        its slides in one burst and no overlap with the LLM calls.
+        """
+        from ..core.ppt_prompts import get_chunk_user_prompt
+        
+        total = len(chunks)
+        outline = markdown_outline(markdown_content)
+        semaphore = asyncio.Semaphore(max(1, settings.PPT_CHUNK_CONCURRENCY))
+        logger.info(f"  Chunked mode: {total} parts ({', '.join(str(len(c)) for c in chunks)} chars), "
+                    f"concurrency {settings.PPT_CHUNK_CONCURRENCY}")
+        if on_slide is not None:
+            logger.info("  Chunked mode: slides are handed on after the merge (no render pipelining)")
+        
+        async def generate_chunk(part: int, chunk: str) -> PresentationData:
+            async with semaphore:
+                logger.info(f"  Part {part}/{total}: generating ({len(chunk)} chars)")
+                messages = [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": get_chunk_user_prompt(
+                        chunk, language, part, total, outline, user_preference
+                    )},
+                ]
+                return await self._request_structure(messages, max_retries)
+        
+        start_time = datetime.now()
+        tasks = [asyncio.ensure_future(generate_chunk(i, chunk)) for i, chunk in enumerate(chunks, 1)]
+        try:
+            decks = await asyncio.gather(*tasks)
+        except BaseException:
+            # One part failed after its retries: stop the others instead of paying for them
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        result = merge_chunk_decks(list(decks))
+        elapsed = (datetime.now() - start_time).total_seconds()
+        logger.info(f" Chunked generation: {len(result.slides)} slides from {total} parts in {elapsed:.2f}s")
+        
+        if on_header is not None:
+            await _maybe_await(on_header(result.model_copy(update={"slides": []})))
+        if on_slide is not None:
+            for index, slide in enumerate(result.slides):
+                await _maybe_await(on_slide(index, slide))
+        return result
+
+    async def _stream_structure(
+        self,
+        messages: List[Dict[str, str]],
+        on_slide: Optional[SlideCallback] = None,
+        on_header: Optional[HeaderCallback] = None,
+    ) -> Tuple[PresentationData, Any]:
+        """
+        Stream the structured output, validating (and handing to on_slide) each
+        slide as soon as its JSON object closes.
+
+        Returns (PresentationData, usage). The returned deck holds the same
+        SlideContent objects that were passed to on_slide. A failure after the
+        first slide was handed out raises SlideStreamInterrupted instead of the
+        API error, so the caller does not retry into duplicate slides.
+        """
+        parser = SlideStreamParser()
+        slides: List[SlideContent] = []
+        first_slide_s: Optional[float] = None
+        start_time = datetime.now()
+
+        try:
+            async with self.client.beta.chat.completions.stream(
+                model=settings.OPENAI_MODEL,
+                messages=messages,
+                response_format=PresentationData,
+                stream_options={"include_usage": True},
+            ) as stream:
+                async for event in stream:
+                    if event.type != "content.delta":
+                        continue
+                    for raw_slide in parser.feed(event.delta):
+                        slide = SlideContent.model_validate(raw_slide)
+                        index = len(slides)
+                        slides.append(slide)
+                        if first_slide_s is None:
+                            first_slide_s = (datetime.now() - start_time).total_seconds()
+                            logger.info(f"  First slide streamed after {first_slide_s:.2f}s")
+                            if on_header is not None:
+                                await _maybe_await(on_header(PresentationData(**(parser.header or {}))))
+                        if on_slide is not None:
+                            await _maybe_await(on_slide(index, slide))
+                completion = await stream.get_final_completion()
+        except Exception as e:
+            if slides:
+                raise SlideStreamInterrupted(
+                    f"Streaming failed after {len(slides)} slides were delivered: {e}"
+                ) from e
+            raise
+
+        message = completion.choices[0].message if completion.choices else None
+        if message is not None and getattr(message, "refusal", None):
+            raise RuntimeError(f"OpenAI refused the request: {message.refusal}")
+
+        document: Dict[str, Any] = parser.document()
+        document.pop("slides", None)
+        result = PresentationData(**document, slides=slides)
+        return result, completion.usage
+
     async def stream_presentation_generation(
         self,
         system_prompt: str,
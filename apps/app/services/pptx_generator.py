@@ -9,13 +9,15 @@ This generator creates slides that match the sample template layout by:
 4. Adding separators, icons, and page numbers
 """
 
-import hashlib
 import logging
 import re
-import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any, List
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Tuple, Optional, Dict, Any, List
 
 from pptx import Presentation
 from pptx.dml.color import RGBColor
@@ -27,9 +29,11 @@ from pptx.util import Inches, Pt, Emu
 from ..config import settings
 from ..models.presentation import PresentationData, SlideContent, TableData, BulletPoint
 from ..models.template_manifest import TemplateManifest
-from .chart_service import ChartService
-from .icon_service import IconService
-from ..utils.content_validator import validate_presentation
+from .icon_tint_cache import get_tinted_icon_cache
+from .image_registry import ImagePartRegistry
+from .slide_render_cache import capture_slide, get_slide_render_cache, slide_cache_key, splice_slide
+from .template_cache import get_compiled_template
+from ..utils.content_validator import SlideValidator, validate_presentation
 
 logger = logging.getLogger("pptx_generator")
 
@@ -95,142 +99,53 @@ class PptxGenerator:
     """
 
     def __init__(self, template_id: str, language: str = "en"):
-        """Initialize the PPTX generator."""
+        """Initialize the PPTX generator from the process-wide compiled template."""
         self.template_id = template_id
         self.target_language = self._normalize_language_code(language)
         
-        # Template paths
-        self.template_dir = Path(settings.TEMPLATES_DIR) / template_id
+        # Parsed configs, manifest and services are shared across generators
+        compiled = get_compiled_template(template_id)
+        self.compiled = compiled
+        self.template_dir = compiled.template_dir
+        self.backgrounds_dir = compiled.backgrounds_dir
         logger.info(f"Initializing generator: {self.template_dir}")
         
-        if not self.template_dir.exists():
-            raise FileNotFoundError(f"Template directory not found: {self.template_dir}")
-        
-        self.backgrounds_dir = self.template_dir / "Background"
-        if not self.backgrounds_dir.exists():
-            self.backgrounds_dir = self.template_dir / "backgrounds"
-        
-        # Load configurations
-        self.config = self._load_json("config.json")
-        self.constraints = self._load_json("constraints.json") if (self.template_dir / "constraints.json").exists() else {}
-        self.theme = self._load_json("theme.json") if (self.template_dir / "theme.json").exists() else self._get_default_theme()
-        
-        # Load manifest if exists
-        self.manifest: Optional[TemplateManifest] = None
-        manifest_path = self.template_dir / "manifest.json"
-        if manifest_path.exists():
-            try:
-                with open(manifest_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.manifest = TemplateManifest(**data)
-                logger.info(f"  Manifest loaded: {len(self.manifest.layouts)} layouts")
-            except Exception as e:
-                logger.warning(f"  Could not load manifest: {e}")
-        
-        # Initialize services
-        try:
-            self.icon_service = IconService(template_id=template_id)
-        except Exception as e:
-            logger.warning(f"  IconService failed: {e}")
-            self.icon_service = None
-        
-        try:
-            self.chart_service = ChartService(template_id=template_id)
-        except Exception as e:
-            logger.warning(f"  ChartService failed: {e}")
-            self.chart_service = None
+        self.config = compiled.config
+        self.constraints = compiled.constraints
+        self.theme = compiled.theme
+        self.manifest: Optional[TemplateManifest] = compiled.manifest
+        self.icon_service = compiled.icon_service
+        self.chart_service = compiled.chart_service
         
         # Runtime state
         self.prs: Optional[Presentation] = None
+        self.image_registry: Optional[ImagePartRegistry] = None
         self.lang_config: Dict[str, Any] = {}
-        
-        # Load element positions (prefer config, fallback to manifest)
-        self.element_positions: Dict[str, Any] = self.config.get('element_positions', {})
-        if not self.element_positions and self.manifest and self.manifest.element_positions:
-            self.element_positions = self.manifest.element_positions
-        
-        # Load fonts config (prefer config, fallback to manifest)
-        self.fonts_config: Dict[str, Any] = self.config.get('fonts', {})
-        if not self.fonts_config and self.manifest and self.manifest.fonts:
-            self.fonts_config = self.manifest.fonts.model_dump() if hasattr(self.manifest.fonts, 'model_dump') else {}
-        
-        # Load icons config (prefer config, fallback to manifest)
-        self.icons_config: Dict[str, Any] = self.config.get('icons', {})
-        if not self.icons_config and self.manifest and self.manifest.icons:
-            self.icons_config = {
-                'default_title': self.manifest.icons.default_title,
-                'default_section': self.manifest.icons.default_section,
-                'agenda_items': self.manifest.icons.agenda_items,
-                'box_icons': self.manifest.icons.box_icons
-            }
-        
-        # Load colors config (prefer config, fallback to manifest)
-        self.colors_config: Dict[str, Any] = self.config.get('colors', {})
-        if not self.colors_config and self.manifest and self.manifest.colors:
-            self.colors_config = self.manifest.colors.model_dump() if hasattr(self.manifest.colors, 'model_dump') else {}
-        
-        # Build available icons list (section falls back to title icons if no section icons)
-        self.available_title_icons = self._get_available_icons('title')
-        self.available_section_icons = self._get_available_icons('section')
-        if not self.available_section_icons and self.available_title_icons:
-            self.available_section_icons = list(self.available_title_icons)
+        # Heavy per-slide assets rendered ahead of assembly (parallel mode), keyed by asset
+        self._prepared_assets: Dict[Tuple, Any] = {}
+        # Incremental build state (start_deck / add_slide / finish_deck_to_stream)
+        self._validator: Optional[SlideValidator] = None
+        self._next_page_num = 2
+        # Rendered content slides shared across decks (None when disabled)
+        self.slide_cache = get_slide_render_cache()
+        self.slide_cache_hits = 0
+        self.slide_cache_misses = 0
+        
+        self.element_positions: Dict[str, Any] = compiled.element_positions
+        self.fonts_config: Dict[str, Any] = compiled.fonts_config
+        self.icons_config: Dict[str, Any] = compiled.icons_config
+        self.colors_config: Dict[str, Any] = compiled.colors_config
+        
+        self.available_title_icons = compiled.available_title_icons
+        self.available_section_icons = compiled.available_section_icons
         self.icon_index = 0  # Fallback counter for cycling when no keyword match
-        # Load icon keyword rules (new format: rules with priority/keywords/icons) or legacy category_to_icon
-        self.icon_keyword_rules: List[Dict] = []  # [{priority, keywords, icons: {title?, section?, alt?}}, ...]
-        self.category_to_icon: Dict[str, str] = {}
-        icon_kw_path = self.template_dir / "icon_keywords.json"
-        if icon_kw_path.exists():
-            try:
-                kw_data = self._load_json("icon_keywords.json")
-                rules = kw_data.get("rules") or []
-                if rules:
-                    # Sort by priority desc (higher wins); Python sort is stable so order preserved for ties
-                    self.icon_keyword_rules = sorted(rules, key=lambda r: -int(r.get("priority", 0)))
-                    # Normalize: precompute keyword list and icons dict for fast matching
-                    for r in self.icon_keyword_rules:
-                        r["_keywords"] = [str(k).strip().lower() for k in (r.get("keywords") or []) if k]
-                        r["_icons"] = r.get("icons") or {}
-                    logger.info(f"  Icon keyword rules: {len(self.icon_keyword_rules)} rules (priority-based)")
-                else:
-                    raw = kw_data.get("category_to_icon") or {}
-                    for cat, path in raw.items():
-                        if path and (self.template_dir / path).exists():
-                            self.category_to_icon[cat] = path
-                    if self.category_to_icon:
-                        logger.info(f"  Icon keyword mapping: {len(self.category_to_icon)} categories (legacy)")
-            except Exception as e:
-                logger.debug(f"Could not load icon_keywords.json: {e}")
+        # Icon keyword rules (priority-sorted, normalized) or legacy category_to_icon
+        self.icon_keyword_rules = compiled.icon_keyword_rules
+        self.category_to_icon: Dict[str, str] = compiled.category_to_icon
         
         logger.info(f"Generator initialized: {template_id}, lang={self.target_language}")
         logger.info(f"  Available icons: {len(self.available_title_icons)} title, {len(self.available_section_icons)} section")
     
-    # ========================================================================
-    # CONFIGURATION LOADING
-    # ========================================================================
-    
-    def _load_json(self, filename: str) -> Dict:
-        """Load JSON configuration file"""
-        json_path = self.template_dir / filename
-        if not json_path.exists():
-            return {}
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def _get_default_theme(self) -> Dict:
-        """Get default theme configuration"""
-        return {
-            "colors": {
-                "primary": "#01415C",
-                "secondary": "#84BA93",
-                "text_primary": "#0D2026",
-                "text_inverse": "#FFFCEC"
-            },
-            "typography": {
-                "font_families": {"primary": "Calibri Light", "body": "Calibri"},
-                "font_sizes": {"title": 44, "heading_1": 32, "body": 18}
-            }
-        }
-    
     # ========================================================================
     # LANGUAGE CONFIGURATION
     # ========================================================================
@@ -278,20 +193,6 @@ class PptxGenerator:
     # ICON SELECTION METHODS
     # ========================================================================
     
-    def _get_available_icons(self, icon_type: str = 'title') -> List[str]:
-        """Get list of available icons from template directory"""
-        icons_dir = self.template_dir / "Icons"
-        if not icons_dir.exists():
-            return []
-        
-        prefix = f"icon_{icon_type}_"
-        icons = []
-        for f in icons_dir.iterdir():
-            if f.is_file() and f.name.startswith(prefix):
-                icons.append(f"Icons/{f.name}")
-        
-        return sorted(icons)
-    
     def _normalize_heading_for_icon_match(self, text: str) -> str:
         """Normalize heading for icon keyword match: lowercase, trim, collapse spaces."""
         if not text:
@@ -451,45 +352,24 @@ class PptxGenerator:
         
         return value if isinstance(value, str) else default
     
-    def _get_tinted_icon_path(self, icon_path: str, tint_hex: str) -> Optional[str]:
+    def _get_asset_path(self, rel_path: str) -> Path:
+        """Slide-resolution variant of a template image if one was built, else the source file"""
+        variant = self.compiled.asset_variants.get(rel_path)
+        return Path(variant) if variant else self.template_dir / rel_path
+    
+    def _get_tinted_icon(self, icon_path: str, tint_hex: str) -> Optional[bytes]:
         """
         Treat PNG as alpha mask: replace RGB with tint color, preserve alpha.
         Dark slide → light tint (#FFFCEC); light slide → dark tint (#0D2026).
-        Returns path to cached tinted PNG, or None if tinting fails (caller can use original).
+        Returns tinted PNG bytes from the in-process tint cache, or None if tinting fails
+        (caller can use original).
         """
         if not icon_path or not tint_hex:
             return None
-        full_path = self.template_dir / icon_path
+        full_path = self._get_asset_path(icon_path)
         if not full_path.exists():
             return None
-        hex_clean = tint_hex.lstrip("#").upper()
-        if len(hex_clean) != 6:
-            return None
-        try:
-            r, g, b = int(hex_clean[0:2], 16), int(hex_clean[2:4], 16), int(hex_clean[4:6], 16)
-        except ValueError:
-            return None
-        cache_key = hashlib.sha256(f"{icon_path}:{hex_clean}".encode()).hexdigest()[:16]
-        cache_dir = self.template_dir / ".icon_tint_cache"
-        cache_dir.mkdir(parents=True, exist_ok=True)
-        out_path = cache_dir / f"{cache_key}.png"
-        if out_path.exists():
-            return str(out_path)
-        try:
-            from PIL import Image
-            img = Image.open(full_path).convert("RGBA")
-            w, h = img.size
-            # Replace RGB with tint, keep original alpha (alpha-mask behavior)
-            r_band = Image.new("L", (w, h), r)
-            g_band = Image.new("L", (w, h), g)
-            b_band = Image.new("L", (w, h), b)
-            _, _, _, a_band = img.split()
-            tinted = Image.merge("RGBA", (r_band, g_band, b_band, a_band))
-            tinted.save(str(out_path), "PNG")
-            return str(out_path)
-        except Exception as e:
-            logger.debug(f"Icon tint failed {icon_path}: {e}")
-            return None
+        return get_tinted_icon_cache().get(full_path, tint_hex)
 
     def _add_icon(
         self,
@@ -505,18 +385,23 @@ class PptxGenerator:
         """
         if not icon_path:
             return
-        full_path = self.template_dir / icon_path
+        full_path = self._get_asset_path(icon_path)
         if not full_path.exists():
             logger.debug(f"Icon not found: {full_path}")
             return
         path_to_add = str(full_path)
         if content_type:
             tint_hex = self._get_text_color_for_slide(content_type)
-            tinted = self._get_tinted_icon_path(icon_path, tint_hex)
+            tinted = (
+                self._prepared_assets.get(("icon", icon_path, tint_hex.lstrip("#").upper()))
+                or self._get_tinted_icon(icon_path, tint_hex)
+            )
             if tinted:
-                path_to_add = tinted
+                path_to_add = BytesIO(tinted)
+                path_to_add.name = f"{full_path.stem}.png"
         try:
-            slide.shapes.add_picture(
+            self._add_picture(
+                slide,
                 path_to_add,
                 Inches(pos.get('x', 0)),
                 Inches(pos.get('y', 0)),
@@ -526,6 +411,12 @@ class PptxGenerator:
         except Exception as e:
             logger.debug(f"Icon error: {e}")
     
+    def _add_picture(self, slide, image_file, left, top, width=None, height=None):
+        """Add a picture, reusing the deck's picture part for identical image content"""
+        if self.image_registry is None:
+            return slide.shapes.add_picture(image_file, left, top, width=width, height=height)
+        return self.image_registry.add_picture(slide, image_file, left, top, width=width, height=height)
+    
     def _hex_to_rgb(self, hex_color: str) -> Tuple[int, int, int]:
         """Convert hex color to RGB tuple"""
         hex_color = hex_color.lstrip("#")
@@ -565,13 +456,14 @@ class PptxGenerator:
         if not bg_path_str:
             return
         
-        bg_path = self.template_dir / bg_path_str
+        bg_path = self._get_asset_path(bg_path_str)
         if not bg_path.exists():
             logger.debug(f"Background not found: {bg_path}")
             return
         
         try:
-            picture = slide.shapes.add_picture(
+            picture = self._add_picture(
+                slide,
                 str(bg_path),
                 Inches(0), Inches(0),
                 width=self.prs.slide_width,
@@ -925,17 +817,20 @@ class PptxGenerator:
         if page_num:
             self._add_page_number(slide, page_num, content_type='agenda')
     
+    def _get_content_slide_type(self, slide_data: SlideContent) -> str:
+        """Background/color content type of a content slide: table, chart or content"""
+        if slide_data.table_data:
+            return 'table'
+        if slide_data.chart_data:
+            return 'chart'
+        return 'content'
+    
     def _create_content_slide(self, slide_data: SlideContent, page_num: int = None) -> None:
         """Create content slide matching sample layout"""
         slide = self.prs.slides.add_slide(self._get_blank_layout())
         
         # Determine content type for background
-        if slide_data.table_data:
-            content_type = 'table'
-        elif slide_data.chart_data:
-            content_type = 'chart'
-        else:
-            content_type = 'content'
+        content_type = self._get_content_slide_type(slide_data)
         
         # Add background
         self._add_background(slide, content_type)
@@ -1064,7 +959,8 @@ class PptxGenerator:
                 left=float(pos.get('x', 1.5)),
                 top=float(pos.get('y', 1.8)),
                 width=float(pos.get('width', 10.0)),
-                height=float(pos.get('height', 5.0))
+                height=float(pos.get('height', 5.0)),
+                prepared=self._prepared_assets.get(("chart", id(slide_data.chart_data)))
             )
         except Exception as e:
             logger.warning(f"Chart error: {e}")
@@ -1098,8 +994,102 @@ class PptxGenerator:
         
         return "content"
     
-    def generate(self, presentation_data: PresentationData) -> str:
-        """Generate PowerPoint presentation."""
+    def _build_slide(self, slide_data: SlideContent, page_num: int) -> None:
+        """Create one slide with the native builder for its content type"""
+        content_type = self._determine_content_type(slide_data)
+        if content_type == 'section':
+            self._create_section_slide(slide_data, page_num=page_num)
+        elif content_type == 'agenda':
+            self._create_agenda_slide(slide_data, page_num=page_num)
+        else:
+            self._create_content_slide(slide_data, page_num=page_num)
+    
+    def _plan_slide_assets(self, presentation_data: PresentationData) -> List[Tuple]:
+        """
+        List the heavy assets each slide will need, in deck order, without touching
+        the presentation. Icon selection is replayed with the same cycling state the
+        builders will see, then that state is restored so assembly picks identical icons.
+        """
+        saved_icon_index = self.icon_index
+        plan: List[Tuple] = []
+        try:
+            for slide_data in presentation_data.slides:
+                plan.extend(self._slide_assets(slide_data))
+        finally:
+            self.icon_index = saved_icon_index
+        return plan
+    
+    def _slide_assets(self, slide_data: SlideContent) -> List[Tuple]:
+        """Heavy assets of one slide, advancing icon cycling exactly as its builder does"""
+        plan: List[Tuple] = []
+        
+        def add_icon(icon_path: Optional[str], content_type: str) -> None:
+            if icon_path:
+                tint = self._get_text_color_for_slide(content_type).lstrip('#').upper()
+                plan.append(("icon", icon_path, tint))
+        
+        content_type = self._determine_content_type(slide_data)
+        if content_type == 'section':
+            add_icon(self._ensure_header_icon(
+                self._select_icon_for_content(slide_data.title, icon_type='section'),
+                icon_type='section'
+            ), 'section')
+        elif content_type == 'agenda':
+            for bullet in (slide_data.bullets or [])[:6]:
+                text = getattr(bullet, 'text', bullet) if hasattr(bullet, 'text') else str(bullet)
+                if not text:
+                    continue
+                add_icon(self._ensure_header_icon(
+                    self._select_icon_for_content(text, icon_type='title'),
+                    icon_type='title'
+                ), 'agenda_items')
+        else:
+            slide_type = self._get_content_slide_type(slide_data)
+            add_icon(self._ensure_header_icon(
+                self._select_icon_for_content(slide_data.title, icon_type='title'),
+                icon_type='title'
+            ), slide_type)
+            if slide_data.chart_data and not (slide_data.table_data and slide_data.table_data.rows):
+                plan.append(("chart", id(slide_data.chart_data), slide_data.chart_data))
+        return plan
+    
+    def _render_asset(self, asset: Tuple) -> Any:
+        """Render one planned asset (runs on a worker thread; must not touch self.prs)"""
+        kind = asset[0]
+        try:
+            if kind == "icon":
+                # Tinted PNG bytes (in-process tint cache, tinting on a miss)
+                return self._get_tinted_icon(asset[1], asset[2])
+            if kind == "chart" and self.chart_service:
+                return self.chart_service.prepare_chart(asset[2])
+        except Exception as e:
+            # Assembly falls back to the serial path for anything not prepared
+            logger.debug(f"Asset prepare failed for {asset[:2]}: {e}")
+        return None
+    
+    def _prepare_slide_assets(self, presentation_data: PresentationData) -> None:
+        """
+        Render tinted icons and chart XML/workbooks for every slide
+        concurrently. Results are keyed by asset, so slide assembly (serial, in deck
+        order) produces the same package regardless of completion order.
+        """
+        start = datetime.now()
+        unique: Dict[Tuple, Tuple] = {}
+        for asset in self._plan_slide_assets(presentation_data):
+            unique.setdefault(asset[:2] if asset[0] == "chart" else asset, asset)
+        
+        workers = max(1, int(settings.PPTX_SLIDE_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slide-assets") as executor:
+            results = list(executor.map(self._render_asset, unique.values()))
+        
+        self._prepared_assets = {
+            key: result for key, result in zip(unique.keys(), results) if result is not None
+        }
+        elapsed = (datetime.now() - start).total_seconds()
+        logger.info(f"  Prepared {len(self._prepared_assets)}/{len(unique)} slide assets in {elapsed:.2f}s ({workers} workers)")
+    
+    def _start_presentation(self, presentation_data: PresentationData) -> None:
+        """Configure language and create an empty package sized to the template"""
         logger.info("=" * 60)
         logger.info("Starting presentation generation...")
         
@@ -1109,60 +1099,176 @@ class PptxGenerator:
         logger.info(f"  Template: {self.template_id}")
         logger.info(f"  Language: {self.target_language}")
         
-        # Validate slides
-        presentation_data.slides = validate_presentation(presentation_data.slides)
-
         self.prs = Presentation()
         self.prs.slide_width = Inches(self.constraints['layout']['slide_width'])
         self.prs.slide_height = Inches(self.constraints['layout']['slide_height'])
+        self.image_registry = ImagePartRegistry(self.prs)
+    
+    def _add_title_slide(self, presentation_data: PresentationData) -> None:
+        try:
+            self._create_title_slide(presentation_data)
+        except Exception as e:
+            logger.error(f"❌ Title slide: {e}")
+    
+    def _add_content_slide(self, slide_data: SlideContent, page_num: int) -> None:
+        logger.info(f"🔨 Slide {page_num}: {slide_data.title[:50]}...")
+        
+        key = self._slide_cache_key(slide_data, page_num) if self.slide_cache is not None else None
+        if key is not None and self._splice_cached_slide(key):
+            return
+        
+        icon_index = self.icon_index
+        slide_count = len(self.prs.slides)
+        try:
+            self._build_slide(slide_data, page_num=page_num)
+        except Exception as e:
+            logger.error(f"❌ Slide error: {e}")
+            logger.exception(e)
+            return
+        
+        if key is not None and len(self.prs.slides) == slide_count + 1:
+            entry = capture_slide(self.prs.slides[-1], self.image_registry)
+            if entry is not None:
+                entry.icon_advance = self.icon_index - icon_index
+                self.slide_cache.put(key, entry)
+    
+    def _slide_cache_key(self, slide_data: SlideContent, page_num: int) -> str:
+        """Slide cache key, including the icons this slide picks at the current cycling state"""
+        saved_icon_index = self.icon_index
+        try:
+            icons = [asset for asset in self._slide_assets(slide_data) if asset[0] == "icon"]
+        finally:
+            self.icon_index = saved_icon_index
+        return slide_cache_key(
+            slide_data, self.template_id, self.compiled.fingerprint, self.target_language, page_num, icons
+        )
+    
+    def _splice_cached_slide(self, key: str) -> bool:
+        """Append the cached rendering for key; False on a miss (or a failed splice) so the slide is built"""
+        entry = self.slide_cache.get(key)
+        if entry is None:
+            self.slide_cache_misses += 1
+            return False
+        try:
+            # The slide joins the deck only in splice_slide's last step, so a failure leaves nothing behind
+            splice_slide(self.prs, entry, self.image_registry)
+        except Exception as e:
+            logger.warning(f"Slide cache splice failed, building instead: {e}")
+            self.slide_cache_misses += 1
+            return False
+        self.icon_index += entry.icon_advance
+        self.slide_cache_hits += 1
+        return True
+    
+    def _build_presentation(self, presentation_data: PresentationData, parallel: Optional[bool] = None) -> None:
+        """
+        Build all slides into self.prs (not saved).
+        
+        With parallel=True (default: settings.PPTX_PARALLEL_SLIDES) the heavy per-slide
+        assets are prepared concurrently before slides are assembled in order.
+        """
+        self._start_presentation(presentation_data)
+        
+        # Validate slides
+        presentation_data.slides = validate_presentation(presentation_data.slides)
 
         for slide_data in presentation_data.slides:
             if slide_data.title:
                 slide_data.title = self._scrub_title(slide_data.title)
 
+        self._prepared_assets = {}
+        if settings.PPTX_PARALLEL_SLIDES if parallel is None else parallel:
+            self._prepare_slide_assets(presentation_data)
+
         # Title slide
-        try:
-            self._create_title_slide_dynamic(presentation_data)
-        except Exception as e:
-            logger.error(f"❌ Title slide: {e}")
+        self._add_title_slide(presentation_data)
 
-        # Content slides
+        # Content slides (assembled strictly in deck order)
         for idx, slide_data in enumerate(presentation_data.slides):
-            logger.info(f"🔨 Slide {idx + 2}: {slide_data.title[:50]}...")
+            self._add_content_slide(slide_data, page_num=idx + 2)
 
-            try:
-                layout_type = (slide_data.layout_type or "content").lower()
-                layout_hint = self._get_layout_hint(slide_data)
-
-                if layout_type == "section":
-                    content_type = "section"
-                elif layout_type == "two_column":
-                    content_type = "two_column"
-                elif layout_hint:
-                    content_type = layout_hint
-                elif slide_data.table_data:
-                    content_type = "table"
-                elif slide_data.chart_data:
-                    content_type = "chart"
-                elif slide_data.bullets:
-                    content_type = "bullets"
-                else:
-                    content_type = "content"
+        self._prepared_assets = {}
 
-                self._create_slide_from_json(content_type, slide_data, page_num=idx + 2)
+    # ========================================================================
+    # INCREMENTAL GENERATION (slides arriving from a stream)
+    # ========================================================================
 
-            except Exception as e:
-                logger.error(f"❌ Slide error: {e}")
-                logger.exception(e)
+    def start_deck(self, presentation_data: PresentationData) -> None:
+        """
+        Begin a deck from its header (title, subtitle, author, language) and build
+        the title slide. Content slides are then added one at a time with
+        add_slide() and the package saved with finish_deck_to_stream(); the
+        result matches generate_to_stream() on the same slides (serial assets).
+        """
+        self._start_presentation(presentation_data)
+        self._prepared_assets = {}
+        self._validator = SlideValidator()
+        self._next_page_num = 2
+        self._add_title_slide(presentation_data)
 
-        output_path = self._get_output_path(presentation_data.title)
-        self.prs.save(output_path)
+    def add_slide(self, slide_data: SlideContent) -> int:
+        """
+        Queue one streamed slide. Validation looks one slide ahead, so this builds
+        the previously queued slide (or its splits); returns the number built.
+        """
+        return self._build_validated(self._validator.push(slide_data))
 
-        logger.info(f"✅ Generated: {output_path}")
+    def finish_deck_to_stream(self) -> BinaryIO:
+        """Build the last queued slide and save the deck (see generate_to_stream)"""
+        self._build_validated(self._validator.close())
+        self._validator = None
+        return self._save_to_stream()
+
+    def _build_validated(self, slides: List[SlideContent]) -> int:
+        for slide_data in slides:
+            if slide_data.title:
+                slide_data.title = self._scrub_title(slide_data.title)
+            self._add_content_slide(slide_data, page_num=self._next_page_num)
+            self._next_page_num += 1
+        return len(slides)
+
+    def _log_generated(self, target: str) -> None:
+        logger.info(f"✅ Generated: {target}")
         logger.info(f"   Slides: {len(self.prs.slides)}, Language: {self.target_language}")
+        image_stats = self.image_registry.stats()
+        logger.info(
+            f"   Images: {image_stats['pictures']} placed, {image_stats['unique_parts']} stored, "
+            f"{image_stats['bytes_saved'] / 1024:.0f} KB saved by reuse"
+        )
+        if self.slide_cache is not None:
+            logger.info(f"   Slide cache: {self.slide_cache_hits} hits, {self.slide_cache_misses} misses")
 
+    def generate(self, presentation_data: PresentationData, parallel: Optional[bool] = None) -> str:
+        """Generate PowerPoint presentation into settings.OUTPUT_DIR and return its path"""
+        self._build_presentation(presentation_data, parallel=parallel)
+        output_path = self._get_output_path(presentation_data.title)
+        self.prs.save(output_path)
+        self._log_generated(output_path)
         return output_path
 
+    def generate_to_stream(self, presentation_data: PresentationData, parallel: Optional[bool] = None) -> BinaryIO:
+        """
+        Generate PowerPoint presentation without writing to OUTPUT_DIR.
+        
+        Returns a stream positioned at 0: in memory up to settings.PPTX_SPOOL_MAX_BYTES,
+        spilled to an anonymous temp file above that. The caller owns (and closes) it.
+        """
+        self._build_presentation(presentation_data, parallel=parallel)
+        return self._save_to_stream()
+
+    def _save_to_stream(self) -> BinaryIO:
+        # Closed here if the save fails; on success ownership passes to the caller
+        with ExitStack() as on_error:
+            stream = on_error.enter_context(
+                SpooledTemporaryFile(max_size=settings.PPTX_SPOOL_MAX_BYTES, suffix=".pptx")
+            )
+            self.prs.save(stream)
+            on_error.pop_all()
+        size = stream.tell()
+        stream.seek(0)
+        self._log_generated(f"<stream {size / 1024:.0f} KB>")
+        return stream
+
     # ========================================================================
     # TITLE SLIDE
     # ========================================================================
@@ -1409,7 +1515,8 @@ class PptxGenerator:
                         
                         icon_top = Inches(item_y + 0.15)
                         
-                        slide.shapes.add_picture(
+                        self._add_picture(
+                            slide,
                             icon_data,
                             icon_left,
                             icon_top,
@@ -1691,7 +1798,8 @@ class PptxGenerator:
             )
             
             if icon_data:
-                slide.shapes.add_picture(
+                self._add_picture(
+                    slide,
                     icon_data,
                     Inches(icon_left),
                     Inches(icon_top),
@@ -1746,7 +1854,8 @@ class PptxGenerator:
             )
             
             if icon_data:
-                slide.shapes.add_picture(
+                self._add_picture(
+                    slide,
                     icon_data,
                     Inches(icon_left),
                     Inches(icon_top),
@@ -1905,6 +2014,5 @@ class PptxGenerator:
     
     def generate_to_bytes(self, presentation_data: PresentationData) -> bytes:
         """Generate presentation and return as bytes"""
-        output_path = self.generate(presentation_data)
-        with open(output_path, 'rb') as f:
-            return f.read()
+        with self.generate_to_stream(presentation_data) as stream:
+            return stream.read()
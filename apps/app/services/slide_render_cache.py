@@ -0,0 +1,249 @@
+"""
+Slide Render Cache Module
+Process-wide bounded LRU of rendered slides, spliced into new decks without python-pptx building them.
+
+Regenerations, re-themes and repeated downloads mostly render slides whose
+SlideContent, template and language did not change, and each one went through
+the full python-pptx build again (text boxes, icon lookup and tinting, chart
+XML and workbook). A built slide is now captured as its slide XML plus what its
+relationships point at: the slide layout (by partname), picture blobs (interned
+by SHA1, so one background is held once across all entries) and charts (chart
+XML plus embedded workbook). A later deck asking for the same slide relates a
+new slide part to those parts in its own package and only builds cache misses.
+
+Entries are keyed by a hash of the slide JSON, the template id and fingerprint,
+the language, the page number and the icons the slide picks (icon cycling makes
+the pick depend on earlier slides), so any change to the rendered output is a
+different key. Slides with relationships the cache cannot recreate (external
+links, media other than pictures and charts) are never cached.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lxml import etree
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.parts.chart import ChartPart
+from pptx.parts.slide import SlidePart
+
+from ..config import settings
+from ..models.presentation import SlideContent
+
+logger = logging.getLogger("slide_render_cache")
+
+_R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+
+
+@dataclass
+class CachedSlide:
+    """One rendered slide, independent of the package it was built in"""
+    xml: bytes
+    # (rId, kind, payload) in relationship order; kind is layout | image | chart
+    rels: List[Tuple[str, str, Any]] = field(default_factory=list)
+    # How far building the slide advanced the generator's icon cycling counter
+    icon_advance: int = 0
+
+    @property
+    def size_bytes(self) -> int:
+        size = len(self.xml)
+        for _, kind, payload in self.rels:
+            if kind == "chart":
+                size += len(payload[0]) + len(payload[1])
+        return size
+
+
+def slide_cache_key(
+    slide: SlideContent,
+    template_id: str,
+    fingerprint: Any,
+    language: str,
+    page_num: int,
+    icons: Sequence[Tuple],
+) -> str:
+    """sha256 over everything that decides a content slide's rendered parts"""
+    payload = json.dumps(
+        [
+            slide.model_dump(mode="json"),
+            template_id,
+            fingerprint,
+            language,
+            page_num,
+            [list(icon) for icon in icons],
+            [settings.ASSET_VARIANTS_ENABLED, settings.ASSET_VARIANT_DPI, settings.ASSET_JPEG_QUALITY],
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def capture_slide(slide, registry) -> Optional[CachedSlide]:
+    """Snapshot a built slide; None if it relates to anything the cache cannot recreate"""
+    part = slide.part
+    rels: List[Tuple[str, str, Any]] = []
+    for rId, rel in part.rels.items():
+        if rel.is_external:
+            return None
+        target = rel.target_part
+        if rel.reltype == RT.SLIDE_LAYOUT:
+            rels.append((rId, "layout", str(target.partname)))
+        elif rel.reltype == RT.IMAGE:
+            rels.append((rId, "image", (registry.sha1_of(target), target.blob, target.desc)))
+        elif rel.reltype == RT.CHART:
+            xlsx_part = target.chart_workbook.xlsx_part
+            chart_space = copy.deepcopy(target._element)
+            external_data = chart_space.find(qn("c:externalData"))
+            if external_data is not None:
+                chart_space.remove(external_data)
+            chart_xml = etree.tostring(chart_space, encoding="UTF-8", standalone=True)
+            rels.append((rId, "chart", (chart_xml, xlsx_part.blob if xlsx_part is not None else b"")))
+        else:
+            return None
+    return CachedSlide(xml=part.blob, rels=rels)
+
+
+def splice_slide(prs, entry: CachedSlide, registry) -> None:
+    """Append a cached slide to prs, relating it to this package's layout, picture and chart parts"""
+    presentation_part = prs.part
+    package = presentation_part.package
+    slide_part = SlidePart.load(presentation_part._next_slide_partname, CT.PML_SLIDE, package, entry.xml)
+    # Attached first, as add_slide() does, so new picture/chart parts get package-unique partnames
+    slide_rId = presentation_part.relate_to(slide_part, RT.SLIDE)
+    try:
+        _relate_cached_parts(prs, slide_part, entry, registry)
+    except Exception:
+        presentation_part.drop_rel(slide_rId)
+        raise
+    prs.slides._sldIdLst.add_sldId(slide_rId)
+
+
+def _relate_cached_parts(prs, slide_part, entry: CachedSlide, registry) -> None:
+    package = slide_part.package
+    rid_map: Dict[str, str] = {}
+    for rId, kind, payload in entry.rels:
+        if kind == "layout":
+            layout = next(l for l in prs.slide_layouts if str(l.part.partname) == payload)
+            new_rId = slide_part.relate_to(layout.part, RT.SLIDE_LAYOUT)
+        elif kind == "image":
+            sha1, blob, filename = payload
+            new_rId = slide_part.relate_to(registry.image_part_for_blob(blob, sha1, filename), RT.IMAGE)
+        else:
+            chart_xml, xlsx_blob = payload
+            chart_part = ChartPart.load(
+                package.next_partname(ChartPart.partname_template), CT.DML_CHART, package, chart_xml
+            )
+            if xlsx_blob:
+                chart_part.chart_workbook.update_from_xlsx_blob(xlsx_blob)
+            new_rId = slide_part.relate_to(chart_part, RT.CHART)
+        rid_map[rId] = new_rId
+
+    # A fresh part hands out rIds in the order they were captured, so this is rarely needed
+    if any(old != new for old, new in rid_map.items()):
+        for element in slide_part._element.iter():
+            for name, value in element.attrib.items():
+                if name.startswith(_R_NS) and value in rid_map:
+                    element.set(name, rid_map[value])
+
+
+class SlideRenderCache:
+    """
+    Thread-safe LRU of CachedSlide entries keyed by slide_cache_key().
+
+    Picture blobs are interned by SHA1 (reference counted across entries), so the
+    handful of backgrounds and icons a template uses are held once.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[str, CachedSlide]" = OrderedDict()
+        self._blobs: Dict[str, List[Any]] = {}  # sha1 -> [blob, refcount]
+        self._lock = Lock()
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[CachedSlide]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: CachedSlide) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            entry.rels = [self._intern(rel) for rel in entry.rels]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._release(evicted)
+                self.evictions += 1
+
+    def _intern(self, rel: Tuple[str, str, Any]) -> Tuple[str, str, Any]:
+        rId, kind, payload = rel
+        if kind != "image":
+            return rel
+        sha1, blob, filename = payload
+        slot = self._blobs.setdefault(sha1, [blob, 0])
+        slot[1] += 1
+        return (rId, kind, (sha1, slot[0], filename))
+
+    def _release(self, entry: CachedSlide) -> None:
+        for _, kind, payload in entry.rels:
+            if kind == "image":
+                slot = self._blobs.get(payload[0])
+                if slot is not None:
+                    slot[1] -= 1
+                    if slot[1] <= 0:
+                        del self._blobs[payload[0]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._blobs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and cache occupancy"""
+        total = self.hits + self.misses
+        with self._lock:
+            return {
+                "enabled": True,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "slide_bytes": sum(e.size_bytes for e in self._entries.values()),
+                "image_bytes": sum(len(slot[0]) for slot in self._blobs.values()),
+            }
+
+
+_cache: Optional[SlideRenderCache] = None
+_cache_lock = Lock()
+
+
+def get_slide_render_cache() -> Optional[SlideRenderCache]:
+    """Get the per-process slide cache (None when SLIDE_RENDER_CACHE_SIZE is 0)"""
+    global _cache
+    if settings.SLIDE_RENDER_CACHE_SIZE <= 0:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SlideRenderCache(settings.SLIDE_RENDER_CACHE_SIZE)
+    return _cache
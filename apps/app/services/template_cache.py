@@ -0,0 +1,364 @@
+"""
+Template Cache Module
+Process-wide cache of compiled (parsed + validated) native templates.
+
+Every PptxGenerator used to re-read config/constraints/theme/manifest/icon_keywords
+JSON, re-validate the TemplateManifest and rebuild IconService/ChartService. The
+compiled form of a template is built once per process and shared by all generators.
+Entries are keyed by template_id plus the mtimes of the source files, so edits to a
+template on disk are picked up on the next request without a restart.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..models.template_manifest import TemplateManifest
+from .asset_store import build_asset_variants
+from .chart_service import ChartService
+from .icon_service import IconService
+from .icon_tint_cache import get_tinted_icon_cache
+
+logger = logging.getLogger("template_cache")
+
+
+# Files whose mtimes make up a template fingerprint (relative to template dir)
+TEMPLATE_SOURCE_FILES = (
+    "config.json",
+    "constraints.json",
+    "theme.json",
+    "manifest.json",
+    "icon_keywords.json",
+    "Icons",
+    "Background",
+)
+
+DEFAULT_THEME = {
+    "colors": {
+        "primary": "#01415C",
+        "secondary": "#84BA93",
+        "text_primary": "#0D2026",
+        "text_inverse": "#FFFCEC"
+    },
+    "typography": {
+        "font_families": {"primary": "Calibri Light", "body": "Calibri"},
+        "font_sizes": {"title": 44, "heading_1": 32, "body": 18}
+    }
+}
+
+Fingerprint = Tuple[Tuple[str, Optional[int]], ...]
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Immutable, fully-loaded template shared across generators.
+
+    The dict/list members are shared by every generator of this template and
+    must be treated as read-only; per-request state lives on the generator.
+    """
+    template_id: str
+    template_dir: Path
+    backgrounds_dir: Path
+    fingerprint: Fingerprint
+    config: Dict[str, Any]
+    constraints: Dict[str, Any]
+    theme: Dict[str, Any]
+    manifest: Optional[TemplateManifest]
+    icon_service: Optional[IconService]
+    chart_service: Optional[ChartService]
+    element_positions: Dict[str, Any] = field(default_factory=dict)
+    fonts_config: Dict[str, Any] = field(default_factory=dict)
+    icons_config: Dict[str, Any] = field(default_factory=dict)
+    colors_config: Dict[str, Any] = field(default_factory=dict)
+    available_title_icons: Tuple[str, ...] = ()
+    available_section_icons: Tuple[str, ...] = ()
+    icon_keyword_rules: Tuple[Dict, ...] = ()
+    category_to_icon: Dict[str, str] = field(default_factory=dict)
+    # Template-relative image path -> downscaled variant in CACHE_DIR
+    asset_variants: Dict[str, str] = field(default_factory=dict)
+
+
+# ============================================================================
+# COMPILATION
+# ============================================================================
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def compute_fingerprint(template_dir: Path) -> Fingerprint:
+    """Fingerprint a template directory by the mtimes of its source files."""
+    parts = [(name, _mtime_ns(template_dir / name)) for name in TEMPLATE_SOURCE_FILES]
+    # IconService reads the shared icon catalogue, so it is part of every fingerprint
+    parts.append(("assets/icons.json", _mtime_ns(Path(settings.ASSETS_DIR) / "icons.json")))
+    return tuple(parts)
+
+
+def _load_json(template_dir: Path, filename: str) -> Dict:
+    """Load JSON configuration file (empty dict when missing)"""
+    json_path = template_dir / filename
+    if not json_path.exists():
+        return {}
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _list_icons(template_dir: Path, icon_type: str) -> Tuple[str, ...]:
+    """List icons of a type (icon_{type}_*.png) from the template Icons directory"""
+    icons_dir = template_dir / "Icons"
+    if not icons_dir.exists():
+        return ()
+    prefix = f"icon_{icon_type}_"
+    return tuple(sorted(
+        f"Icons/{f.name}" for f in icons_dir.iterdir()
+        if f.is_file() and f.name.startswith(prefix)
+    ))
+
+
+def _load_icon_keywords(template_dir: Path) -> Tuple[Tuple[Dict, ...], Dict[str, str]]:
+    """Load icon_keywords.json as priority-sorted rules, or the legacy category_to_icon map"""
+    rules_out: List[Dict] = []
+    category_to_icon: Dict[str, str] = {}
+    if not (template_dir / "icon_keywords.json").exists():
+        return (), category_to_icon
+    try:
+        kw_data = _load_json(template_dir, "icon_keywords.json")
+        rules = kw_data.get("rules") or []
+        if rules:
+            # Sort by priority desc (higher wins); Python sort is stable so order preserved for ties
+            rules_out = sorted(rules, key=lambda r: -int(r.get("priority", 0)))
+            # Normalize: precompute keyword list and icons dict for fast matching
+            for r in rules_out:
+                r["_keywords"] = [str(k).strip().lower() for k in (r.get("keywords") or []) if k]
+                r["_icons"] = r.get("icons") or {}
+            logger.info(f"  Icon keyword rules: {len(rules_out)} rules (priority-based)")
+        else:
+            raw = kw_data.get("category_to_icon") or {}
+            for cat, path in raw.items():
+                if path and (template_dir / path).exists():
+                    category_to_icon[cat] = path
+            if category_to_icon:
+                logger.info(f"  Icon keyword mapping: {len(category_to_icon)} categories (legacy)")
+    except Exception as e:
+        logger.debug(f"Could not load icon_keywords.json: {e}")
+    return tuple(rules_out), category_to_icon
+
+
+def _prewarm_tinted_icons(compiled: CompiledTemplate) -> None:
+    """Tint every template icon in both slide foreground colors (dark/light text)"""
+    text_colors = compiled.colors_config.get('text', {})
+    tints = [text_colors.get('dark') or '0D2026', text_colors.get('light') or 'FFFCEC']
+    icons_dir = compiled.template_dir / "Icons"
+    if not icons_dir.exists():
+        return
+    sources = []
+    for icon_file in sorted(icons_dir.glob("*.png")):
+        variant = compiled.asset_variants.get(f"Icons/{icon_file.name}")
+        sources.append(Path(variant) if variant else icon_file)
+    try:
+        entries = get_tinted_icon_cache().prewarm(sources, tints)
+        logger.info(f"  Tinted icons prewarmed: {len(sources)} icons x {len(tints)} colors ({entries} cached)")
+    except Exception as e:
+        logger.warning(f"  Tinted icon prewarm failed: {e}")
+
+
+def compile_template(template_id: str, fingerprint: Optional[Fingerprint] = None) -> CompiledTemplate:
+    """Load, validate and pre-process a template directory into a CompiledTemplate."""
+    template_dir = Path(settings.TEMPLATES_DIR) / template_id
+    if not template_dir.exists():
+        raise FileNotFoundError(f"Template directory not found: {template_dir}")
+
+    logger.info(f"Compiling template: {template_dir}")
+    if fingerprint is None:
+        fingerprint = compute_fingerprint(template_dir)
+
+    backgrounds_dir = template_dir / "Background"
+    if not backgrounds_dir.exists():
+        backgrounds_dir = template_dir / "backgrounds"
+
+    config = _load_json(template_dir, "config.json")
+    constraints = _load_json(template_dir, "constraints.json")
+    theme = _load_json(template_dir, "theme.json") if (template_dir / "theme.json").exists() else DEFAULT_THEME
+
+    manifest: Optional[TemplateManifest] = None
+    manifest_path = template_dir / "manifest.json"
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            manifest = TemplateManifest(**data)
+            logger.info(f"  Manifest loaded: {len(manifest.layouts)} layouts")
+        except Exception as e:
+            logger.warning(f"  Could not load manifest: {e}")
+
+    try:
+        icon_service = IconService(template_id=template_id)
+    except Exception as e:
+        logger.warning(f"  IconService failed: {e}")
+        icon_service = None
+
+    try:
+        chart_service = ChartService(template_id=template_id)
+    except Exception as e:
+        logger.warning(f"  ChartService failed: {e}")
+        chart_service = None
+
+    # Element positions, fonts, icons, colors: prefer config, fallback to manifest
+    element_positions = config.get('element_positions', {})
+    if not element_positions and manifest and manifest.element_positions:
+        element_positions = manifest.element_positions
+
+    fonts_config = config.get('fonts', {})
+    if not fonts_config and manifest and manifest.fonts:
+        fonts_config = manifest.fonts.model_dump() if hasattr(manifest.fonts, 'model_dump') else {}
+
+    icons_config = config.get('icons', {})
+    if not icons_config and manifest and manifest.icons:
+        icons_config = {
+            'default_title': manifest.icons.default_title,
+            'default_section': manifest.icons.default_section,
+            'agenda_items': manifest.icons.agenda_items,
+            'box_icons': manifest.icons.box_icons
+        }
+
+    colors_config = config.get('colors', {})
+    if not colors_config and manifest and manifest.colors:
+        colors_config = manifest.colors.model_dump() if hasattr(manifest.colors, 'model_dump') else {}
+
+    # Section icons fall back to title icons if the template has none
+    available_title_icons = _list_icons(template_dir, 'title')
+    available_section_icons = _list_icons(template_dir, 'section') or available_title_icons
+
+    icon_keyword_rules, category_to_icon = _load_icon_keywords(template_dir)
+
+    asset_variants: Dict[str, str] = {}
+    if settings.ASSET_VARIANTS_ENABLED:
+        asset_variants = build_asset_variants(
+            template_id,
+            template_dir,
+            constraints,
+            element_positions,
+            background_paths=(config.get('background_images') or {}).values(),
+            icon_paths=[f"Icons/{f.name}" for f in (template_dir / "Icons").glob("*.png")],
+        )
+
+    compiled = CompiledTemplate(
+        template_id=template_id,
+        template_dir=template_dir,
+        backgrounds_dir=backgrounds_dir,
+        fingerprint=fingerprint,
+        config=config,
+        constraints=constraints,
+        theme=theme,
+        manifest=manifest,
+        icon_service=icon_service,
+        chart_service=chart_service,
+        element_positions=element_positions,
+        fonts_config=fonts_config,
+        icons_config=icons_config,
+        colors_config=colors_config,
+        available_title_icons=available_title_icons,
+        available_section_icons=available_section_icons,
+        icon_keyword_rules=icon_keyword_rules,
+        category_to_icon=category_to_icon,
+        asset_variants=asset_variants,
+    )
+    _prewarm_tinted_icons(compiled)
+    logger.info(
+        f"Template compiled: {template_id} "
+        f"({len(available_title_icons)} title icons, {len(available_section_icons)} section icons)"
+    )
+    return compiled
+
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+class TemplateCache:
+    """
+    Thread-safe, process-wide cache of CompiledTemplate objects.
+
+    Lookups stat the template source files; a changed mtime recompiles the
+    template and replaces the stale entry. Hit/miss counters are exposed via stats().
+    """
+
+    _instance: Optional['TemplateCache'] = None
+    _lock = Lock()
+
+    def __new__(cls):
+        """Singleton pattern for global cache access"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._entries: Dict[str, CompiledTemplate] = {}
+        self._compile_lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    def get(self, template_id: str) -> CompiledTemplate:
+        """Return the compiled template, compiling it if missing or stale."""
+        template_dir = Path(settings.TEMPLATES_DIR) / template_id
+        fingerprint = compute_fingerprint(template_dir)
+
+        entry = self._entries.get(template_id)
+        if entry is not None and entry.fingerprint == fingerprint:
+            self.hits += 1
+            return entry
+
+        # Serialize compiles so concurrent requests for a cold template build it once
+        with self._compile_lock:
+            entry = self._entries.get(template_id)
+            if entry is not None and entry.fingerprint == fingerprint:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            if entry is not None:
+                logger.info(f"Template changed on disk, recompiling: {template_id}")
+            entry = compile_template(template_id, fingerprint)
+            self._entries[template_id] = entry
+            return entry
+
+    def invalidate(self, template_id: Optional[str] = None) -> None:
+        """Drop one template (or all templates) from the cache."""
+        with self._compile_lock:
+            if template_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(template_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and cached template IDs"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "templates": sorted(self._entries.keys()),
+        }
+
+
+def get_template_cache() -> TemplateCache:
+    """Get the global template cache instance"""
+    return TemplateCache()
+
+
+def get_compiled_template(template_id: str) -> CompiledTemplate:
+    """Convenience function to get a compiled template"""
+    return get_template_cache().get(template_id)
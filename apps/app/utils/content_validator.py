@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from ..models.presentation import SlideContent, BulletPoint
 
 logger = logging.getLogger("content_validator")
@@ -19,193 +19,230 @@ def validate_presentation(slides: List[SlideContent]) -> List[SlideContent]:
     """
     logger.info(f"🔍 Validating {len(slides)} slides...")
     
+    validator = SlideValidator()
     validated_slides = []
-    stats = {
-        "total_bullets": 0,
-        "section_headers": 0,
-        "agenda_slides": 0,
-        "chart_slides": 0,
-        "table_slides": 0,
-        "four_box_slides": 0,
-        "split_slides": 0,
-        "blank_removed": 0,
-        "orphaned_sections_fixed": 0
-    }
-    
-    i = 0
-    while i < len(slides):
-        slide = slides[i]
-        
-        # Get layout info
-        layout_type = getattr(slide, 'layout_type', '')
-        content_type = getattr(slide, 'content_type', '')
-        layout_hint = getattr(slide, 'layout_hint', '') or layout_type or content_type
-        
-        # CRITICAL: Check for section headers
-        if 'section' in layout_hint.lower():
-            # Section headers should NEVER have bullets
-            if slide.bullets and len(slide.bullets) > 0:
-                logger.warning(f"⚠️  REMOVED {len(slide.bullets)} bullets from section: '{slide.title}'")
-                slide.bullets = []
-            
-            # SPECIAL CASE: Thank You slide should ALWAYS be kept
-            if any(word in slide.title.lower() for word in ['thank', 'thanks', 'شكر']):
-                logger.info(f"✅ Preserving Thank You slide: '{slide.title}'")
-                stats["section_headers"] += 1
-                validated_slides.append(slide)
-                i += 1
-                continue
-            
-            # Check if next slide has content
-            has_content_after = False
-            if i + 1 < len(slides):
-                next_slide = slides[i + 1]
-                # layout_hint on next_slide may be None – normalize safely
-                raw_next_layout = getattr(next_slide, 'layout_hint', None) \
-                    or getattr(next_slide, 'layout_type', None) \
-                    or getattr(next_slide, 'content_type', None) \
-                    or ''
-                next_layout = str(raw_next_layout).lower()
-                
-                if 'section' not in next_layout:
-                    next_bullets = getattr(next_slide, 'bullets', [])
-                    next_content = getattr(next_slide, 'content', None)
-                    next_table = getattr(next_slide, 'table_data', None)
-                    next_chart = getattr(next_slide, 'chart_data', None)
-                    
-                    has_content_after = (
-                        (next_bullets and len(next_bullets) > 0) or
-                        (next_content and len(next_content.strip()) > 0) or
-                        (next_table and _has_valid_table(next_table)) or
-                        (next_chart and _has_valid_chart(next_chart))
-                    )
-            
-            if not has_content_after:
-                logger.warning(f"⚠️  ORPHANED section removed: '{slide.title}'")
-                stats["orphaned_sections_fixed"] += 1
-                i += 1
-                continue
-            
+    for slide in slides:
+        validated_slides.extend(validator.push(slide))
+    validated_slides.extend(validator.close())
+    return validated_slides
+
+
+class SlideValidator:
+    """
+    validate_presentation one slide at a time, for slides that arrive while the
+    model is still streaming. A slide is validated once the next one has arrived
+    (a section header is dropped when no content follows it), so push() returns
+    the validated form of the previous slide and close() that of the last one.
+    """
+    
+    def __init__(self):
+        self.stats = {
+            "total_bullets": 0,
+            "section_headers": 0,
+            "agenda_slides": 0,
+            "chart_slides": 0,
+            "table_slides": 0,
+            "four_box_slides": 0,
+            "split_slides": 0,
+            "blank_removed": 0,
+            "orphaned_sections_fixed": 0
+        }
+        self.received = 0
+        self.validated = 0
+        self._pending: Optional[SlideContent] = None
+    
+    def push(self, slide: SlideContent) -> List[SlideContent]:
+        """Queue a slide; returns the validated slides of the previously queued one"""
+        self.received += 1
+        validated_slides: List[SlideContent] = []
+        if self._pending is not None:
+            _validate_slide(self._pending, slide, self.stats, validated_slides)
+        self._pending = slide
+        self.validated += len(validated_slides)
+        return validated_slides
+    
+    def close(self) -> List[SlideContent]:
+        """Validate the last queued slide and log the run's stats"""
+        validated_slides: List[SlideContent] = []
+        if self._pending is not None:
+            _validate_slide(self._pending, None, self.stats, validated_slides)
+            self._pending = None
+        self.validated += len(validated_slides)
+        _log_validation_stats(self.stats, self.received, self.validated)
+        return validated_slides
+
+
+def _validate_slide(
+    slide: SlideContent,
+    next_slide: Optional[SlideContent],
+    stats: Dict[str, int],
+    validated_slides: List[SlideContent],
+) -> None:
+    """Append the validated form of one slide (nothing, the slide, or its splits)"""
+    # Get layout info
+    layout_type = getattr(slide, 'layout_type', '')
+    content_type = getattr(slide, 'content_type', '')
+    layout_hint = getattr(slide, 'layout_hint', '') or layout_type or content_type
+    
+    # CRITICAL: Check for section headers
+    if 'section' in layout_hint.lower():
+        # Section headers should NEVER have bullets
+        if slide.bullets and len(slide.bullets) > 0:
+            logger.warning(f"⚠️  REMOVED {len(slide.bullets)} bullets from section: '{slide.title}'")
+            slide.bullets = []
+        
+        # SPECIAL CASE: Thank You slide should ALWAYS be kept
+        if any(word in slide.title.lower() for word in ['thank', 'thanks', 'شكر']):
+            logger.info(f"✅ Preserving Thank You slide: '{slide.title}'")
             stats["section_headers"] += 1
             validated_slides.append(slide)
-            i += 1
-            continue
-        
-        # Check content types
-        has_bullets = slide.bullets and len(slide.bullets) > 0
-        
-        # ✅ CLEAN BULLET TEXT: Remove periods from bullet points
-        if has_bullets and slide.bullets:
-            from .text_formatter import clean_bullet_text
-            for bullet in slide.bullets:
-                if hasattr(bullet, 'text') and bullet.text:
-                    original_text = bullet.text
-                    cleaned_text = clean_bullet_text(bullet.text, remove_periods=True)
-                    if cleaned_text != original_text:
-                        bullet.text = cleaned_text
-                        logger.debug(f"   🧹 Cleaned bullet: removed period/formatting")
-        
-        has_content = False
-        content_text = getattr(slide, 'content', None)
-        if content_text and len(content_text.strip()) > 0:
-            has_content = True
-        
-        # Check table (CRITICAL: Proper validation)
-        has_table = False
-        table_data = getattr(slide, 'table', None) or getattr(slide, 'table_data', None)
-        if table_data and _has_valid_table(table_data):
-            has_table = True
-        
-        # Check chart (CRITICAL: Proper validation)
-        has_chart = False
-        chart_data = getattr(slide, 'chart', None) or getattr(slide, 'chart_data', None)
-        if chart_data and _has_valid_chart(chart_data):
-            has_chart = True
-        
-        # Skip ONLY completely blank slides
-        if not (has_bullets or has_table or has_chart or has_content):
-            logger.info(f"⚠️  BLANK SLIDE REMOVED: '{slide.title}'")
-            stats["blank_removed"] += 1
-            i += 1
-            continue
-        
-        # Handle table splitting
-        if has_table and table_data:
-            table_rows = getattr(table_data, 'rows', [])
-            if len(table_rows) > TABLE_MAX_ROWS:
-                logger.info(f"✂️  Splitting table '{slide.title}' ({len(table_rows)} rows)")
-                table_splits = split_table_to_slides(table_data, slide.title)
+            return
+        
+        # Check if next slide has content
+        has_content_after = False
+        if next_slide is not None:
+            # layout_hint on next_slide may be None – normalize safely
+            raw_next_layout = getattr(next_slide, 'layout_hint', None) \
+                or getattr(next_slide, 'layout_type', None) \
+                or getattr(next_slide, 'content_type', None) \
+                or ''
+            next_layout = str(raw_next_layout).lower()
+            
+            if 'section' not in next_layout:
+                next_bullets = getattr(next_slide, 'bullets', [])
+                next_content = getattr(next_slide, 'content', None)
+                next_table = getattr(next_slide, 'table_data', None)
+                next_chart = getattr(next_slide, 'chart_data', None)
                 
-                for idx, split_data in enumerate(table_splits):
-                    new_slide = SlideContent(
-                        title=slide.title,
-                        subtitle=split_data["subtitle"],
-                        content_type=content_type,
-                        layout_type=layout_type,
-                        layout_hint='table_slide',
-                        bullets=None,
-                        content=None,
-                        table_data=type(table_data)(
-                            rows=split_data["table_rows"],
-                            headers=getattr(table_data, 'headers', [])
-                        ),
-                        chart_data=None
-                    )
-                    validated_slides.append(new_slide)
-                    stats["table_slides"] += 1
-                    if idx > 0:
-                        stats["split_slides"] += 1
-                i += 1
-                continue
+                has_content_after = (
+                    (next_bullets and len(next_bullets) > 0) or
+                    (next_content and len(next_content.strip()) > 0) or
+                    (next_table and _has_valid_table(next_table)) or
+                    (next_chart and _has_valid_chart(next_chart))
+                )
         
-        # Handle bullet overflow
-        if will_overflow(slide):
-            logger.info(f"✂️  Splitting overflowing slide: '{slide.title}'")
-            splits = smart_split_bullets(slide.bullets or [], slide.title, layout_hint)
+        if not has_content_after:
+            logger.warning(f"⚠️  ORPHANED section removed: '{slide.title}'")
+            stats["orphaned_sections_fixed"] += 1
+            return
+        
+        stats["section_headers"] += 1
+        validated_slides.append(slide)
+        return
+    
+    # Check content types
+    has_bullets = slide.bullets and len(slide.bullets) > 0
+    
+    # ✅ CLEAN BULLET TEXT: Remove periods from bullet points
+    if has_bullets and slide.bullets:
+        from .text_formatter import clean_bullet_text
+        for bullet in slide.bullets:
+            if hasattr(bullet, 'text') and bullet.text:
+                original_text = bullet.text
+                cleaned_text = clean_bullet_text(bullet.text, remove_periods=True)
+                if cleaned_text != original_text:
+                    bullet.text = cleaned_text
+                    logger.debug(f"   🧹 Cleaned bullet: removed period/formatting")
+    
+    has_content = False
+    content_text = getattr(slide, 'content', None)
+    if content_text and len(content_text.strip()) > 0:
+        has_content = True
+    
+    # Check table (CRITICAL: Proper validation)
+    has_table = False
+    table_data = getattr(slide, 'table', None) or getattr(slide, 'table_data', None)
+    if table_data and _has_valid_table(table_data):
+        has_table = True
+    
+    # Check chart (CRITICAL: Proper validation)
+    has_chart = False
+    chart_data = getattr(slide, 'chart', None) or getattr(slide, 'chart_data', None)
+    if chart_data and _has_valid_chart(chart_data):
+        has_chart = True
+    
+    # Skip ONLY completely blank slides
+    if not (has_bullets or has_table or has_chart or has_content):
+        logger.info(f"⚠️  BLANK SLIDE REMOVED: '{slide.title}'")
+        stats["blank_removed"] += 1
+        return
+    
+    # Handle table splitting
+    if has_table and table_data:
+        table_rows = getattr(table_data, 'rows', [])
+        if len(table_rows) > TABLE_MAX_ROWS:
+            logger.info(f"✂️  Splitting table '{slide.title}' ({len(table_rows)} rows)")
+            table_splits = split_table_to_slides(table_data, slide.title)
             
-            for idx, split_data in enumerate(splits):
+            for idx, split_data in enumerate(table_splits):
                 new_slide = SlideContent(
                     title=slide.title,
                     subtitle=split_data["subtitle"],
                     content_type=content_type,
                     layout_type=layout_type,
-                    layout_hint=layout_hint,
-                    bullets=split_data["bullets"],
+                    layout_hint='table_slide',
+                    bullets=None,
                     content=None,
-                    table_data=None,
+                    table_data=type(table_data)(
+                        rows=split_data["table_rows"],
+                        headers=getattr(table_data, 'headers', [])
+                    ),
                     chart_data=None
                 )
                 validated_slides.append(new_slide)
-                stats["total_bullets"] += len(split_data["bullets"])
-                
-                if 'agenda' in layout_hint.lower():
-                    stats["agenda_slides"] += 1
-                elif 'four' in layout_hint.lower() and 'box' in layout_hint.lower():
-                    stats["four_box_slides"] += 1
-                
+                stats["table_slides"] += 1
                 if idx > 0:
                     stats["split_slides"] += 1
-        else:
-            # No overflow - add as is
-            validated_slides.append(slide)
-            
-            if slide.bullets:
-                stats["total_bullets"] += len(slide.bullets)
-            if has_chart:
-                stats["chart_slides"] += 1
-                logger.info(f"✅ Chart slide preserved: '{slide.title}'")
-            if has_table:
-                stats["table_slides"] += 1
-                logger.info(f"✅ Table slide preserved: '{slide.title}'")
+            return
+    
+    # Handle bullet overflow
+    if will_overflow(slide):
+        logger.info(f"✂️  Splitting overflowing slide: '{slide.title}'")
+        splits = smart_split_bullets(slide.bullets or [], slide.title, layout_hint)
+        
+        for idx, split_data in enumerate(splits):
+            new_slide = SlideContent(
+                title=slide.title,
+                subtitle=split_data["subtitle"],
+                content_type=content_type,
+                layout_type=layout_type,
+                layout_hint=layout_hint,
+                bullets=split_data["bullets"],
+                content=None,
+                table_data=None,
+                chart_data=None
+            )
+            validated_slides.append(new_slide)
+            stats["total_bullets"] += len(split_data["bullets"])
             
             if 'agenda' in layout_hint.lower():
                 stats["agenda_slides"] += 1
             elif 'four' in layout_hint.lower() and 'box' in layout_hint.lower():
                 stats["four_box_slides"] += 1
-        
-        i += 1
-    
-    # Final validation warnings
+            
+            if idx > 0:
+                stats["split_slides"] += 1
+    else:
+        # No overflow - add as is
+        validated_slides.append(slide)
+        
+        if slide.bullets:
+            stats["total_bullets"] += len(slide.bullets)
+        if has_chart:
+            stats["chart_slides"] += 1
+            logger.info(f"✅ Chart slide preserved: '{slide.title}'")
+        if has_table:
+            stats["table_slides"] += 1
+            logger.info(f"✅ Table slide preserved: '{slide.title}'")
+        
+        if 'agenda' in layout_hint.lower():
+            stats["agenda_slides"] += 1
+        elif 'four' in layout_hint.lower() and 'box' in layout_hint.lower():
+            stats["four_box_slides"] += 1
+
+
+def _log_validation_stats(stats: Dict[str, int], received: int, validated: int) -> None:
+    """Final validation warnings"""
     if stats["chart_slides"] < 3:
         logger.warning(f"⚠️  WARNING: Only {stats['chart_slides']} chart slides (need 3+)")
     if stats["four_box_slides"] < 2:
@@ -213,10 +250,8 @@ def validate_presentation(slides: List[SlideContent]) -> List[SlideContent]:
     if stats["table_slides"] < 1:
         logger.warning(f"⚠️  WARNING: Only {stats['table_slides']} table slides (need 1+)")
     
-    logger.info(f"✅ Validation complete: {len(slides)} → {len(validated_slides)} slides")
+    logger.info(f"✅ Validation complete: {received} → {validated} slides")
     logger.info(f"   Stats: {stats}")
-    
-    return validated_slides
 
 
 def _has_valid_table(table_data) -> bool:
@@ -0,0 +1,170 @@
+"""
+Deck Chunks Module
+Map-reduce helpers for very large proposals: split the markdown, merge the chunk decks.
+
+A proposal past the single-call limit used to go to the model in one giant
+request (the slowest and most failure-prone one we make) with only a warning
+logged. The markdown is now split at section boundaries of the shared markdown
+AST into chunks under a size budget, preferring cuts before top-level headings,
+and each chunk's slides are generated by its own request. The chunk decks are
+merged back in document order:
+
+- deck title/subtitle/author come from the first chunk that has them;
+- title-layout slides are kept from the first chunk only;
+- every chunk's agenda is folded into one agenda (items deduplicated, in order)
+  at the front of the deck;
+- closing ("thank you") slides are dropped from the middle and one is kept last;
+- numbered section headers ("1.", "02 -", ...) restart in every chunk, so they
+  are renumbered across the merged deck.
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from ..models.presentation import BulletPoint, PresentationData, SlideContent
+from .markdown_ast import parse_markdown
+
+logger = logging.getLogger("deck_chunks")
+
+_CLOSING_WORDS = ("thank", "thanks", "شكر")
+_SECTION_NUMBER = re.compile(r"^(\d{1,3})(\s*[.)\-–:]\s*|\s+)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+# ============================================================================
+# SPLIT
+# ============================================================================
+
+def split_markdown_chunks(markdown: str, max_chars: int) -> List[str]:
+    """
+    Consecutive heading sections grouped into chunks of at most max_chars
+    (a single longer section is kept whole). Once a chunk is half full it is
+    also cut before the next top-level heading. The chunks cover the markdown exactly.
+    """
+    sections = parse_markdown(markdown).sections
+    if not sections:
+        return [markdown] if markdown else []
+    top_level = min((s.heading.level for s in sections if s.heading is not None), default=1)
+
+    chunks: List[str] = []
+    start = end = sections[0].start
+    for section in sections:
+        size = end - start
+        next_size = section.end - section.start
+        major = section.heading is not None and section.heading.level == top_level
+        if size and (size + next_size > max_chars or (major and size >= max_chars // 2)):
+            chunks.append(markdown[start:end])
+            start = section.start
+        end = section.end
+        if next_size > max_chars:
+            logger.warning(f"Section of {next_size} chars exceeds the chunk budget ({max_chars}), kept whole")
+    chunks.append(markdown[start:end])
+    return chunks
+
+
+def markdown_outline(markdown: str, max_level: int = 2, limit: int = 80) -> List[str]:
+    """Headings up to max_level (indented by level), for giving every chunk the document's shape"""
+    outline = [
+        f"{'  ' * (s.heading.level - 1)}{s.heading.text}"
+        for s in parse_markdown(markdown).sections
+        if s.heading is not None and s.heading.level <= max_level
+    ]
+    return outline[:limit]
+
+
+# ============================================================================
+# MERGE
+# ============================================================================
+
+def _kind(slide: SlideContent) -> str:
+    """title | agenda | closing | body"""
+    layout = (slide.layout_type or "").lower()
+    hint = (slide.layout_hint or "").lower()
+    if layout == "title":
+        return "title"
+    if layout == "agenda" or "agenda" in hint:
+        return "agenda"
+    if any(word in (slide.title or "").lower() for word in _CLOSING_WORDS):
+        return "closing"
+    return "body"
+
+
+def _merge_agendas(agendas: List[SlideContent]) -> Optional[SlideContent]:
+    """The first agenda slide with every agenda's items, deduplicated in order"""
+    if not agendas:
+        return None
+    seen = set()
+    bullets: List[BulletPoint] = []
+    for agenda in agendas:
+        for bullet in agenda.bullets or []:
+            key = _WHITESPACE.sub(" ", bullet.text or "").strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                bullets.append(bullet)
+    return agendas[0].model_copy(update={"bullets": bullets})
+
+
+def renumber_sections(slides: List[SlideContent]) -> int:
+    """
+    Rewrite numbered section-header titles to one running sequence (keeping each
+    title's separator and zero padding); returns the number of titles changed.
+    """
+    sections = [s for s in slides if (s.layout_type or "").lower() in ("section", "section_header")]
+    numbered = [s for s in sections if _SECTION_NUMBER.match(s.title or "")]
+    # A stray number in a few titles ("100 Days Plan") is content, not section numbering
+    if len(numbered) < max(2, (len(sections) + 1) // 2):
+        return 0
+    changed = 0
+    for expected, slide in enumerate(numbered, 1):
+        match = _SECTION_NUMBER.match(slide.title)
+        digits = match.group(1)
+        number = str(expected).zfill(len(digits)) if digits.startswith("0") else str(expected)
+        if number != digits:
+            slide.title = number + slide.title[len(digits):]
+            changed += 1
+    return changed
+
+
+def merge_chunk_decks(decks: List[PresentationData]) -> PresentationData:
+    """One deck from chunk decks given in document order (see module docstring)"""
+    header: Dict[str, Optional[str]] = {}
+    default_title = PresentationData.model_fields["title"].default
+    for deck in decks:
+        if "title" not in header and deck.title and deck.title != default_title:
+            header.update(title=deck.title, subtitle=deck.subtitle, author=deck.author, language=deck.language)
+    if not header and decks:
+        first = decks[0]
+        header.update(title=first.title, subtitle=first.subtitle, author=first.author, language=first.language)
+
+    title_slides: List[SlideContent] = []
+    agendas: List[SlideContent] = []
+    closing: Optional[SlideContent] = None
+    body: List[SlideContent] = []
+    dropped = 0
+    for index, deck in enumerate(decks):
+        for slide in deck.slides:
+            kind = _kind(slide)
+            if kind == "title":
+                if index == 0:
+                    title_slides.append(slide)
+                else:
+                    dropped += 1
+            elif kind == "agenda":
+                agendas.append(slide)
+            elif kind == "closing":
+                if closing is not None:
+                    dropped += 1
+                closing = slide
+            else:
+                body.append(slide)
+
+    agenda = _merge_agendas(agendas)
+    renumbered = renumber_sections(body)
+    slides = title_slides + ([agenda] if agenda else []) + body + ([closing] if closing else [])
+    logger.info(
+        f"Merged {len(decks)} chunk decks: {len(slides)} slides "
+        f"({len(agendas)} agendas folded, {dropped} duplicate title/closing slides dropped, "
+        f"{renumbered} section numbers rewritten)"
+    )
+    return PresentationData(**{k: v for k, v in header.items() if v is not None}, slides=slides)
@@ -0,0 +1,318 @@
+"""
+Markdown AST Module
+One tokenizer for proposal markdown, shared by the Word builder, the PPT mappers
+and section-targeted regeneration.
+
+The same markdown used to be scanned line by line by separate parsers (Word
+document JSON, PPT MarkdownParser) and again by regen's own heading/anchor
+scanner, each with its own cleanup regexes. The tokenizer below does the cleanup
+once (code-fence joins, backticks, inline HTML) and emits a flat list of blocks
+(headings, bold subheadings, paragraphs, bullets, tables) carrying their raw
+source offsets; sections are the runs between headings. parse_markdown() caches
+the result per markdown sha256, so a proposal read by several consumers is
+tokenized once. Blocks are frozen: consumers must not mutate them.
+
+MarkdownTokenizer is incremental (feed/close) so streamed model output can be
+consumed as it arrives; the cached path is the same tokenizer fed in one go.
+"""
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+logger = logging.getLogger("markdown_ast")
+
+_HEADING = re.compile(r"^(#{1,6}) ")
+_BULLET = re.compile(r"^[\-\*\+]\s+")
+_NUMBERED = re.compile(r"^\d+\.\s+")
+_TABLE_SEPARATOR = re.compile(r"^\|[\s\-:]+\|")
+# A code fence at the end of a line is removed together with its newline
+_FENCE_AT_EOL = re.compile(r"```[\w]*$")
+
+
+class HTMLStripper(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.reset()
+        self.strict = False
+        self.convert_charrefs = True
+        self.text = []
+
+    def handle_data(self, d):
+        self.text.append(d)
+
+    def get_data(self):
+        return "".join(self.text)
+
+
+def strip_html(text: str) -> str:
+    s = HTMLStripper()
+    try:
+        s.feed(text)
+        return s.get_data()
+    except Exception:
+        return text
+
+
+@dataclass(frozen=True)
+class Block:
+    """
+    One markdown block.
+
+    kind: "heading" | "subheading" (a whole-line **bold** label) | "paragraph" |
+    "bullet" | "table". lines are the cleaned source lines (stripped, backticks
+    and HTML removed); text is the content without markdown markers (paragraph
+    lines joined with newlines). start/end are raw offsets into the source.
+    """
+    kind: str
+    start: int
+    end: int
+    lines: Tuple[str, ...]
+    text: str = ""
+    level: int = 0
+    ordered: bool = False
+    headers: Tuple[str, ...] = ()
+    rows: Tuple[Tuple[str, ...], ...] = ()
+
+
+@dataclass(frozen=True)
+class Section:
+    """A heading block (None for text before the first heading) and the blocks under it"""
+    heading: Optional[Block]
+    blocks: Tuple[Block, ...]
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class MarkdownDocument:
+    source: str
+    blocks: Tuple[Block, ...]
+    sections: Tuple[Section, ...] = field(default=())
+
+
+def _cells(line: str) -> Tuple[str, ...]:
+    return tuple(cell.strip() for cell in line.split("|") if cell.strip())
+
+
+class MarkdownTokenizer:
+    """
+    Incremental tokenizer: feed() text as it arrives, close() at the end. Each
+    block is handed to on_block once it is complete (a paragraph or table when
+    the next block starts), and all blocks are returned by close().
+
+    Tables continue across blank lines until a non-table line; a table's first
+    pipe line is its header and separator rows are skipped.
+    """
+
+    def __init__(self, on_block: Optional[Callable[[Block], None]] = None):
+        self.on_block = on_block
+        self.blocks: List[Block] = []
+        self._offset = 0
+        self._pending = ""
+        self._joined = ""
+        self._joined_start: Optional[int] = None
+        # open paragraph / table: (kind, start, end, lines, rows)
+        self._open: Optional[Dict[str, Any]] = None
+
+    def feed(self, text: str) -> None:
+        self._pending += text
+        while "\n" in self._pending:
+            raw, self._pending = self._pending.split("\n", 1)
+            start = self._offset
+            self._offset += len(raw) + 1
+            fence = _FENCE_AT_EOL.search(raw)
+            if fence:
+                if self._joined_start is None:
+                    self._joined_start = start
+                self._joined += raw[:fence.start()]
+                continue
+            self._take_line(raw, start)
+
+    def close(self) -> List[Block]:
+        if self._pending or self._joined:
+            start = self._offset
+            self._offset += len(self._pending)
+            self._take_line(self._pending, start)
+        self._pending = ""
+        self._close_open()
+        return self.blocks
+
+    # ---- blocks ---------------------------------------------------------
+
+    def _emit(self, block: Block) -> None:
+        self.blocks.append(block)
+        if self.on_block is not None:
+            self.on_block(block)
+
+    def _close_open(self) -> None:
+        current, self._open = self._open, None
+        if current is None:
+            return
+        lines = tuple(current["lines"])
+        if current["kind"] == "paragraph":
+            self._emit(Block("paragraph", current["start"], current["end"], lines, text="\n".join(lines)))
+        else:
+            self._emit(Block(
+                "table", current["start"], current["end"], lines,
+                headers=_cells(lines[0]), rows=tuple(current["rows"]),
+            ))
+
+    def _take_line(self, raw: str, start: int) -> None:
+        if self._joined_start is not None:
+            raw, start = self._joined + raw, self._joined_start
+            self._joined, self._joined_start = "", None
+        self._line(raw, start, self._offset)
+
+    def _line(self, raw: str, start: int, end: int) -> None:
+        stripped = raw.replace("`", "").strip()
+        if not stripped:
+            if self._open is not None and self._open["kind"] == "paragraph":
+                self._close_open()
+            return
+        stripped = strip_html(stripped)
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            self._close_open()
+            level = len(heading.group(1))
+            self._emit(Block("heading", start, end, (stripped,), text=stripped[level + 1:].strip(), level=level))
+            return
+
+        if stripped.startswith("**") and stripped.endswith("**") and len(stripped) > 4:
+            self._close_open()
+            self._emit(Block("subheading", start, end, (stripped,), text=stripped.strip("*").strip()))
+            return
+
+        if "|" in stripped:
+            if self._open is not None and self._open["kind"] == "table":
+                self._open["end"] = end
+                self._open["lines"].append(stripped)
+                if not _TABLE_SEPARATOR.match(stripped):
+                    row = _cells(stripped)
+                    if row:
+                        self._open["rows"].append(row)
+                return
+            self._close_open()
+            self._open = {"kind": "table", "start": start, "end": end, "lines": [stripped], "rows": []}
+            return
+
+        if self._open is not None and self._open["kind"] == "table":
+            self._close_open()
+
+        bullet = _BULLET.match(stripped)
+        numbered = None if bullet else _NUMBERED.match(stripped)
+        if bullet or numbered:
+            self._close_open()
+            marker = bullet or numbered
+            self._emit(Block(
+                "bullet", start, end, (stripped,),
+                text=stripped[marker.end():].strip(), ordered=numbered is not None,
+            ))
+            return
+
+        if self._open is None:
+            self._open = {"kind": "paragraph", "start": start, "end": end, "lines": [], "rows": []}
+        self._open["end"] = end
+        self._open["lines"].append(stripped)
+
+
+def build_sections(source: str, blocks: Tuple[Block, ...]) -> Tuple[Section, ...]:
+    """Split blocks at headings (any level); sections cover the source exactly"""
+    sections: List[Section] = []
+    heading: Optional[Block] = None
+    start = 0
+    body: List[Block] = []
+    for block in blocks:
+        if block.kind == "heading" and block.start > 0:
+            if heading is not None or body or block.start > start:
+                sections.append(Section(heading, tuple(body), start, block.start))
+            heading, body, start = block, [], block.start
+        elif block.kind == "heading":
+            heading = block
+        else:
+            body.append(block)
+    if heading is not None or body or start < len(source):
+        sections.append(Section(heading, tuple(body), start, len(source)))
+    return tuple(sections)
+
+
+def tokenize_markdown(markdown: str) -> MarkdownDocument:
+    """Uncached single pass over markdown"""
+    tokenizer = MarkdownTokenizer()
+    tokenizer.feed(markdown or "")
+    blocks = tuple(tokenizer.close())
+    return MarkdownDocument(markdown or "", blocks, build_sections(markdown or "", blocks))
+
+
+class MarkdownAstCache:
+    """Thread-safe LRU of MarkdownDocument keyed by the markdown's sha256"""
+
+    _instance: Optional['MarkdownAstCache'] = None
+    _lock = Lock()
+
+    def __new__(cls):
+        """Singleton pattern for global cache access"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._entries: "OrderedDict[str, MarkdownDocument]" = OrderedDict()
+        self._entries_lock = Lock()
+        self.max_entries = max(0, int(settings.MARKDOWN_AST_CACHE_SIZE))
+        self.hits = 0
+        self.misses = 0
+        self._initialized = True
+
+    def get(self, markdown: str) -> MarkdownDocument:
+        if self.max_entries == 0:
+            return tokenize_markdown(markdown)
+        key = hashlib.sha256((markdown or "").encode("utf-8")).hexdigest()
+        with self._entries_lock:
+            document = self._entries.get(key)
+            if document is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        document = tokenize_markdown(markdown)
+        with self._entries_lock:
+            self._entries[key] = document
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return document
+
+    def clear(self) -> None:
+        with self._entries_lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        with self._entries_lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def parse_markdown(markdown: str) -> MarkdownDocument:
+    """Cached AST for a markdown string"""
+    return MarkdownAstCache().get(markdown)
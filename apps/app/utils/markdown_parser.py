@@ -1,7 +1,8 @@
-import re
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+from .markdown_ast import parse_markdown
+
 
 class MarkdownParser:
     """Parse markdown content into structured presentation data"""
@@ -21,7 +22,6 @@ class MarkdownParser:
         Returns:
             Structured dictionary with presentation data
         """
-        lines = markdown_content.split('\n')
         self.sections = []
         self.title = None
         self.subtitle = None
@@ -29,64 +29,58 @@ class MarkdownParser:
         current_section = None
         current_content = []
         
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
+        for block in parse_markdown(markdown_content).blocks:
             # H1 - Main title
-            if line.startswith('# '):
+            if block.kind == 'heading' and block.level == 1:
                 if not self.title:
-                    self.title = line[2:].strip()
+                    self.title = block.text
                 else:
                     # H1 after first one becomes section
                     if current_section:
                         self._save_section(current_section, current_content)
-                    current_section = line[2:].strip()
+                    current_section = block.text
                     current_content = []
             
             # H2 - Subtitle or section
-            elif line.startswith('## '):
+            elif block.kind == 'heading' and block.level == 2:
                 if not self.subtitle and not current_section:
-                    self.subtitle = line[3:].strip()
+                    self.subtitle = block.text
                 else:
                     if current_section:
                         self._save_section(current_section, current_content)
-                    current_section = line[3:].strip()
+                    current_section = block.text
                     current_content = []
             
             # H3 - Subsection
-            elif line.startswith('### '):
+            elif block.kind == 'heading' and block.level == 3:
                 if current_section:
                     current_content.append({
                         'type': 'subsection',
-                        'text': line[4:].strip()
+                        'text': block.text
                     })
             
-            # Bullet points
-            elif line.startswith('- ') or line.startswith('* '):
-                bullet_text = line[2:].strip()
+            # Bullet points and numbered lists
+            elif block.kind == 'bullet':
                 current_content.append({
-                    'type': 'bullet',
-                    'text': bullet_text
+                    'type': 'numbered' if block.ordered else 'bullet',
+                    'text': block.text
                 })
             
-            # Numbered lists
-            elif re.match(r'^\d+\.\s', line):
-                bullet_text = re.sub(r'^\d+\.\s', '', line)
+            # Tables
+            elif block.kind == 'table':
                 current_content.append({
-                    'type': 'numbered',
-                    'text': bullet_text
+                    'type': 'table',
+                    'headers': list(block.headers),
+                    'rows': [list(row) for row in block.rows]
                 })
             
-            # Regular paragraph
+            # Regular paragraph (one item per line, as before)
             else:
-                current_content.append({
-                    'type': 'paragraph',
-                    'text': line
-                })
+                for line in block.lines:
+                    current_content.append({
+                        'type': 'paragraph',
+                        'text': line
+                    })
         
         # Save last section
         if current_section:
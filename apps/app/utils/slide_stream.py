@@ -0,0 +1,129 @@
+"""
+Slide Stream Module
+Incremental parser for streamed PresentationData JSON.
+
+Structured output used to arrive in one piece: nothing reached the caller until
+the model had written the whole deck. With the completion streamed, this parser
+scans each delta once (a small string/escape/nesting state machine, linear in the
+output) and hands back every element of the top-level "slides" array as soon as
+its closing brace arrives, so slide 1 can be validated and rendered while the
+model is still writing slide 20. Top-level fields written before the array
+(title, subtitle, ... — structured output follows schema order) are available as
+header once the array opens; the complete document is parsed at the end.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("slide_stream")
+
+
+class SlideStreamParser:
+    """
+    feed() streamed JSON text, get back the slide objects completed by it (as
+    dicts, in order). document() parses the full text once the stream is done.
+    """
+
+    def __init__(self, array_key: str = "slides"):
+        self.array_key = array_key
+        # Deltas are kept as a list and only joined for document()/header:
+        # appending to one string would copy the whole buffer on every delta
+        self._parts: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key_parts: Optional[List[str]] = None
+        self._expect_key = False
+        self._last_key: Optional[str] = None
+        self._last_key_start = 0
+        self._in_array = False
+        self._element_parts: Optional[List[str]] = None
+        self.slides_emitted = 0
+        self.header: Optional[Dict[str, Any]] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        if not delta:
+            return []
+        completed: List[Dict[str, Any]] = []
+        offset = self._length
+        # Start (in this delta) of the open top-level key string / slide element
+        key_from = 0
+        element_from = 0
+        for pos, ch in enumerate(delta):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_parts is not None:
+                        self._key_parts.append(delta[key_from:pos + 1])
+                        self._last_key = json.loads("".join(self._key_parts))
+                        self._key_parts = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._expect_key and len(self._stack) == 1:
+                    self._key_parts = []
+                    key_from = pos
+                    self._last_key_start = offset + pos
+            elif ch == "{":
+                if self._in_array and len(self._stack) == 2:
+                    self._element_parts = []
+                    element_from = pos
+                self._stack.append("{")
+                self._expect_key = True
+            elif ch == "[":
+                if len(self._stack) == 1 and self._last_key == self.array_key:
+                    self._in_array = True
+                    prefix = "".join(self._parts) + delta[:pos]
+                    self.header = self._header(prefix[:self._last_key_start])
+                self._stack.append("[")
+                self._expect_key = False
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._in_array and len(self._stack) == 2 and self._element_parts is not None:
+                    self._element_parts.append(delta[element_from:pos + 1])
+                    completed.append(self._element("".join(self._element_parts)))
+                    self._element_parts = None
+                elif ch == "]" and self._in_array and len(self._stack) == 1:
+                    self._in_array = False
+                self._expect_key = False
+            elif ch == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1] == "{"
+            elif ch == ":":
+                self._expect_key = False
+
+        # Carry the still-open key / element into the next delta
+        if self._key_parts is not None:
+            self._key_parts.append(delta[key_from:])
+        if self._element_parts is not None:
+            self._element_parts.append(delta[element_from:])
+        self._parts.append(delta)
+        self._length += len(delta)
+        return completed
+
+    def _element(self, raw: str) -> Dict[str, Any]:
+        self.slides_emitted += 1
+        return json.loads(raw)
+
+    @staticmethod
+    def _header(prefix: str) -> Dict[str, Any]:
+        """Fields before the array key: the prefix with its trailing comma closed off"""
+        try:
+            return json.loads(prefix.rstrip().rstrip(",") + "}")
+        except ValueError:
+            return {}
+
+    def document(self) -> Dict[str, Any]:
+        """The complete streamed JSON object"""
+        return json.loads(self.text)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+DOCX Table Benchmark
+Times the cell-by-cell python-docx table writer against the bulk oxml writer on
+large proposal tables (50x8 and 200x10 by default)
+"""
+
+import logging
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from typing import Optional
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+
+from apps.wordgenAgent.app.wordcom import (
+    _add_table,
+    _bgr_int_to_hex,
+    _bgr_int_to_rgb_tuple,
+    _set_paragraph_bidi,
+    default_CONFIG,
+    resolve_build_config,
+)
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("benchmark")
+
+
+# ============================================================================
+# CELL-BY-CELL BASELINE
+# ============================================================================
+
+def _set_table_width_pct(table, pct: int) -> None:
+    """Set table width as percentage using oxml (w:tblW type='pct')."""
+    pct = max(1, min(100, int(pct or 100)))
+    tblPr = table._tbl.tblPr
+    tblW = tblPr.find(qn('w:tblW'))
+    if tblW is None:
+        tblW = OxmlElement('w:tblW')
+        tblPr.append(tblW)
+    tblW.set(qn('w:type'), 'pct')
+    tblW.set(qn('w:w'), str(pct * 50))
+
+def _set_table_borders(table, color_bgr: int, line_style: int, line_width: int, visible: bool) -> None:
+    """Apply borders to a table via oxml."""
+    tblPr = table._tbl.tblPr
+    borders = tblPr.find(qn('w:tblBorders'))
+    if borders is None:
+        borders = OxmlElement('w:tblBorders')
+        tblPr.append(borders)
+    
+    if not visible:
+        for side in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+            el = borders.find(qn(f"w:{side}"))
+            if el is None:
+                el = OxmlElement(f"w:{side}")
+                borders.append(el)
+            el.set(qn('w:val'), 'nil')
+        return
+
+    color_hex = _bgr_int_to_hex(color_bgr) or "000000"
+    style_map = {
+        1: "single",
+        2: "double",
+        3: "dashed",
+        4: "dotted",
+    }
+    val = style_map.get(line_style, "single")
+    size = str(max(4, min(24, int(line_width or 8)))) 
+
+    for side in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
+        el = borders.find(qn(f"w:{side}"))
+        if el is None:
+            el = OxmlElement(f"w:{side}")
+            borders.append(el)
+        el.set(qn('w:val'), val)
+        el.set(qn('w:sz'), size)
+        el.set(qn('w:space'), "0")
+        el.set(qn('w:color'), color_hex)
+
+def _shade_cell(cell, fill_hex: Optional[str]) -> None:
+    if not fill_hex:
+        return
+    tcPr = cell._tc.get_or_add_tcPr()
+    shd = tcPr.find(qn('w:shd'))
+    if shd is None:
+        shd = OxmlElement('w:shd')
+        tcPr.append(shd)
+    shd.set(qn('w:val'), 'clear')
+    shd.set(qn('w:color'), 'auto')
+    shd.set(qn('w:fill'), fill_hex)
+
+
+def _add_table_cellwise(doc, headers, rows, cfg, rtl: bool):
+    """
+    Baseline writer: the table built through python-docx cell by cell (per-cell
+    shading and run fonts), as wordcom did before the bulk oxml writer.
+    """
+    headers = headers or []
+    rows = rows or []
+
+    n_rows = max(1, len(rows) + (1 if headers else 0))
+    n_cols = max(1, len(headers) if headers else (len(rows[0]) if rows and rows[0] else 1))
+
+    table = doc.add_table(rows=n_rows, cols=n_cols)
+    table.autofit = bool(cfg.get("table_autofit", True))
+    _set_table_width_pct(table, cfg.get("table_preferred_width", 100))
+    _set_table_borders(
+        table=table,
+        color_bgr=int(cfg.get("table_border_color", 0) or 0),
+        line_style=int(cfg.get("table_border_line_style", 1) or 1),
+        line_width=int(cfg.get("table_border_line_width", 1) or 1),
+        visible=bool(cfg.get("table_border_visible", True)),
+    )
+    header_fill = _bgr_int_to_hex(cfg.get("table_header_shading_color"))
+    body_fill = _bgr_int_to_hex(cfg.get("table_body_shading_color"))
+    font_rgb = _bgr_int_to_rgb_tuple(int(cfg.get("table_font_color", 0) or 0))
+
+    r_idx = 0
+    if headers:
+        for c_idx in range(min(n_cols, len(headers))):
+            cell = table.cell(r_idx, c_idx)
+            cell.text = ""
+            p = cell.paragraphs[0]
+            run = p.add_run(str(headers[c_idx]))
+            run.font.size = Pt(cfg.get("table_font_size", 10))
+            run.font.color.rgb = RGBColor(*font_rgb)
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            _set_paragraph_bidi(p, rtl)
+            _shade_cell(cell, header_fill)
+        r_idx += 1
+
+    for r in rows[: n_rows - r_idx]:
+        for c_idx in range(min(n_cols, len(r))):
+            cell = table.cell(r_idx, c_idx)
+            cell.text = ""
+            p = cell.paragraphs[0]
+            run = p.add_run(str(r[c_idx]))
+            run.font.size = Pt(cfg.get("table_font_size", 10))
+            run.font.color.rgb = RGBColor(*font_rgb)
+            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            _set_paragraph_bidi(p, rtl)
+            _shade_cell(cell, body_fill)
+        r_idx += 1
+
+
+WRITERS = {
+    "cellwise": _add_table_cellwise,
+    "bulk": _add_table,
+}
+
+
+def make_table(n_rows: int, n_cols: int):
+    """Header + n_rows body rows of short RFP-like cell text"""
+    headers = [f"Column {c + 1}" for c in range(n_cols)]
+    rows = [[f"R{r + 1}C{c + 1} requirement text" for c in range(n_cols)] for r in range(n_rows)]
+    return headers, rows
+
+
+def time_table(writer, headers, rows, cfg, rtl: bool) -> float:
+    """Build one document holding the table and serialize it; returns wall time in seconds"""
+    doc = Document()
+    start = time.perf_counter()
+    writer(doc, headers, rows, cfg, rtl)
+    doc.save(BytesIO())
+    return time.perf_counter() - start
+
+
+def main():
+    """Main function to run the benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark cell-by-cell vs bulk DOCX table writing")
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default="50x8,200x10",
+        help="Comma-separated ROWSxCOLS table sizes (default: 50x8,200x10)"
+    )
+    parser.add_argument(
+        "--language",
+        type=str,
+        default="english",
+        choices=["english", "arabic"],
+        help="Language (Arabic builds RTL tables) (default: english)"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timed runs per writer; the best run is reported (default: 3)"
+    )
+
+    args = parser.parse_args()
+    cfg, rtl = resolve_build_config(default_CONFIG, args.language)
+    cfg = dict(cfg)
+    # Shaded header and body so both writers do their shading work
+    cfg["table_header_shading_color"] = 0xD9D9D9
+    cfg["table_body_shading_color"] = 0xF2F2F2
+
+    print("\n📊 DOCX table benchmark")
+    print(f"   Language: {args.language}, Repeats: {args.repeats}")
+    for size in args.sizes.split(","):
+        n_rows, n_cols = (int(v) for v in size.lower().split("x"))
+        headers, rows = make_table(n_rows, n_cols)
+        results = {
+            name: min(time_table(writer, headers, rows, cfg, rtl) for _ in range(max(1, args.repeats)))
+            for name, writer in WRITERS.items()
+        }
+        print(f"   {n_rows}x{n_cols}:")
+        print(f"      Cell-by-cell: {results['cellwise']:.3f}s")
+        print(f"      Bulk oxml:    {results['bulk']:.3f}s")
+        if results['bulk'] > 0:
+            print(f"      Speedup:      {results['cellwise'] / results['bulk']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Slide Render Cache Benchmark
+Times re-rendering a 40-slide deck with 2 changed slides with and without the rendered-slide cache
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from apps.app.config import settings
+from apps.app.models.presentation import PresentationData
+from apps.app.services.pptx_generator import PptxGenerator
+from apps.app.services.slide_render_cache import SlideRenderCache
+from apps.app.utils.content_validator import validate_presentation
+from apps.preview_ppt import create_sample_presentation
+
+# Setup logging (generator logs are too chatty for timing runs)
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("benchmark")
+
+
+def create_decks(template_id: str, language: str, num_slides: int, changed: int):
+    """
+    The preview deck's slides repeated to num_slides and validated, and a copy with
+    `changed` of the validated slides edited. Validating up front means the renders
+    skip no edited slide, so the edited deck misses the cache exactly `changed` times.
+    """
+    sample = create_sample_presentation(template_id, language)
+    slides = validate_presentation([
+        sample.slides[i % len(sample.slides)].model_copy(deep=True)
+        for i in range(num_slides)
+    ])
+    base = sample.model_copy(update={"slides": slides})
+    edited = base.model_copy(deep=True)
+    changed = min(changed, len(slides))
+    step = len(slides) / (changed + 1)
+    for n in range(changed):
+        slide = edited.slides[int(step * (n + 1))]
+        slide.title = f"{slide.title} (revised)"
+    return base, edited, changed
+
+
+def time_render(template_id: str, language: str, presentation_data: PresentationData, cache):
+    """Render one deck to a stream; returns (wall time in seconds, cache hits, cache misses)"""
+    generator = PptxGenerator(template_id=template_id, language=language)
+    generator.slide_cache = cache
+    data = presentation_data.model_copy(deep=True)
+    start = time.perf_counter()
+    generator.generate_to_stream(data).close()
+    elapsed = time.perf_counter() - start
+    return elapsed, generator.slide_cache_hits, generator.slide_cache_misses
+
+
+def main():
+    """Main function to run the benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark re-rendering an edited deck with the slide cache")
+    parser.add_argument(
+        "--template",
+        type=str,
+        default=settings.DEFAULT_TEMPLATE,
+        help=f"Template ID to render (default: {settings.DEFAULT_TEMPLATE})"
+    )
+    parser.add_argument(
+        "--language",
+        type=str,
+        default="English",
+        choices=["English", "Arabic"],
+        help="Language for the presentation (default: English)"
+    )
+    parser.add_argument(
+        "--slides",
+        type=int,
+        default=40,
+        help="Number of content slides in the deck (default: 40)"
+    )
+    parser.add_argument(
+        "--changed",
+        type=int,
+        default=2,
+        help="Slides edited between the two renders (default: 2)"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timed runs per mode; the best run is reported (default: 3)"
+    )
+
+    args = parser.parse_args()
+    base, edited, changed = create_decks(args.template, args.language, args.slides, args.changed)
+
+    # Warm-up: compile the template and fill the tint cache
+    time_render(args.template, args.language, base, None)
+
+    uncached, cold, warm = [], [], []
+    for _ in range(max(1, args.repeats)):
+        uncached.append(time_render(args.template, args.language, edited, None)[0])
+        cache = SlideRenderCache(max(settings.SLIDE_RENDER_CACHE_SIZE, 2 * args.slides))
+        cold.append(time_render(args.template, args.language, base, cache)[0])
+        warm.append(time_render(args.template, args.language, edited, cache))
+
+    best_warm = min(warm)
+    hits, misses = best_warm[1], best_warm[2]
+    assert misses == changed and hits == len(base.slides) - changed, (
+        f"expected {len(base.slides) - changed} hits / {changed} misses, got {hits} / {misses}"
+    )
+    print("\n📊 Slide render cache benchmark")
+    print(f"   Template: {args.template}, Language: {args.language}")
+    print(f"   Slides: {len(base.slides) + 1} (incl. title, {args.slides} before validation)")
+    print(f"   Changed: {changed}, Repeats: {args.repeats}")
+    print(f"   No cache (edited deck):      {min(uncached):.3f}s")
+    print(f"   Cold cache (base deck):      {min(cold):.3f}s")
+    print(f"   Warm cache (edited deck):    {best_warm[0]:.3f}s")
+    print(f"   Hit rate:                    {hits}/{hits + misses} ({hits / max(1, hits + misses):.0%})")
+    if best_warm[0] > 0:
+        print(f"   Speedup:                     {min(uncached) / best_warm[0]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Slide Rendering Benchmark
+Times serial vs parallel per-slide asset preparation on a large sample deck
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from apps.app.config import settings
+from apps.app.models.presentation import PresentationData
+from apps.app.services.pptx_generator import PptxGenerator
+from apps.preview_ppt import create_sample_presentation
+
+# Setup logging (generator logs are too chatty for timing runs)
+logging.basicConfig(
+    level=logging.WARNING,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("benchmark")
+
+
+def create_large_presentation(template_id: str, language: str, num_slides: int) -> PresentationData:
+    """Repeat the preview deck's slides until the deck has num_slides slides"""
+    sample = create_sample_presentation(template_id, language)
+    slides = [
+        sample.slides[i % len(sample.slides)].model_copy(deep=True)
+        for i in range(num_slides)
+    ]
+    return sample.model_copy(update={"slides": slides})
+
+
+def time_generate(template_id: str, language: str, presentation_data: PresentationData, parallel: bool) -> float:
+    """Generate one deck and return wall time in seconds (output file is removed)"""
+    generator = PptxGenerator(template_id=template_id, language=language)
+    data = presentation_data.model_copy(deep=True)
+    start = time.perf_counter()
+    output_path = generator.generate(data, parallel=parallel)
+    elapsed = time.perf_counter() - start
+    Path(output_path).unlink(missing_ok=True)
+    return elapsed
+
+
+def main():
+    """Main function to run the benchmark"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark serial vs parallel slide rendering")
+    parser.add_argument(
+        "--template",
+        type=str,
+        default=settings.DEFAULT_TEMPLATE,
+        help=f"Template ID to render (default: {settings.DEFAULT_TEMPLATE})"
+    )
+    parser.add_argument(
+        "--language",
+        type=str,
+        default="English",
+        choices=["English", "Arabic"],
+        help="Language for the presentation (default: English)"
+    )
+    parser.add_argument(
+        "--slides",
+        type=int,
+        default=40,
+        help="Number of content slides in the deck (default: 40)"
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=3,
+        help="Timed runs per mode; the best run is reported (default: 3)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.PPTX_SLIDE_WORKERS,
+        help=f"Asset preparation workers (default: {settings.PPTX_SLIDE_WORKERS})"
+    )
+
+    args = parser.parse_args()
+    settings.PPTX_SLIDE_WORKERS = args.workers
+    # Time the builders, not splices from the rendered-slide cache
+    settings.SLIDE_RENDER_CACHE_SIZE = 0
+
+    presentation_data = create_large_presentation(args.template, args.language, args.slides)
+
+    # Warm-up: compile the template and fill the on-disk tint cache
+    time_generate(args.template, args.language, presentation_data, parallel=False)
+
+    results = {}
+    for mode, parallel in (("serial", False), ("parallel", True)):
+        runs = [
+            time_generate(args.template, args.language, presentation_data, parallel)
+            for _ in range(max(1, args.repeats))
+        ]
+        results[mode] = min(runs)
+
+    print("\n📊 Slide rendering benchmark")
+    print(f"   Template: {args.template}, Language: {args.language}")
+    print(f"   Slides: {args.slides + 1} (incl. title), Workers: {args.workers}, Repeats: {args.repeats}")
+    print(f"   Serial:   {results['serial']:.3f}s")
+    print(f"   Parallel: {results['parallel']:.3f}s")
+    if results['parallel'] > 0:
+        print(f"   Speedup:  {results['serial'] / results['parallel']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import React, { useState, useRef, useEffect, useMemo, useCallback } from 'react'
 import { Upload, FileText, Settings, Send, X, CheckCircle, ChevronDown, ChevronRight, ChevronUp, AlignLeft, Text ,Table, Layout, Type, Download, Globe, Loader, Database, CheckCircle2, AlertCircle, Menu, Trash2 } from 'lucide-react';
 import { createClient } from '@supabase/supabase-js';
 import MarkdownRenderer from './MarkdownRenderer.tsx';
-import { saveAllComments, safeJsonParse } from "./utils";
+import { saveAllComments, safeJsonParse, resolveStoredMarkdown } from "./utils";
 
 const DEFAULT_API_BASE_URL = `http://localhost:8000`; 
 const resolveApiBaseUrl = () => {
@@ -1184,7 +1184,7 @@ const UploadPage: React.FC<UploadPageProps> = () => {
           
           if (!error && data) {
             if (data.generated_markdown && typeof data.generated_markdown === "string") {
-              markdown = data.generated_markdown;
+              markdown = (await resolveStoredMarkdown(supabase, record.uuid, data.generated_markdown)) || "";
             }
             // Also update wordLink if we have proposal URL
             if (data.proposal && typeof data.proposal === "string") {
@@ -2405,7 +2405,7 @@ const UploadPage: React.FC<UploadPageProps> = () => {
             .limit(1)
             .maybeSingle();
           if (!error && data?.generated_markdown && typeof data.generated_markdown === "string") {
-            regeneratedMarkdown = data.generated_markdown;
+            regeneratedMarkdown = await resolveStoredMarkdown(supabase, jobUuid, data.generated_markdown);
           }
         } catch (fallbackErr) {
           console.warn("Fallback markdown fetch failed", fallbackErr);
@@ -39,3 +39,63 @@ export const safeJsonParse = <T extends JsonValue | Record<string, unknown> | un
     return fallback;
   }
 };
+
+const MARKDOWN_DELTA_PREFIX = "<!--mdv1:";
+const MARKDOWN_DELTA_SUFFIX = "-->";
+const MARKDOWN_CHECKPOINT_MARKER = "\n<!--mdv1:checkpoint-->";
+const MARKDOWN_SNAPSHOT_BUCKET = "word";
+
+type MarkdownDeltaOp = [number, number] | string;
+
+const splitMarkdownLines = (text: string): string[] => {
+  const parts = text.split("\n");
+  const lines = parts.slice(0, -1).map((part) => `${part}\n`);
+  const last = parts[parts.length - 1];
+  if (last) {
+    lines.push(last);
+  }
+  return lines;
+};
+
+/**
+ * Resolve a word_gen.generated_markdown value. The backend may store regenerated
+ * versions as a line delta against an immutable, content-addressed snapshot in the
+ * Word bucket (apps/app/core/markdown_versions.py); those are rebuilt here. A
+ * mid-stream checkpoint carries a trailing marker, which is dropped.
+ */
+export const resolveStoredMarkdown = async (
+  supabase: any,
+  uuid: string,
+  stored: string | null | undefined,
+): Promise<string | null> => {
+  if (stored?.endsWith(MARKDOWN_CHECKPOINT_MARKER)) {
+    stored = stored.slice(0, stored.length - MARKDOWN_CHECKPOINT_MARKER.length);
+  }
+  if (!stored || !stored.startsWith(MARKDOWN_DELTA_PREFIX) || !stored.endsWith(MARKDOWN_DELTA_SUFFIX)) {
+    return stored ?? null;
+  }
+
+  const delta = safeJsonParse<{ base_sha?: string; ops?: MarkdownDeltaOp[] } | null>(
+    stored.slice(MARKDOWN_DELTA_PREFIX.length, stored.length - MARKDOWN_DELTA_SUFFIX.length),
+    null,
+  );
+  if (!delta?.base_sha || !Array.isArray(delta.ops)) {
+    return null;
+  }
+
+  try {
+    const { data, error } = await supabase.storage
+      .from(MARKDOWN_SNAPSHOT_BUCKET)
+      .download(`${uuid}/markdown_snapshots/${delta.base_sha}.md`);
+    if (error || !data) {
+      return null;
+    }
+    const baseLines = splitMarkdownLines(await data.text());
+    return delta.ops
+      .map((op) => (typeof op === "string" ? op : baseLines.slice(op[0], op[0] + op[1]).join("")))
+      .join("");
+  } catch (error) {
+    console.warn("resolveStoredMarkdown: failed to load snapshot", error);
+    return null;
+  }
+};
@@ -1,9 +1,16 @@
+import asyncio
 import logging
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from apps.routes.rfp import router as rfp_router
+from apps.app.config import settings
+from apps.app.core.render_pool import shutdown_render_pool
+from apps.app.core.supabase_backend import close_supabase_backend
+from apps.app.services.template_cache import get_compiled_template
+from apps.wordgenAgent.app.api import wordgen_api
+from apps.wordgenAgent.app.stream_hub import get_stream_hub
 
 logging.basicConfig(
     level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
@@ -29,10 +36,20 @@ app.include_router(rfp_router, tags=["proposal"])
 @app.on_event("startup")
 async def startup_event():
     logger.info("RFP Proposal Platform API started")
+    # Compile the default template (asset variants, tinted icons) before the first request
+    try:
+        await asyncio.to_thread(get_compiled_template, settings.DEFAULT_TEMPLATE)
+    except Exception as e:
+        logger.warning(f"Template prewarm failed for {settings.DEFAULT_TEMPLATE}: {e}")
+    wordgen_api.start_file_sweeper()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("RFP Proposal Platform API shutting down")
+    shutdown_render_pool()
+    await get_stream_hub().shutdown()
+    await close_supabase_backend()
+    await wordgen_api.aclose()
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,17 +1,31 @@
 import os
 import json
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional, Iterator
 from openai import OpenAI
 from dotenv import load_dotenv
+from apps.app.config import settings
 from apps.api.services.supabase_service import (
     supabase,
+    get_markdown_content,
     save_generated_markdown,
 )
 from apps.wordgenAgent.app.document import generate_word_from_markdown
+from apps.regen_services.section_regen import (
+    RegenUnit,
+    SectionStreamCleaner,
+    fit_edited_text,
+    plan_section_edits,
+)
 load_dotenv(override=True)
 logger = logging.getLogger("regen_prompt")
 
+# End-of-stream marker on a section's delta queue
+_SECTION_DONE = object()
+
 
 def _sse_event_raw(event: str, data: str) -> bytes:
     """
@@ -30,12 +44,13 @@ def _sse_event_json(event: str, obj: Dict[str, Any]) -> bytes:
 def _get_latest_markdown_excluding(uuid: str, exclude_gen_id: Optional[str]) -> str:
     """
     Get the most recent markdown for uuid, excluding the row with exclude_gen_id (the new regen row).
-    Falls back to latest if exclusion yields nothing.
+    Falls back to latest if exclusion yields nothing. The version scan selects
+    metadata only; markdown is then read one version at a time.
     """
     try:
         q = (
             supabase.table("word_gen")
-            .select("generated_markdown, gen_id, created_at")
+            .select("gen_id, created_at")
             .eq("uuid", uuid)
             .order("created_at", desc=True)
         )
@@ -46,10 +61,10 @@ def _get_latest_markdown_excluding(uuid: str, exclude_gen_id: Optional[str]) ->
         for row in res.data:
             if exclude_gen_id and row.get("gen_id") == exclude_gen_id:
                 continue
-            md = (row.get("generated_markdown") or "").strip()
+            md = (get_markdown_content(uuid, row.get("gen_id")) or "").strip()
             if md:
                 return md
-        return (res.data[0].get("generated_markdown") or "")
+        return get_markdown_content(uuid, res.data[0].get("gen_id")) or ""
     except Exception as e:
         logger.exception(f"_get_latest_markdown_excluding failed for uuid={uuid}")
         raise
@@ -74,10 +89,10 @@ class MarkdownModifier:
     def __init__(self, api_key: str):
         self.client = OpenAI(api_key=api_key)
 
-    def create_modification_instructions(self, items: List[Dict[str, str]]) -> str:
+    def create_modification_instructions(self, items: List[Dict[str, str]], scope: str = "markdown") -> str:
         if not items:
             return "No modifications requested."
-        instructions = "You must modify ONLY the following specific content pieces in the markdown:\n\n"
+        instructions = f"You must modify ONLY the following specific content pieces in the {scope}:\n\n"
         for i, item in enumerate(items, 1):
             instructions += f"{i}. FIND THIS EXACT TEXT:\n"
             instructions += f"{item.get('comment1','')}"
@@ -87,11 +102,142 @@ class MarkdownModifier:
             "1. Modify only the specified spots.\n"
             "2. Keep all other content unchanged.\n"
             "3. Preserve markdown structure and formatting.\n"
-            "4. Return ONLY the full updated markdown (no JSON, no commentary).\n"
+            f"4. Return ONLY the full updated {scope} (no JSON, no commentary).\n"
         )
         return instructions
 
+    # ========================================================================
+    # SECTION-TARGETED REGENERATION
+    # ========================================================================
+
+    def plan_sections(self, markdown: str, items: List[Dict[str, str]]) -> Optional[List[RegenUnit]]:
+        """Section plan for the comments, or None to rewrite the whole document"""
+        if not settings.REGEN_SECTION_MODE or not items:
+            return None
+        return plan_section_edits(markdown, items)
+
+    def _section_messages(self, unit: RegenUnit, language: str) -> List[Dict[str, str]]:
+        modification_instructions = self.create_modification_instructions(unit.comments, scope="section")
+        system_prompt = (
+            "You are an expert in proposal writing and precise markdown editing.\n"
+            "You are editing one section of a larger proposal document.\n"
+            f"Generate output only in this language: {language}.\n"
+            "Return ONLY the updated section markdown — no JSON or explanations."
+        )
+        user_prompt = (
+            f"ORIGINAL SECTION:\n{unit.text}\n\n"
+            f"MODIFICATION INSTRUCTIONS:\n{modification_instructions}\n\n"
+            "Process and return the full updated section, keeping its heading."
+        )
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _edit_section(self, unit: RegenUnit, language: str) -> str:
+        if not unit.edited:
+            return unit.text
+        response = self.client.chat.completions.create(
+            model="gpt-4o",
+            messages=self._section_messages(unit, language),
+            temperature=0.3,
+        )
+        return fit_edited_text(unit.text, response.choices[0].message.content or "")
+
+    def _stream_section(
+        self,
+        unit: RegenUnit,
+        language: str,
+        deltas: "queue.Queue",
+        stop: threading.Event,
+    ) -> None:
+        """
+        Worker: put the section's streamed deltas on the queue, then _SECTION_DONE or
+        the error. Once stop is set the OpenAI stream is closed and nothing more is put.
+        """
+        if stop.is_set():
+            return
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-4o",
+                messages=self._section_messages(unit, language),
+                temperature=0.3,
+                stream=True,
+            )
+            try:
+                for chunk in response:
+                    if stop.is_set():
+                        logger.info("Section stream stopped: the consumer is gone")
+                        return
+                    if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content is not None:
+                        deltas.put(chunk.choices[0].delta.content)
+            finally:
+                response.close()
+            deltas.put(_SECTION_DONE)
+        except Exception as e:
+            deltas.put(e)
+
+    def _section_workers(self, units: List[RegenUnit]) -> int:
+        return max(1, min(settings.REGEN_SECTION_WORKERS, sum(1 for u in units if u.edited)))
+
+    def process_sections(self, units: List[RegenUnit], language: str) -> str:
+        """Edit the commented sections in parallel and splice them back in order"""
+        logger.info(
+            f"Section regeneration: {sum(1 for u in units if u.edited)} of {len(units)} units edited"
+        )
+        with ThreadPoolExecutor(max_workers=self._section_workers(units)) as executor:
+            parts = list(executor.map(lambda unit: self._edit_section(unit, language), units))
+        return "".join(parts)
+
+    def process_sections_streaming(self, units: List[RegenUnit], language: str) -> Iterator[str]:
+        """
+        Yield the spliced document as text chunks in document order. All edited
+        sections stream in parallel; later ones are buffered on their queue until
+        the sections before them have been forwarded. If the consumer stops early
+        (client gone, or a section failed) the running workers close their streams.
+        """
+        logger.info(
+            f"Streaming section regeneration: {sum(1 for u in units if u.edited)} of {len(units)} units edited"
+        )
+        executor = ThreadPoolExecutor(max_workers=self._section_workers(units), thread_name_prefix="regen-section")
+        stop = threading.Event()
+        try:
+            queues: List[Optional[queue.Queue]] = []
+            for unit in units:
+                if unit.edited:
+                    deltas: queue.Queue = queue.Queue()
+                    executor.submit(self._stream_section, unit, language, deltas, stop)
+                    queues.append(deltas)
+                else:
+                    queues.append(None)
+
+            for unit, deltas in zip(units, queues):
+                if deltas is None:
+                    yield unit.text
+                    continue
+                cleaner = SectionStreamCleaner(unit.text)
+                while True:
+                    item = deltas.get()
+                    if item is _SECTION_DONE:
+                        text = cleaner.close()
+                        if text:
+                            yield text
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    text = cleaner.feed(item)
+                    if text:
+                        yield text
+        finally:
+            # cancel_futures only drops queued sections; running ones watch stop
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
     def process_markdown(self, markdown: str, items: List[Dict[str, str]], language: str) -> str:
+        units = self.plan_sections(markdown, items)
+        if units is not None:
+            return self.process_sections(units, language)
+
         logger.info("Starting OpenAI markdown regeneration")
         modification_instructions = self.create_modification_instructions(items)
 
@@ -121,6 +267,18 @@ class MarkdownModifier:
         return content
 
     def process_markdown_streaming(self, markdown: str, items: List[Dict[str, str]], language: str) -> Iterator[bytes]:
+        units = self.plan_sections(markdown, items)
+        if units is not None:
+            buffer_chunks: List[str] = []
+            for content in self.process_sections_streaming(units, language):
+                buffer_chunks.append(content)
+                yield _sse_event_raw("chunk", content)
+            full_markdown = "".join(buffer_chunks)
+            logger.info(f"Streaming section regen completed, length: {len(full_markdown)} chars")
+            yield _sse_event_json("stage", {"stage": "saving_generated_text"})
+            yield _sse_event_json("result", {"markdown": full_markdown})
+            return
+
         logger.info("Starting OpenAI markdown regeneration with streaming")
         modification_instructions = self.create_modification_instructions(items)
 
@@ -164,9 +322,11 @@ def regenerate_markdown_with_comments(
     docConfig: Dict[str, Any],
     language: str = "english",
     comments: Optional[List[Dict[str, str]]] = None,
+    base_gen_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Regenerate markdown from a given source_markdown using user comments.
+    base_gen_id is the version source_markdown was read from (enables delta storage).
     """
     try:
         logger.info(f"[regen] Starting regeneration for uuid={uuid}, new_gen_id={gen_id}")
@@ -190,7 +350,7 @@ def regenerate_markdown_with_comments(
                 items=comments,
                 language=language,
             )
-        saved = save_generated_markdown(uuid, gen_id, updated_markdown)
+        saved = save_generated_markdown(uuid, gen_id, updated_markdown, base_gen_id=base_gen_id)
         if not saved:
             raise RuntimeError(f"Failed to save regenerated markdown for gen_id={gen_id}")
         urls = generate_word_from_markdown(
@@ -222,6 +382,7 @@ def regenerate_markdown_with_comments_streaming(
     docConfig: Dict[str, Any],
     language: str = "english",
     comments: Optional[List[Dict[str, str]]] = None,
+    base_gen_id: Optional[str] = None,
 ) -> Iterator[bytes]:
     """
     Streaming version of regenerate_markdown_with_comments.
@@ -244,7 +405,7 @@ def regenerate_markdown_with_comments_streaming(
             
             # Save immediately
             yield _sse_event_json("stage", {"stage": "saving_markdown"})
-            saved = save_generated_markdown(uuid, gen_id, updated_markdown)
+            saved = save_generated_markdown(uuid, gen_id, updated_markdown, base_gen_id=base_gen_id)
             if not saved:
                 raise RuntimeError(f"Failed to save markdown for gen_id={gen_id}")
                 
@@ -279,7 +440,7 @@ def regenerate_markdown_with_comments_streaming(
             updated_markdown = "".join(buffer_chunks) if buffer_chunks else source_markdown
             
             yield _sse_event_json("stage", {"stage": "saving_markdown"})
-            saved = save_generated_markdown(uuid, gen_id, updated_markdown)
+            saved = save_generated_markdown(uuid, gen_id, updated_markdown, base_gen_id=base_gen_id)
             if not saved:
                 raise RuntimeError(f"Failed to save regenerated markdown for gen_id={gen_id}")
 
@@ -0,0 +1,225 @@
+"""
+Section Regen Module
+Plans section-targeted regeneration: which heading sections each comment touches.
+
+Comment-driven regeneration used to send the whole proposal markdown to the model
+and stream back a full rewrite, even for a one-paragraph edit. The markdown is now
+split into the heading-delimited sections of the shared markdown AST; every
+comment's anchor (comment1) is located in the document and only the sections it
+touches are sent for editing. Untouched sections are kept byte for byte, edited
+ones are spliced back in order.
+
+Anchors are the text the user selected in the rendered proposal, so they are
+matched against a plain-text projection of the markdown (emphasis, heading/table
+markers, list bullets and whitespace runs removed) that maps back to raw offsets.
+If any anchor cannot be located, no plan is made and the caller falls back to the
+whole-document rewrite.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from apps.app.utils.markdown_ast import parse_markdown
+
+logger = logging.getLogger("section_regen")
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+]|\d+\.)\s+")
+_MARKUP_CHARS = set("*_`#|>")
+
+
+@dataclass
+class RegenUnit:
+    """A run of consecutive sections: edited when it has comments, kept verbatim otherwise"""
+    text: str
+    comments: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def edited(self) -> bool:
+        return bool(self.comments)
+
+
+def split_sections(markdown: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of the heading-delimited sections of the markdown AST;
+    text before the first heading is its own section. The spans cover the
+    markdown exactly.
+    """
+    return [(section.start, section.end) for section in parse_markdown(markdown).sections]
+
+
+def _plain_projection(text: str) -> Tuple[str, List[int]]:
+    """Lowercased plain text of markdown plus, per plain char, its raw offset"""
+    plain: List[str] = []
+    index: List[int] = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        marker = _LIST_MARKER.match(line)
+        start = marker.end() if marker else 0
+        for i in range(start, len(line)):
+            ch = line[i]
+            if ch in _MARKUP_CHARS:
+                continue
+            if ch.isspace():
+                if not plain or plain[-1] == " ":
+                    continue
+                ch = " "
+            plain.append(ch.lower())
+            index.append(offset + i)
+        if plain and plain[-1] != " ":
+            plain.append(" ")
+            index.append(offset + len(line) - 1)
+        offset += len(line)
+    return "".join(plain), index
+
+
+def _find_unique(text: str, needle: str) -> Optional[int]:
+    """Position of needle if it occurs exactly once in text, else None"""
+    pos = text.find(needle)
+    if pos < 0 or text.find(needle, pos + 1) >= 0:
+        return None
+    return pos
+
+
+def _locate(markdown: str, anchor: str, projection: Tuple[str, List[int]]) -> Optional[Tuple[int, int]]:
+    """
+    Raw (start, end) of an anchor: exact match first, then via the plain projection.
+    None if the anchor is missing or occurs more than once (it could be in any of
+    those sections, so the caller falls back to whole-document mode).
+    """
+    anchor = (anchor or "").strip()
+    if not anchor:
+        return None
+    if anchor in markdown:
+        pos = _find_unique(markdown, anchor)
+        return (pos, pos + len(anchor)) if pos is not None else None
+
+    plain, index = projection
+    needle, _ = _plain_projection(anchor)
+    needle = needle.strip()
+    if not needle:
+        return None
+    pos = _find_unique(plain, needle)
+    if pos is None:
+        return None
+    return index[pos], index[pos + len(needle) - 1] + 1
+
+
+def plan_section_edits(markdown: str, items: List[Dict[str, str]]) -> Optional[List[RegenUnit]]:
+    """
+    Units covering the whole markdown in order, with each comment attached to the
+    unit containing its anchor. Sections spanned by one anchor, or by anchors of
+    comments landing in the same section, are merged into one unit. None when an
+    anchor cannot be located or occurs more than once.
+    """
+    sections = split_sections(markdown)
+    if not sections:
+        return None
+    projection = _plain_projection(markdown)
+
+    # Union of sections per comment: [first, last] section index
+    spans: List[Tuple[int, int, Dict[str, str]]] = []
+    for item in items:
+        located = _locate(markdown, item.get("comment1", ""), projection)
+        if located is None:
+            logger.info("Comment anchor not found or not unique in markdown; using whole-document regeneration")
+            return None
+        start, end = located
+        first = next(i for i, (s, e) in enumerate(sections) if s <= start < e)
+        last = next(i for i, (s, e) in enumerate(sections) if s < end <= e)
+        spans.append((first, last, item))
+
+    # Merge overlapping section ranges into edited units
+    spans.sort(key=lambda span: span[0])
+    merged: List[Tuple[int, int, List[Dict[str, str]]]] = []
+    for first, last, item in spans:
+        if merged and first <= merged[-1][1]:
+            m_first, m_last, m_items = merged[-1]
+            merged[-1] = (m_first, max(m_last, last), m_items + [item])
+        else:
+            merged.append((first, last, [item]))
+
+    units: List[RegenUnit] = []
+    cursor = 0
+    for first, last, unit_items in merged:
+        if cursor < first:
+            units.append(RegenUnit(markdown[sections[cursor][0]:sections[first][0]]))
+        units.append(RegenUnit(markdown[sections[first][0]:sections[last][1]], unit_items))
+        cursor = last + 1
+    if cursor < len(sections):
+        units.append(RegenUnit(markdown[sections[cursor][0]:]))
+    return units
+
+
+class SectionStreamCleaner:
+    """
+    Turns streamed model output for one unit into text that splices like the
+    original: leading blank lines and a wrapping ``` fence are dropped, trailing
+    blank lines are replaced by the original unit's trailing whitespace. Output is
+    released as soon as it is known to be content, so chunks can be forwarded live
+    and their concatenation is exactly the spliced unit. Empty output keeps the
+    original unit.
+    """
+
+    def __init__(self, original: str):
+        self.original = original
+        self.trailing = original[len(original.rstrip()):]
+        self._line = ""      # current incomplete line
+        self._sent = 0       # chars of _line already released
+        self._held = ""      # separator withheld until more content follows
+        self._started = False
+        self._fenced = False
+
+    def feed(self, delta: str) -> str:
+        out: List[str] = []
+        self._line += delta or ""
+        while "\n" in self._line:
+            line, self._line = self._line.split("\n", 1)
+            out.append(self._finish_line(line))
+        partial = self._line
+        if partial.strip() and not partial.lstrip().startswith("`"):
+            self._started = True
+            if self._sent == 0:
+                out.append(self._held)
+                self._held = ""
+            out.append(partial[self._sent:])
+            self._sent = len(partial)
+        return "".join(out)
+
+    def _finish_line(self, line: str) -> str:
+        sent, self._sent = self._sent, 0
+        if sent:
+            self._held = "\n"
+            return line[sent:]
+        stripped = line.strip()
+        if not self._started:
+            if not stripped:
+                return ""
+            if stripped.startswith("```") and not self._fenced:
+                self._fenced = True
+                return ""
+            self._started = True
+        elif not stripped:
+            self._held += "\n"
+            return ""
+        elif self._fenced and stripped == "```":
+            # Closing fence of the wrapper unless more content follows
+            self._held += line + "\n"
+            return ""
+        out = self._held + line
+        self._held = "\n"
+        return out
+
+    def close(self) -> str:
+        out = self._finish_line(self._line) if self._line else ""
+        self._line = ""
+        if not self._started:
+            return self.original
+        return out + self.trailing
+
+
+def fit_edited_text(original: str, edited: str) -> str:
+    """Non-streamed model output for a unit, cleaned like SectionStreamCleaner"""
+    cleaner = SectionStreamCleaner(original)
+    return cleaner.feed(edited) + cleaner.close()
@@ -1,7 +1,8 @@
+import asyncio
 import logging
 from typing import Optional, Dict, Any, List
 import json
-from fastapi import APIRouter, HTTPException, Body, Path, Query
+from fastapi import APIRouter, HTTPException, Body, Header, Path, Query
 from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel, Field
 from apps.wordgenAgent.app.api import wordgen_api
@@ -9,12 +10,19 @@ from apps.api.services.supabase_service import (
     get_pdf_urls_by_uuid,
     get_generated_markdown,
     get_latest_gen_id,
+    get_markdown_checkpoint,
 )
 from apps.wordgenAgent.app.document import generate_word_from_markdown
 
 from apps.app.core.ppt_generation import run_initial_generation
 from apps.app.core.ppt_regeneration import run_regeneration
 from apps.app.core.supabase_service import get_proposal_url
+from apps.app.core.render_pool import RenderQueueFull
+from apps.app.core.generation_repository import get_generation_repository
+from apps.app.services.slide_render_cache import get_slide_render_cache
+from apps.wordgenAgent.app.file_cache import get_openai_file_cache
+from apps.wordgenAgent.app.word_artifacts import get_word_artifact_cache
+from apps.wordgenAgent.app.stream_hub import get_stream_hub, parse_last_event_id, sse_frame
 
 logger = logging.getLogger("routes.rfp")
 router = APIRouter()
@@ -38,33 +46,65 @@ class RegenRequest(BaseModel):
 
 
 @router.post("/initialgen/{uuid}")
-def initialgen(uuid: str = Path(...), request: InitialGenRequest = Body(...)):
+async def initialgen(
+    uuid: str = Path(...),
+    request: InitialGenRequest = Body(...),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
     try:
-        urls = get_pdf_urls_by_uuid(uuid)
-        if not urls or not urls.get("rfp_url") or not urls.get("supporting_url"):
-            raise HTTPException(status_code=404, detail="RFP/Supporting URLs not found for UUID")
-        gen_id = get_latest_gen_id(uuid)
+        gen_id = await asyncio.to_thread(get_latest_gen_id, uuid)
         if not gen_id:
             raise HTTPException(status_code=404, detail="No existing gen_id found for this UUID")
 
+        hub = get_stream_hub()
+        resume_from = parse_last_event_id(last_event_id)
+        if resume_from is not None:
+            run = hub.get(uuid, gen_id)
+            if run is not None:
+                logger.info(f"initialgen resuming uuid={uuid}, gen_id={gen_id} after event {resume_from}")
+                return StreamingResponse(run.subscribe(resume_from), media_type="text/event-stream")
+            # The run is not in this worker (restart, expiry, or live on another worker):
+            # serve its last checkpoint, and only call it done if the run completed
+            checkpoint = await asyncio.to_thread(get_markdown_checkpoint, uuid, gen_id)
+            if checkpoint:
+                markdown, complete = checkpoint
+                logger.info(
+                    f"initialgen restoring uuid={uuid}, gen_id={gen_id} from "
+                    f"{'complete' if complete else 'partial'} checkpoint"
+                )
+                frames = [sse_frame(resume_from + 1, "checkpoint", {"markdown": markdown})]
+                if complete:
+                    frames.append(sse_frame(resume_from + 2, "done", {"status": "restored_from_checkpoint"}))
+                else:
+                    frames.append(sse_frame(resume_from + 2, "error", {
+                        "status": "partial_checkpoint",
+                        "message": "Generation did not finish here; this is the markdown saved so far",
+                    }))
+                return StreamingResponse(iter(frames), media_type="text/event-stream")
+
+        urls = await asyncio.to_thread(get_pdf_urls_by_uuid, uuid)
+        if not urls or not urls.get("rfp_url") or not urls.get("supporting_url"):
+            raise HTTPException(status_code=404, detail="RFP/Supporting URLs not found for UUID")
+
         outline = None
         if request.docConfig and isinstance(request.docConfig, dict):
             outline = request.docConfig.get("outline")
 
-        def stream_generator():
-            for chunk in wordgen_api.generate_complete_proposal(
+        def proposal_events():
+            return wordgen_api.aproposal_events(
                 uuid=uuid,
-                gen_id=gen_id, 
+                gen_id=gen_id,
                 rfp_url=urls["rfp_url"],
                 supporting_url=urls["supporting_url"],
                 user_config=request.config or "",
                 doc_config=request.docConfig or {},
                 language=(request.language or "english").lower(),
                 outline=outline,
-            ):
-                yield chunk
+            )
 
-        return StreamingResponse(stream_generator(), media_type="text/event-stream")
+        # The run outlives this response; a dropped client reconnects with Last-Event-ID
+        run = hub.start(uuid, gen_id, proposal_events)
+        return StreamingResponse(run.subscribe(), media_type="text/event-stream")
 
     except HTTPException:
         logger.exception("initialgen HTTP error")
@@ -112,6 +152,7 @@ def regenerate(request: RegenRequest):
                 docConfig=doc_config,
                 language=language,
                 comments=comments,
+                base_gen_id=base_gen_id,
             ):
                 yield chunk
 
@@ -162,6 +203,7 @@ def download_proposal(
                 "uuid": uuid,
                 "gen_id": active_gen_id,
                 "proposal_word_url": res.get("proposal_word_url", ""),
+                "cache_hit": res.get("cache_hit", False),
                 "language": request.language or "english",
             }
         )
@@ -278,6 +320,9 @@ async def ppt_initialgen(body: PPTInitialGenRequest):
     
     except HTTPException:
         raise
+    except RenderQueueFull as e:
+        logger.warning(f"ppt-initialgen rejected: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         logger.exception("ppt-initialgen failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -341,6 +386,9 @@ async def ppt_regeneration(body: PPTRegenRequest):
     
     except HTTPException:
         raise
+    except RenderQueueFull as e:
+        logger.warning(f"ppt-regeneration rejected: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
     except Exception as e:
         logger.exception("ppt-regeneration failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -373,6 +421,33 @@ async def download(
 
 # ==================== UTILITY ENDPOINTS ====================
 
+@router.get("/metrics/generation-cache")
+async def generation_cache_metrics():
+    """Generation repository cache counters (round-trips avoided, hit rate)"""
+    return get_generation_repository().stats()
+
+
+@router.get("/metrics/openai-files")
+async def openai_file_cache_metrics():
+    """OpenAI file ID cache counters (PDF uploads skipped, bytes not re-sent)"""
+    cache = get_openai_file_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+@router.get("/metrics/word-artifacts")
+async def word_artifact_cache_metrics():
+    """Word artifact cache counters (builds + uploads skipped on unchanged downloads)"""
+    cache = get_word_artifact_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
+@router.get("/metrics/slide-cache")
+async def slide_render_cache_metrics():
+    """Rendered-slide cache counters (slides spliced instead of rebuilt, hit rate)"""
+    cache = get_slide_render_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+
 @router.get("/templates")
 async def list_available_templates():
     """List all available local templates"""
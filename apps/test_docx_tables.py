@@ -0,0 +1,124 @@
+"""
+Tests for the bulk DOCX table writer (wordgenAgent/app/wordcom.py _add_table).
+
+Run from the apps directory:
+    python -m pytest -q test_docx_tables.py
+"""
+
+import sys
+from io import BytesIO
+from pathlib import Path
+
+# Repo root on the path so the apps.* imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from apps.wordgenAgent.app.wordcom import _add_table, default_CONFIG
+
+
+def _reopen(doc):
+    buffer = BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return Document(buffer)
+
+
+def _texts(table):
+    return [[cell.text for cell in row.cells] for row in table.rows]
+
+
+def _config(**overrides):
+    cfg = dict(default_CONFIG)
+    cfg.update(overrides)
+    return cfg
+
+
+def test_shape_follows_headers():
+    doc = Document()
+    _add_table(
+        doc,
+        ["Role", "Name", "Days"],
+        [["Lead", "Alice", "20", "extra"], ["Engineer"]],
+        _config(),
+        False,
+    )
+    (table,) = _reopen(doc).tables
+    assert _texts(table) == [
+        ["Role", "Name", "Days"],
+        ["Lead", "Alice", "20"],
+        ["Engineer", "", ""],
+    ]
+
+
+def test_shape_without_headers_follows_first_row():
+    doc = Document()
+    _add_table(doc, [], [["a", "b"], ["c", "d", "e"]], _config(), False)
+    (table,) = _reopen(doc).tables
+    assert _texts(table) == [["a", "b"], ["c", "d"]]
+    look = table._tbl.tblPr.find(qn("w:tblLook"))
+    assert look.get(qn("w:firstRow")) == "0"
+
+
+def test_empty_table_is_one_cell():
+    doc = Document()
+    _add_table(doc, None, None, _config(), False)
+    (table,) = _reopen(doc).tables
+    assert _texts(table) == [[""]]
+
+
+def test_cell_text_is_escaped_and_keeps_tabs_and_breaks():
+    doc = Document()
+    _add_table(doc, ["A & B", "<tag>"], [["line 1\nline 2", "x\ty\x07", None]], _config(), False)
+    table = _reopen(doc).tables[0]
+    assert _texts(table) == [["A & B", "<tag>"], ["line 1\nline 2", "x\ty"]]
+    cell = table.rows[1].cells[0]._tc
+    assert len(cell.findall(".//" + qn("w:br"))) == 1
+
+
+def test_borders_width_and_shared_styles():
+    doc = Document()
+    cfg = _config(
+        table_preferred_width=80,
+        table_border_color=0x0000FF,
+        table_border_line_style=2,
+        table_border_line_width=12,
+        table_header_shading_color=0xFF0000,
+    )
+    _add_table(doc, ["h"], [["1"]], cfg, False)
+    _add_table(doc, ["h"], [["2"]], cfg, False)
+    first, second = _reopen(doc).tables
+
+    tbl_pr = first._tbl.tblPr
+    assert tbl_pr.find(qn("w:tblW")).get(qn("w:w")) == "4000"
+    top = tbl_pr.find(qn("w:tblBorders")).find(qn("w:top"))
+    assert (top.get(qn("w:val")), top.get(qn("w:sz")), top.get(qn("w:color"))) == (
+        "double",
+        "12",
+        "FF0000",
+    )
+
+    # Shading lives in one table style shared by both tables, not on every cell
+    style_id = tbl_pr.find(qn("w:tblStyle")).get(qn("w:val"))
+    assert second._tbl.tblPr.find(qn("w:tblStyle")).get(qn("w:val")) == style_id
+    assert not first._tbl.findall(".//" + qn("w:tc") + "/" + qn("w:tcPr") + "/" + qn("w:shd"))
+    fill = doc.styles.element.xpath(
+        f'w:style[@w:styleId="{style_id}"]/w:tblStylePr[@w:type="firstRow"]/w:tcPr/w:shd/@w:fill'
+    )
+    assert fill == ["0000FF"]
+
+
+def test_hidden_borders():
+    doc = Document()
+    _add_table(doc, ["h"], [["1"]], _config(table_border_visible=False), False)
+    borders = doc.tables[0]._tbl.tblPr.find(qn("w:tblBorders"))
+    assert {side.get(qn("w:val")) for side in borders} == {"nil"}
+
+
+def test_rtl_table_text_style():
+    doc = Document()
+    _add_table(doc, ["h"], [["1"]], _config(), True)
+    para_style = doc.tables[0].rows[0].cells[0].paragraphs[0].style
+    bidi = para_style.element.pPr.find(qn("w:bidi"))
+    assert bidi.get(qn("w:val")) == "1"
@@ -0,0 +1,109 @@
+"""
+Tests for the proposal JSON parser shared by the streamed and rebuilt Word paths
+(wordgenAgent/app/document.py).
+
+Run from the apps directory:
+    python -m pytest -q test_markdown_proposal_parser.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Repo root on the path so the apps.* imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apps.wordgenAgent.app.document import MarkdownProposalParser, parse_markdown_to_json
+
+PROPOSAL = """# Cloud Migration Proposal
+
+Opening paragraph before any section.
+
+## Executive Summary
+
+We migrate **all** workloads.
+Second line of the same paragraph.
+
+Another paragraph.
+
+## Approach
+
+- Assess the estate
+- Migrate in waves
+1. Numbered step
+
+Closing remark.
+
+### Team
+
+| Role | Name |
+|------|------|
+| Lead | Alice |
+| Engineer | Bob |
+
+**Delivery Model**
+
+Text under a bold subheading.
+
+#### Minor heading stays body text
+
+```markdown
+Fenced content.
+```
+"""
+
+SAMPLES = [
+    PROPOSAL,
+    "## No Title\n\nJust a section.\n",
+    "Plain text without headings.\n",
+    "# Only Title\n",
+    PROPOSAL.replace("\n", "\r\n"),
+]
+
+
+def _stream(markdown, rng):
+    titles, sections = [], []
+    parser = MarkdownProposalParser(on_section=sections.append, on_title=titles.append)
+    pos = 0
+    while pos < len(markdown):
+        step = rng.randint(1, 12)
+        parser.feed(markdown[pos : pos + step])
+        pos += step
+    return parser.close(), titles, sections
+
+
+def test_parsed_structure():
+    proposal = parse_markdown_to_json(PROPOSAL)
+    assert proposal["title"] == "Cloud Migration Proposal"
+    headings = [section["heading"] for section in proposal["sections"]]
+    assert headings == ["Executive Summary", "Approach", "Team", "Delivery Model"]
+
+    summary, approach, team, delivery = proposal["sections"]
+    assert "Another paragraph." in summary["content"]
+    assert approach["points"][:2] == ["Assess the estate", "Migrate in waves"]
+    assert "Closing remark." in approach["content"]
+    assert team["table"] == {
+        "headers": ["Role", "Name"],
+        "rows": [["Lead", "Alice"], ["Engineer", "Bob"]],
+    }
+    assert "Text under a bold subheading." in delivery["content"]
+    assert "Minor heading stays body text" in delivery["content"]
+
+
+def test_empty_markdown_gets_default_title():
+    assert parse_markdown_to_json("") == {"title": "Generated Proposal", "sections": []}
+    assert parse_markdown_to_json("  \n", language="arabic")["sections"] == []
+
+
+@pytest.mark.parametrize("markdown", SAMPLES)
+def test_streamed_parse_matches_full_parse(markdown):
+    expected = parse_markdown_to_json(markdown)
+    rng = random.Random(11)
+    for _ in range(25):
+        proposal, titles, sections = _stream(markdown, rng)
+        assert proposal == expected
+        # Every section is handed over exactly once, in order, and complete
+        assert sections == expected["sections"]
+        assert titles == ([expected["title"]] if markdown.lstrip().startswith("# ") else [])
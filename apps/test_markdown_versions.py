@@ -0,0 +1,174 @@
+"""
+Tests for delta-encoded word_gen markdown (app/core/markdown_versions.py).
+
+Run from the apps directory:
+    python -m pytest -q test_markdown_versions.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Repo root on the path so the apps.* imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apps.app.core import markdown_versions as mv
+
+BASE = "".join(f"## Section {i}\n\nParagraph {i} of the proposal.\n\n" for i in range(40))
+EDITED = BASE.replace("Paragraph 7 of the proposal.", "Paragraph 7, rewritten.")
+
+
+@pytest.fixture(autouse=True)
+def delta_settings(monkeypatch):
+    """Delta encoding on, and a fresh reconstruction cache for every test"""
+    monkeypatch.setattr(mv.settings, "MARKDOWN_DELTA_ENABLED", True)
+    monkeypatch.setattr(mv.settings, "MARKDOWN_SNAPSHOT_INTERVAL", 3)
+    monkeypatch.setattr(mv.settings, "MARKDOWN_DELTA_MAX_RATIO", 0.5)
+    monkeypatch.setattr(mv.settings, "MARKDOWN_VERSION_CACHE_SIZE", 16)
+    monkeypatch.setattr(mv, "_cache", None)
+
+
+class Store:
+    """word_gen rows and the snapshot bucket of one uuid"""
+
+    def __init__(self, **rows):
+        self.rows = dict(rows)
+        self.snapshots = {}
+
+    def encode(self, markdown, gen_id, base_gen_id):
+        stored = mv.encode_for_storage(
+            markdown,
+            gen_id,
+            base_gen_id,
+            self.rows.get,
+            self.snapshots.get,
+            self.snapshots.__setitem__,
+        )
+        self.rows[gen_id] = stored
+        return stored
+
+    def decode(self, gen_id):
+        return mv.decode_stored(self.rows[gen_id], self.snapshots.get)
+
+
+def test_split_lines_keeps_newlines():
+    assert mv.split_lines("a\nb\n") == ["a\n", "b\n"]
+    assert mv.split_lines("a\nb") == ["a\n", "b"]
+    assert mv.split_lines("") == []
+
+
+def test_delta_round_trip():
+    for target in (EDITED, BASE + "## Appendix\n", "## Title\n\n" + BASE, BASE[:-1]):
+        assert mv.apply_delta(BASE, mv.encode_delta(BASE, target)) == target
+
+
+def test_regeneration_is_stored_as_delta_against_snapshot():
+    store = Store(g1=BASE)
+    stored = store.encode(EDITED, "g2", "g1")
+
+    record = mv.parse_stored(stored)
+    assert record is not None
+    assert record.base_sha == mv.sha256_text(BASE)
+    assert record.depth == 1
+    assert len(stored) < len(EDITED)
+    # The plain base was written to the snapshot store under its content hash
+    assert store.snapshots == {record.base_sha: BASE}
+
+    mv._cache = None
+    assert store.decode("g2") == EDITED
+
+
+def test_deltas_never_chain():
+    store = Store(g1=BASE)
+    store.encode(EDITED, "g2", "g1")
+    third = EDITED.replace("Paragraph 9 of the proposal.", "Paragraph 9, rewritten.")
+    stored = store.encode(third, "g3", "g2")
+
+    record = mv.parse_stored(stored)
+    assert record.base_sha == mv.sha256_text(BASE)
+    assert record.depth == 2
+    mv._cache = None
+    assert store.decode("g3") == third
+
+
+def test_snapshot_interval_falls_back_to_full_markdown():
+    store = Store(g1=BASE)
+    text = BASE
+    for depth in range(1, 4):
+        text = text.replace(f"Paragraph {depth} of", f"Paragraph {depth}, edited, of")
+        assert mv.parse_stored(store.encode(text, f"g{depth + 1}", f"g{depth}")).depth == depth
+    text = text.replace("Paragraph 4 of", "Paragraph 4, edited, of")
+    assert store.encode(text, "g5", "g4") == text
+
+
+@pytest.mark.parametrize(
+    "base_gen_id, rows",
+    [
+        (None, {"g1": BASE}),
+        ("g2", {"g2": BASE}),
+        ("missing", {}),
+        ("g1", {"g1": ""}),
+    ],
+)
+def test_no_usable_base_stores_full_markdown(base_gen_id, rows):
+    assert Store(**rows).encode(EDITED, "g2", base_gen_id) == EDITED
+
+
+def test_disabled_stores_full_markdown(monkeypatch):
+    monkeypatch.setattr(mv.settings, "MARKDOWN_DELTA_ENABLED", False)
+    assert Store(g1=BASE).encode(EDITED, "g2", "g1") == EDITED
+
+
+def test_large_change_stores_full_markdown():
+    rewritten = "".join(f"## Part {i}\n\nNew text {i}.\n\n" for i in range(40))
+    assert Store(g1=BASE).encode(rewritten, "g2", "g1") == rewritten
+
+
+def test_failed_snapshot_upload_stores_full_markdown():
+    def fail(sha, text):
+        raise OSError("bucket unavailable")
+
+    stored = mv.encode_for_storage(EDITED, "g2", "g1", {"g1": BASE}.get, {}.get, fail)
+    assert stored == EDITED
+
+
+def test_missing_or_corrupt_snapshot_raises():
+    store = Store(g1=BASE)
+    store.encode(EDITED, "g2", "g1")
+    mv._cache = None
+
+    with pytest.raises(mv.MarkdownVersionError):
+        mv.decode_stored(store.rows["g2"], lambda sha: None)
+    with pytest.raises(mv.MarkdownVersionError):
+        mv.decode_stored(store.rows["g2"], lambda sha: BASE + "tampered")
+
+
+def test_plain_and_malformed_values_pass_through():
+    assert mv.decode_stored(BASE, lambda sha: pytest.fail("no snapshot needed")) == BASE
+    assert mv.decode_stored(None, lambda sha: None) is None
+    malformed = mv.ENVELOPE_PREFIX + "{not json" + mv.ENVELOPE_SUFFIX
+    assert mv.parse_stored(malformed) is None
+    assert mv.decode_stored(malformed, lambda sha: None) == malformed
+
+
+def test_checkpoint_marker():
+    stored = mv.mark_checkpoint(BASE)
+    assert mv.split_checkpoint(stored) == (BASE, False)
+    assert mv.split_checkpoint(BASE) == (BASE, True)
+    assert mv.decode_stored(stored, lambda sha: None) == BASE
+
+    # A checkpointed base is diffed without its marker
+    store = Store(g1=stored)
+    assert mv.parse_stored(store.encode(EDITED, "g2", "g1")) is not None
+    mv._cache = None
+    assert store.decode("g2") == EDITED
+
+
+def test_stored_matches():
+    store = Store(g1=BASE)
+    stored = store.encode(EDITED, "g2", "g1")
+    assert mv.stored_matches(stored, EDITED)
+    assert not mv.stored_matches(stored, BASE)
+    assert mv.stored_matches(BASE, BASE)
+    assert not mv.stored_matches(mv.mark_checkpoint(BASE), BASE)
@@ -0,0 +1,140 @@
+"""
+Tests for section-targeted regeneration planning (regen_services/section_regen.py).
+
+Run from the apps directory:
+    python -m pytest -q test_section_regen.py
+"""
+
+import random
+import sys
+from itertools import pairwise
+from pathlib import Path
+
+import pytest
+
+# Repo root on the path so the apps.* imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apps.regen_services.section_regen import (
+    SectionStreamCleaner,
+    fit_edited_text,
+    plan_section_edits,
+    split_sections,
+)
+
+MARKDOWN = (
+    "# Proposal\n\nIntro text.\n\n"
+    "## Scope\n\nWe deliver **cloud** migration.\n\n"
+    "## Timeline\n\nSix months.\n\n"
+    "## Team\n\n- Alice, lead\n- Bob\n"
+)
+
+
+def _edited(units):
+    return [
+        (unit.text, [item["comment1"] for item in unit.comments]) for unit in units if unit.edited
+    ]
+
+
+def test_sections_cover_markdown():
+    sections = split_sections(MARKDOWN)
+    assert len(sections) == 4
+    assert sections[0][0] == 0 and sections[-1][1] == len(MARKDOWN)
+    assert all(end == start for (_, end), (start, _) in pairwise(sections))
+
+
+def test_only_the_commented_section_is_edited():
+    units = plan_section_edits(MARKDOWN, [{"comment1": "Six months."}])
+    assert "".join(unit.text for unit in units) == MARKDOWN
+    assert _edited(units) == [("## Timeline\n\nSix months.\n\n", ["Six months."])]
+
+
+def test_anchor_matched_through_markdown_markup():
+    units = plan_section_edits(MARKDOWN, [{"comment1": "cloud migration"}])
+    assert _edited(units) == [
+        ("## Scope\n\nWe deliver **cloud** migration.\n\n", ["cloud migration"])
+    ]
+
+
+def test_anchor_spanning_sections_merges_them():
+    units = plan_section_edits(MARKDOWN, [{"comment1": "migration.\n\n## Timeline\n\nSix"}])
+    assert [text for text, _ in _edited(units)] == [
+        "## Scope\n\nWe deliver **cloud** migration.\n\n## Timeline\n\nSix months.\n\n"
+    ]
+
+
+def test_comments_in_one_section_share_a_unit():
+    units = plan_section_edits(MARKDOWN, [{"comment1": "Six"}, {"comment1": "months"}])
+    assert _edited(units) == [("## Timeline\n\nSix months.\n\n", ["Six", "months"])]
+
+
+@pytest.mark.parametrize("anchor", ["not in the proposal", "", "## "])
+def test_unlocatable_anchor_means_no_plan(anchor):
+    assert plan_section_edits(MARKDOWN, [{"comment1": "Six months."}, {"comment1": anchor}]) is None
+
+
+def test_ambiguous_anchor_means_no_plan():
+    markdown = MARKDOWN + "\n## Support\n\nSix months.\n"
+    assert plan_section_edits(markdown, [{"comment1": "Six months."}]) is None
+
+
+def test_splicing_keeps_untouched_sections_byte_for_byte():
+    units = plan_section_edits(MARKDOWN, [{"comment1": "Intro"}, {"comment1": "Bob"}])
+    replies = {
+        "# Proposal\n\nIntro text.\n\n": "```markdown\n# Proposal\n\nA new introduction.\n```",
+        "## Team\n\n- Alice, lead\n- Bob\n": "\n## Team\n\n- Alice, lead\n- Robert\n\n\n",
+    }
+    spliced = "".join(
+        fit_edited_text(unit.text, replies[unit.text]) if unit.edited else unit.text
+        for unit in units
+    )
+    assert spliced == (
+        "# Proposal\n\nA new introduction.\n\n"
+        "## Scope\n\nWe deliver **cloud** migration.\n\n"
+        "## Timeline\n\nSix months.\n\n"
+        "## Team\n\n- Alice, lead\n- Robert\n"
+    )
+
+
+ORIGINAL = "## Scope\n\nWe deliver cloud.\n\n"
+
+
+@pytest.mark.parametrize(
+    "reply, expected",
+    [
+        ("```markdown\n## Scope\n\nNew text.\n```\n", "## Scope\n\nNew text.\n\n"),
+        ("\n\n## Scope\n\nNew text.\n\n\n", "## Scope\n\nNew text.\n\n"),
+        ("## Scope\n\nNew text.", "## Scope\n\nNew text.\n\n"),
+        ("", ORIGINAL),
+        ("\n\n", ORIGINAL),
+        (
+            "## Scope\n\n```python\nx = 1\n```\n\nAfter.\n",
+            "## Scope\n\n```python\nx = 1\n```\n\nAfter.\n\n",
+        ),
+    ],
+)
+def test_cleaner_output(reply, expected):
+    assert fit_edited_text(ORIGINAL, reply) == expected
+
+
+@pytest.mark.parametrize(
+    "reply",
+    [
+        "```markdown\n## Scope\n\nNew **text** here.\n\n- one\n- two\n```\n",
+        "\n\n## Scope\n\nLine one.\nLine two.\n\n\nLine three.\n\n\n",
+        "## Scope\n\n```python\nx = 1\n```\n\nAfter.\n",
+        "",
+    ],
+)
+def test_cleaner_is_chunking_invariant(reply):
+    expected = fit_edited_text(ORIGINAL, reply)
+    rng = random.Random(7)
+    for _ in range(50):
+        cleaner = SectionStreamCleaner(ORIGINAL)
+        out, pos = [], 0
+        while pos < len(reply):
+            step = rng.randint(1, 6)
+            out.append(cleaner.feed(reply[pos : pos + step]))
+            pos += step
+        out.append(cleaner.close())
+        assert "".join(out) == expected
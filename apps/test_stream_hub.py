@@ -0,0 +1,137 @@
+"""
+Tests for resumable /initialgen streams (wordgenAgent/app/stream_hub.py).
+
+Run from the apps directory:
+    python -m pytest -q test_stream_hub.py
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Repo root on the path so the apps.* imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apps.wordgenAgent.app.stream_hub import (
+    GenerationRun,
+    GenerationStreamHub,
+    parse_last_event_id,
+    sse_frame,
+)
+
+
+def _parse(frame):
+    """(id or None, event, payload) of one SSE frame"""
+    fields = dict(line.split(": ", 1) for line in frame.decode("utf-8").strip().split("\n"))
+    seq = int(fields["id"]) if "id" in fields else None
+    return seq, fields["event"], json.loads(fields["data"])
+
+
+async def _collect(run, last_event_id=None):
+    return [_parse(frame) async for frame in run.subscribe(last_event_id)]
+
+
+async def _finished_run(events, max_events=64):
+    run = GenerationRun(("uuid", "gen"), max_events)
+    for event, payload in events:
+        await run.publish(event, payload)
+    await run.finish()
+    return run
+
+
+EVENTS = [
+    ("stage", {"stage": "starting"}),
+    ("chunk", "# Title\n"),
+    ("chunk", "Body "),
+    ("stage", {"stage": "saving_markdown"}),
+    ("chunk", "text."),
+    ("done", {"status": "saved"}),
+]
+
+
+def test_sse_frame_and_last_event_id():
+    assert sse_frame(3, "chunk", "a\nb") == b'id: 3\nevent: chunk\ndata: "a\\nb"\n\n'
+    assert parse_last_event_id(" 12 ") == 12
+    assert parse_last_event_id(None) is None
+    assert parse_last_event_id("abc") is None
+
+
+def test_subscribe_replays_everything_in_order():
+    async def scenario():
+        return await _collect(await _finished_run(EVENTS))
+
+    frames = asyncio.run(scenario())
+    assert [seq for seq, _, _ in frames] == [1, 2, 3, 4, 5, 6]
+    assert [(event, payload) for _, event, payload in frames] == EVENTS
+
+
+def test_resume_after_last_event_id():
+    async def scenario():
+        return await _collect(await _finished_run(EVENTS), last_event_id=3)
+
+    frames = asyncio.run(scenario())
+    assert [seq for seq, _, _ in frames] == [4, 5, 6]
+
+
+def test_evicted_events_resync_from_checkpoint():
+    async def scenario():
+        return await _collect(await _finished_run(EVENTS, max_events=3), last_event_id=1)
+
+    frames = asyncio.run(scenario())
+    # Checkpoint carries the current sequence and all markdown so far
+    assert frames[0] == (6, "checkpoint", {"markdown": "# Title\nBody text."})
+    # Then the buffered non-chunk events, unnumbered; no chunk is replayed twice
+    assert frames[1:] == [
+        (None, "stage", {"stage": "saving_markdown"}),
+        (None, "done", {"status": "saved"}),
+    ]
+
+
+def test_id_from_an_earlier_run_resyncs():
+    async def scenario():
+        return await _collect(await _finished_run(EVENTS), last_event_id=99)
+
+    frames = asyncio.run(scenario())
+    assert frames[0] == (6, "checkpoint", {"markdown": "# Title\nBody text."})
+    assert all(event != "chunk" for _, event, _ in frames)
+
+
+def test_subscriber_follows_the_live_run():
+    async def scenario():
+        run = GenerationRun(("uuid", "gen"), 64)
+        await run.publish("chunk", "a")
+        reader = asyncio.create_task(_collect(run))
+        await asyncio.sleep(0)
+        await run.publish("chunk", "b")
+        await run.publish("done", {"status": "saved"})
+        await run.finish()
+        return await asyncio.wait_for(reader, timeout=1)
+
+    frames = asyncio.run(scenario())
+    assert [(seq, event) for seq, event, _ in frames] == [(1, "chunk"), (2, "chunk"), (3, "done")]
+
+
+def test_hub_reuses_live_run_and_reports_failures():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def source():
+            yield "chunk", "partial"
+            await release.wait()
+            raise RuntimeError("model stream dropped")
+
+        hub = GenerationStreamHub()
+        run = hub.start("uuid", "gen", source)
+        assert hub.start("uuid", "gen", source) is run
+        assert hub.get("uuid", "gen") is run
+        release.set()
+        frames = await asyncio.wait_for(_collect(run), timeout=1)
+        await hub.shutdown()
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert frames == [
+        (1, "chunk", "partial"),
+        (2, "error", {"message": "model stream dropped"}),
+    ]
@@ -1,11 +1,12 @@
 import os
 import sys
-import json
+import asyncio
 import logging
-from typing import Dict, Any, Tuple, Optional, List, Iterator
+import time
+from typing import Dict, Any, Tuple, Optional, List, AsyncIterator, Set
 from concurrent.futures import ThreadPoolExecutor
-import requests
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -27,7 +28,20 @@ from apps.api.services.supabase_service import (
     save_generated_markdown,
 )
 from apps.wordgenAgent.app import prompt5 as P
-from apps.wordgenAgent.app.document import generate_word_from_markdown
+from apps.wordgenAgent.app.document import (
+    StreamingWordBuilder,
+    generate_word_from_markdown,
+    upload_streamed_word,
+)
+from apps.wordgenAgent.app.file_cache import get_openai_file_cache, sweep_expired_files
+from apps.wordgenAgent.app.pdf_store import CHUNK_SIZE, FetchedPdf, get_pdf_store
+from apps.wordgenAgent.app.company_digest import (
+    build_digest_input,
+    format_digest,
+    get_company_digest_store,
+    parse_digest,
+)
+from apps.app.config import settings
 
 logger = logging.getLogger("wordgen_api")
 
@@ -45,67 +59,230 @@ def _lang_flag(language: str) -> str:
     )
 
 
-def _sse_event_raw(event: str, data: str) -> bytes:
-    if data is None:
-        data = ""
-    encoded_data = json.dumps(data, ensure_ascii=False)
-    return f"event: {event}\ndata: {encoded_data}\n\n".encode("utf-8")
-
-
-def _sse_event_json(event: str, obj: Dict[str, Any]) -> bytes:
-    return f"event: {event}\ndata: {json.dumps(obj, ensure_ascii=False)}\n\n".encode("utf-8")
-
-
 class WordGenAPI:
     def __init__(self) -> None:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise RuntimeError("OPENAI_API_KEY is required")
-        self.client = OpenAI(api_key=api_key)
+        # Async clients serve /initialgen: a live stream costs a coroutine, not a threadpool worker
+        self.aclient = AsyncOpenAI(api_key=api_key)
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._digest_tasks: Set[asyncio.Task] = set()
         logger.info("OpenAI client initialized")
 
+    def _get_http(self) -> httpx.AsyncClient:
+        """Shared async HTTP client for PDF downloads (keeps its connection pool)"""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=60, follow_redirects=True)
+        return self._http
+
+    def start_file_sweeper(self) -> None:
+        """Start the background task that deletes expired cached OpenAI files"""
+        if get_openai_file_cache() is None or self._sweeper is not None:
+            return
+        self._sweeper = asyncio.create_task(self._run_file_sweeper())
+
+    async def _run_file_sweeper(self) -> None:
+        while True:
+            try:
+                await sweep_expired_files(await asyncio.to_thread(get_openai_file_cache), self.aclient)
+            except Exception as e:
+                logger.warning(f"OpenAI file sweep failed: {e}")
+            await asyncio.sleep(settings.OPENAI_FILE_SWEEP_INTERVAL_SECONDS)
+
+    async def aclose(self) -> None:
+        """Stop the file sweeper and close the async HTTP and OpenAI clients (app shutdown)"""
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            sweeper.cancel()
+        for task in list(self._digest_tasks):
+            task.cancel()
+        http, self._http = self._http, None
+        if http is not None:
+            await http.aclose()
+        await self.aclient.close()
+
     @staticmethod
     def _clean_url(url: str) -> str:
         cleaned_url = (url or "").split("?")[0]
         logger.debug(f"Cleaned URL: {cleaned_url}")
         return cleaned_url
 
-    def _download_pdf(self, url: str) -> bytes:
+    @staticmethod
+    def _log_fetched(pdf: FetchedPdf) -> None:
+        how = "revalidated from store" if pdf.revalidated else "downloaded"
+        logger.info(f"Finished download of PDF: {pdf.url} ({pdf.size_bytes} bytes, {how})")
+
+    @staticmethod
+    def _cached_file_id(pdf: FetchedPdf, filename: str) -> Optional[str]:
+        """OpenAI file ID already holding this PDF's content, or None"""
+        cache = get_openai_file_cache()
+        file_id = cache.get(pdf.sha256, pdf.size_bytes) if cache is not None else None
+        if file_id:
+            logger.info(f"Reusing uploaded {filename} ({pdf.size_bytes} bytes) as file ID: {file_id}")
+        return file_id
+
+    @staticmethod
+    def _remember_file_id(pdf: FetchedPdf, file_id: str, filename: str) -> None:
+        cache = get_openai_file_cache()
+        if cache is not None:
+            cache.put(pdf.sha256, file_id, filename, pdf.size_bytes)
+
+    async def _adownload_pdf(self, url: str) -> FetchedPdf:
+        """Stream a PDF into the store; every disk operation runs in a worker thread"""
         cleaned_url = self._clean_url(url)
+        store = await asyncio.to_thread(get_pdf_store)
+        meta = await asyncio.to_thread(store.lookup, cleaned_url)
         logger.info(f"Starting download of PDF: {cleaned_url}")
-        response = requests.get(cleaned_url, timeout=60)
-        response.raise_for_status()
-        logger.info(f"Finished download of PDF: {cleaned_url} ({len(response.content)} bytes)")
-        return response.content
-
-    def _download_two_pdfs(self, rfp_url: str, supporting_url: str) -> Tuple[bytes, bytes]:
-        logger.info("Beginning parallel download of two PDFs")
-        with ThreadPoolExecutor() as executor:
-            future_rfp = executor.submit(self._download_pdf, rfp_url)
-            future_sup = executor.submit(self._download_pdf, supporting_url)
-            rfp_bytes = future_rfp.result()
-            sup_bytes = future_sup.result()
-        logger.info("Completed parallel download of two PDFs")
-        return rfp_bytes, sup_bytes
-
-    def _upload_pdf_bytes_to_openai(self, pdf_bytes: bytes, filename: str) -> str:
+        async with self._get_http().stream(
+            "GET", cleaned_url, headers=store.conditional_headers(meta)
+        ) as response:
+            if response.status_code == 304 and meta:
+                pdf = await asyncio.to_thread(store.not_modified, cleaned_url, meta)
+            else:
+                response.raise_for_status()
+                writer = await asyncio.to_thread(
+                    store.writer, cleaned_url, response.headers.get("Content-Length")
+                )
+                try:
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        await asyncio.to_thread(writer.write, chunk)
+                except BaseException:
+                    await asyncio.to_thread(writer.abort)
+                    raise
+                pdf = await asyncio.to_thread(
+                    writer.commit, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                )
+        self._log_fetched(pdf)
+        return pdf
+
+    async def _aupload_pdf_to_openai(self, pdf: FetchedPdf, filename: str) -> str:
+        # The file ID cache is SQLite: keep its lookups and writes off the event loop
+        file_id = await asyncio.to_thread(self._cached_file_id, pdf, filename)
+        if file_id:
+            return file_id
         logger.info(f"Uploading {filename} to OpenAI")
-        file_obj = self.client.files.create(file=(filename, pdf_bytes, "application/pdf"), purpose="user_data")
+        with pdf.open() as fh:
+            file_obj = await self.aclient.files.create(file=(filename, fh, "application/pdf"), purpose="user_data")
         logger.info(f"Uploaded {filename} as file ID: {file_obj.id}")
+        await asyncio.to_thread(self._remember_file_id, pdf, file_obj.id, filename)
         return file_obj.id
 
-    def _upload_pdf_urls_to_openai(self, rfp_url: str, supporting_url: str) -> Tuple[str, str]:
-        rfp_bytes, sup_bytes = self._download_two_pdfs(rfp_url, supporting_url)
-        logger.info("Beginning parallel upload of two PDFs to OpenAI")
-        with ThreadPoolExecutor() as executor:
-            future_rfp = executor.submit(self._upload_pdf_bytes_to_openai, rfp_bytes, "RFP.pdf")
-            future_sup = executor.submit(self._upload_pdf_bytes_to_openai, sup_bytes, "Supporting.pdf")
-            rfpf_id = future_rfp.result()
-            supf_id = future_sup.result()
-        logger.info(f"Completed parallel upload of PDFs with IDs: rfp={rfpf_id}, supporting={supf_id}")
-        return rfpf_id, supf_id
-
-    def generate_complete_proposal(
+    async def _aupload_pdf_urls_to_openai(
+        self,
+        rfp_url: str,
+        supporting_url: str,
+    ) -> Tuple[str, Optional[str], Optional[Dict[str, Any]]]:
+        """
+        (RFP file ID, supporting file ID, company digest). When a digest is stored for
+        the supporting document, only the RFP is uploaded and the file ID is None.
+        """
+        logger.info("Beginning concurrent download of two PDFs")
+        rfp_pdf, sup_pdf = await asyncio.gather(
+            self._adownload_pdf(rfp_url),
+            self._adownload_pdf(supporting_url),
+        )
+        # The digest store is files on disk (created on first use): keep it off the event loop
+        digest = await asyncio.to_thread(self._stored_company_digest, sup_pdf)
+        if digest is not None:
+            return await self._aupload_pdf_to_openai(rfp_pdf, "RFP.pdf"), None, digest
+
+        logger.info("Beginning concurrent upload of two PDFs to OpenAI")
+        rfpf_id, supf_id = await asyncio.gather(
+            self._aupload_pdf_to_openai(rfp_pdf, "RFP.pdf"),
+            self._aupload_pdf_to_openai(sup_pdf, "Supporting.pdf"),
+        )
+        logger.info(f"Completed concurrent upload of PDFs with IDs: rfp={rfpf_id}, supporting={supf_id}")
+        if await asyncio.to_thread(get_company_digest_store) is not None:
+            task = asyncio.create_task(self._abuild_company_digest(sup_pdf, supf_id))
+            self._digest_tasks.add(task)
+            task.add_done_callback(self._digest_tasks.discard)
+        return rfpf_id, supf_id, None
+
+    # ========================================================================
+    # COMPANY DIGEST
+    # ========================================================================
+
+    @staticmethod
+    def _stored_company_digest(sup_pdf: FetchedPdf) -> Optional[Dict[str, Any]]:
+        store = get_company_digest_store()
+        digest = store.get(sup_pdf.sha256) if store is not None else None
+        if digest is not None:
+            logger.info(f"Using stored company digest for supporting PDF {sup_pdf.sha256[:12]}")
+        return digest
+
+    @staticmethod
+    def _save_company_digest(sup_pdf: FetchedPdf, output_text: str) -> None:
+        digest = parse_digest(output_text)
+        if digest is None:
+            logger.warning(f"Company digest for {sup_pdf.sha256[:12]} was not valid JSON; not stored")
+            return
+        get_company_digest_store().put(sup_pdf.sha256, digest, P.MODEL)
+        logger.info(f"Stored company digest for supporting PDF {sup_pdf.sha256[:12]}")
+
+    async def _abuild_company_digest(self, sup_pdf: FetchedPdf, sup_file_id: str) -> None:
+        """Extract and store the digest once per supporting document (runs beside the proposal call)"""
+        store = await asyncio.to_thread(get_company_digest_store)
+        if not store.claim(sup_pdf.sha256):
+            return
+        try:
+            response = await self.aclient.responses.create(
+                model=P.MODEL,
+                input=build_digest_input(sup_file_id),
+                reasoning={"effort": "minimal"},
+                text={"format": {"type": "json_object"}},
+            )
+            await asyncio.to_thread(self._save_company_digest, sup_pdf, response.output_text)
+        except Exception as e:
+            logger.warning(f"Company digest build failed for {sup_pdf.sha256[:12]}: {e}")
+        finally:
+            store.release(sup_pdf.sha256)
+
+    @staticmethod
+    def _build_proposal_input(
+        rfp_id: str,
+        sup_id: Optional[str],
+        user_config: str,
+        language: str,
+        company_digest: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Responses API input for a proposal run.
+        With a company digest, the digest JSON replaces the supporting file.
+        """
+        rfp_label = "RFP/BRD: requirements, evaluation criteria, project details, and timelines"
+        supporting_label = "Supporting: company profile, portfolio, capabilities, certifications, differentiators"
+        if company_digest is not None:
+            supporting_label += " (provided as the COMPANY_DIGEST JSON below)"
+            supporting_part = {"type": "input_text", "text": format_digest(company_digest)}
+        else:
+            supporting_part = {"type": "input_file", "file_id": sup_id}
+        system_prompts = P.system_prompts
+        lang_block = _lang_flag(language)
+        user_cfg_notes = user_config if isinstance(user_config, str) else ""
+
+        additive_block = P.build_task_instructions_with_config(
+            language=language,
+            user_config_json=(user_config if isinstance(user_config, str) else "null"),
+            rfp_label=rfp_label,
+            supporting_label=supporting_label,
+            user_config_notes=user_cfg_notes,
+        )
+        task_instructions = f"\nIMPORTANT: The proposal must follow this structure:\n{additive_block}"
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "input_text", "text": lang_block},
+                {"type": "input_file", "file_id": rfp_id},
+                supporting_part,
+                {"type": "input_text", "text": user_cfg_notes},
+                {"type": "input_text", "text": system_prompts},
+                {"type": "input_text", "text": task_instructions},
+            ],
+        }]
+
+    async def aproposal_events(
         self,
         uuid: str,
         gen_id: str,
@@ -115,104 +292,158 @@ class WordGenAPI:
         doc_config: Optional[Dict[str, Any]] = None,
         language: str = "english",
         outline: Optional[str] = None,
-    ) -> Iterator[bytes]:
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Async-native proposal run as (event, payload) pairs: payload is the text delta
+        for "chunk" events and a dict otherwise. Downloads, OpenAI uploads and the model
+        stream are awaited on the event loop; only the blocking Supabase saves and the
+        DOCX build run in worker threads, briefly.
+
+        The partial markdown is checkpointed to word_gen every
+        STREAM_CHECKPOINT_SECONDS, so a dropped run is not lost. The DOCX is built
+        section by section while the model writes (StreamingWordBuilder), on one
+        worker thread per run so python-docx never runs on the event loop.
+        """
+        word_executor: Optional[ThreadPoolExecutor] = None
         try:
-            yield _sse_event_json("stage", {"stage": "starting"})
-            yield _sse_event_json("stage", {"stage": "uploading_files"})
-            rfp_id, sup_id = self._upload_pdf_urls_to_openai(rfp_url, supporting_url)
-
-            rfp_label = "RFP/BRD: requirements, evaluation criteria, project details, and timelines"
-            supporting_label = "Supporting: company profile, portfolio, capabilities, certifications, differentiators"
-            system_prompts = P.system_prompts
-            lang_block = _lang_flag(language)
-            user_cfg_notes = user_config if isinstance(user_config, str) else ""
-
-            additive_block = P.build_task_instructions_with_config(
-                language=language,
-                user_config_json=(user_config if isinstance(user_config, str) else "null"),
-                rfp_label=rfp_label,
-                supporting_label=supporting_label,
-                user_config_notes=user_cfg_notes,
-            )
-            task_instructions = f"\nIMPORTANT: The proposal must follow this structure:\n{additive_block}"
-            yield _sse_event_json("stage", {"stage": "prompting_model"})
+            yield "stage", {"stage": "starting"}
+            yield "stage", {"stage": "uploading_files"}
+            rfp_id, sup_id, digest = await self._aupload_pdf_urls_to_openai(rfp_url, supporting_url)
 
-            logger.info("Calling OpenAI Responses API…")
-            response = self.client.responses.create(
+            proposal_input = self._build_proposal_input(rfp_id, sup_id, user_config, language, digest)
+            yield "stage", {"stage": "prompting_model"}
+
+            logger.info("Calling OpenAI Responses API (async)…")
+            response = await self.aclient.responses.create(
                 model=P.MODEL,
                 max_output_tokens=18000,
-                input=[{
-                    "role": "user",
-                    "content": [
-                        {"type": "input_text", "text": lang_block},
-                        {"type": "input_file", "file_id": rfp_id},
-                        {"type": "input_file", "file_id": sup_id},
-                        {"type": "input_text", "text": user_cfg_notes},
-                        {"type": "input_text", "text": system_prompts},
-                        {"type": "input_text", "text": task_instructions},
-                    ],
-                }],
+                input=proposal_input,
                 reasoning={"effort": "minimal"},
                 stream=True,
             )
 
             buffer_chunks: List[str] = []
             line_buffer = ""
-
-            for event in response:
-                et = getattr(event, "type", "")
-                if et == "response.output_text.delta":
-                    delta = getattr(event, "delta", "")
-                    if not delta:
-                        continue
-                    buffer_chunks.append(delta)
-                    yield _sse_event_raw("chunk", delta)
-
-                    line_buffer += delta
-                    while "\n" in line_buffer:
-                        line, line_buffer = line_buffer.split("\n", 1)
-                        _emit_stdout(line)
-
-                elif et == "response.error":
-                    err_msg = getattr(event, "error", "stream error")
-                    logger.error(f"OpenAI stream error: {err_msg}")
-                    yield _sse_event_json("error", {"message": str(err_msg)})
+            loop = asyncio.get_running_loop()
+            # Single worker: feeds run in stream order and finish() after the last feed
+            word_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="word-build")
+            word_builder = StreamingWordBuilder(doc_config, (language or "english").lower())
+            word_build_failed = False
+
+            def feed_word_builder(text: str) -> None:
+                nonlocal word_build_failed
+                if word_build_failed:
                     return
+                try:
+                    word_builder.feed(text)
+                except Exception:
+                    logger.exception("Streaming Word build failed; building after the stream instead")
+                    word_build_failed = True
+
+            def finish_word_builder() -> Optional[bytes]:
+                return None if word_build_failed else word_builder.finish()
 
-                elif et == "response.completed":
-                    break
+            checkpoint: Optional[asyncio.Task] = None
+            checkpointed_at = time.monotonic()
+            checkpointed_chunks = 0
+
+            try:
+                async for event in response:
+                    et = getattr(event, "type", "")
+                    if et == "response.output_text.delta":
+                        delta = getattr(event, "delta", "")
+                        if not delta:
+                            continue
+                        buffer_chunks.append(delta)
+                        yield "chunk", delta
+
+                        # Queued without awaiting; a feed failure is picked up before finish()
+                        loop.run_in_executor(word_executor, feed_word_builder, delta)
+
+                        line_buffer += delta
+                        while "\n" in line_buffer:
+                            line, line_buffer = line_buffer.split("\n", 1)
+                            _emit_stdout(line)
+
+                        # One checkpoint write in flight at a time; never blocks the stream
+                        if (
+                            time.monotonic() - checkpointed_at >= settings.STREAM_CHECKPOINT_SECONDS
+                            and len(buffer_chunks) > checkpointed_chunks
+                            and (checkpoint is None or checkpoint.done())
+                        ):
+                            checkpoint = asyncio.create_task(asyncio.to_thread(
+                                save_generated_markdown, uuid, gen_id, "".join(buffer_chunks), complete=False
+                            ))
+                            checkpointed_at = time.monotonic()
+                            checkpointed_chunks = len(buffer_chunks)
+
+                    elif et == "response.error":
+                        err_msg = getattr(event, "error", "stream error")
+                        logger.error(f"OpenAI stream error: {err_msg}")
+                        yield "error", {"message": str(err_msg)}
+                        return
+
+                    elif et == "response.completed":
+                        break
+            finally:
+                # Release the upstream connection if the run is cancelled mid-stream
+                await response.close()
+                if checkpoint is not None:
+                    # A late partial write must not land after the final save
+                    await asyncio.gather(checkpoint, return_exceptions=True)
 
             if line_buffer:
                 _emit_stdout(line_buffer)
 
             full_markdown = "".join(buffer_chunks)
             _emit_stdout(full_markdown)
-            yield _sse_event_json("stage", {"stage": "saving_markdown"})
+            yield "stage", {"stage": "saving_markdown"}
 
             saved_ok = False
             try:
-                saved_ok = save_generated_markdown(uuid, gen_id, full_markdown)
+                saved_ok = await asyncio.to_thread(save_generated_markdown, uuid, gen_id, full_markdown)
             except Exception as e:
                 logger.exception("Failed to save generated markdown")
-                yield _sse_event_json("error", {"message": f"save error: {str(e)}"})
-            yield _sse_event_json("stage", {"stage": "building_word"})
+                yield "error", {"message": f"save error: {str(e)}"}
+            yield "stage", {"stage": "building_word"}
             try:
-                _ = generate_word_from_markdown(
-                    uuid=uuid,
-                    gen_id=gen_id,
-                    markdown=full_markdown,
-                    doc_config=doc_config,
-                    language=(language or "english").lower(),
-                )
+                word_bytes = None
+                try:
+                    word_bytes = await loop.run_in_executor(word_executor, finish_word_builder)
+                except Exception:
+                    logger.exception("Streaming Word build failed at finish; rebuilding from markdown")
+                if word_bytes is not None:
+                    _ = await asyncio.to_thread(
+                        upload_streamed_word,
+                        uuid,
+                        gen_id,
+                        word_bytes,
+                        full_markdown,
+                        doc_config,
+                        (language or "english").lower(),
+                    )
+                else:
+                    _ = await asyncio.to_thread(
+                        generate_word_from_markdown,
+                        uuid=uuid,
+                        gen_id=gen_id,
+                        markdown=full_markdown,
+                        doc_config=doc_config,
+                        language=(language or "english").lower(),
+                    )
             except Exception as e:
                 logger.exception("Word generation/upload failed")
-                yield _sse_event_json("error", {"message": f"word build error: {str(e)}"})
+                yield "error", {"message": f"word build error: {str(e)}"}
 
-            yield _sse_event_json("done", {"status": "saved" if saved_ok else "not_saved"})
+            yield "done", {"status": "saved" if saved_ok else "not_saved"}
 
         except Exception as e:
-            logger.exception("generate_complete_proposal failed")
-            yield _sse_event_json("error", {"message": str(e)})
+            logger.exception("aproposal_events failed")
+            yield "error", {"message": str(e)}
+        finally:
+            if word_executor is not None:
+                # Drops feeds still queued when the run is cancelled mid-stream
+                word_executor.shutdown(wait=False, cancel_futures=True)
 
 
 wordgen_api = WordGenAPI()
@@ -0,0 +1,150 @@
+"""
+Company Digest Module
+Persisted CompanyDigest JSON per unique supporting document.
+
+Every proposal call used to attach the full supporting PDF, although only the
+company profile in it is used. The first generation with a given supporting
+document (keyed by the sha256 of its bytes) still sends the file and, alongside
+it, runs the prompt4o CompanyDigest extraction once; the JSON is stored under
+CACHE_DIR/company_digests. Later generations send that compact digest instead of
+the file, so the supporting PDF is neither uploaded nor re-read by the model.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set
+
+from apps.app.config import settings
+from apps.wordgenAgent.app import prompt4o as P4
+
+logger = logging.getLogger("company_digest")
+
+# Bump when the digest prompt/schema changes so stale digests are rebuilt
+DIGEST_VERSION = 1
+
+
+def build_digest_input(supporting_file_id: str) -> List[Dict[str, Any]]:
+    """Responses API input extracting a CompanyDigest from an uploaded supporting file"""
+    return [{
+        "role": "user",
+        "content": [
+            {"type": "input_text", "text": P4.COMPANY_DIGEST_SYSTEM},
+            {"type": "input_text", "text": P4.COMPANY_DIGEST_SCHEMA},
+            {"type": "input_file", "file_id": supporting_file_id},
+            {"type": "input_text", "text": P4.build_company_digest_instructions()},
+        ],
+    }]
+
+
+def parse_digest(text: str) -> Optional[Dict[str, Any]]:
+    """CompanyDigest dict from model output (tolerates markdown fences), or None"""
+    cleaned = (text or "").strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        cleaned = cleaned[cleaned.find("{"):]
+    start, end = cleaned.find("{"), cleaned.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        digest = json.loads(cleaned[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(digest, dict) or "company_profile" not in digest:
+        return None
+    return digest
+
+
+def format_digest(digest: Dict[str, Any]) -> str:
+    """Compact prompt text for a stored digest"""
+    return (
+        "COMPANY_DIGEST (structured extract of the SUPPORTING_FILE; use it as the "
+        "only source of company facts):\n"
+        + json.dumps(digest, ensure_ascii=False, separators=(",", ":"))
+    )
+
+
+class CompanyDigestStore:
+    """One JSON file per (digest version, supporting document sha256)"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._pending: Set[str] = set()
+        self._pending_lock = Lock()
+        # Counters are updated from the worker threads the callers run get/put in
+        self._stats_lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.built = 0
+
+    def _path(self, sha256: str) -> Path:
+        return self.root / f"v{DIGEST_VERSION}_{sha256}.json"
+
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        try:
+            record = json.loads(self._path(sha256).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._stats_lock:
+                self.misses += 1
+            return None
+        with self._stats_lock:
+            self.hits += 1
+        return record.get("digest")
+
+    def put(self, sha256: str, digest: Dict[str, Any], model: str) -> None:
+        record = {"sha256": sha256, "model": model, "created_at": time.time(), "digest": digest}
+        fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=self.root)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        Path(tmp_name).replace(self._path(sha256))
+        with self._stats_lock:
+            self.built += 1
+
+    def claim(self, sha256: str) -> bool:
+        """Reserve a digest build; False if one is already running for this document"""
+        with self._pending_lock:
+            if sha256 in self._pending:
+                return False
+            self._pending.add(sha256)
+            return True
+
+    def release(self, sha256: str) -> None:
+        with self._pending_lock:
+            self._pending.discard(sha256)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            hits, misses, built = self.hits, self.misses, self.built
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / total) if total else 0.0,
+            "built": built,
+            "stored": len(list(self.root.glob(f"v{DIGEST_VERSION}_*.json"))),
+        }
+
+
+# ============================================================================
+# GLOBAL STORE INSTANCE
+# ============================================================================
+
+_store: Optional[CompanyDigestStore] = None
+_store_lock = Lock()
+
+
+def get_company_digest_store() -> Optional[CompanyDigestStore]:
+    """Get the per-process digest store (None when COMPANY_DIGEST_ENABLED is off)"""
+    global _store
+    if not settings.COMPANY_DIGEST_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CompanyDigestStore(settings.CACHE_DIR / "company_digests")
+    return _store
@@ -1,158 +1,221 @@
 import os
 import re
 import json
+import hashlib
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from html.parser import HTMLParser
+from typing import Callable, Dict, Any, List, Optional
 
-from apps.wordgenAgent.app.wordcom import build_word_from_proposal, default_CONFIG
+from apps.app.utils.markdown_ast import Block, MarkdownTokenizer, parse_markdown
+from apps.wordgenAgent.app.wordcom import ProposalDocxBuilder, build_word_from_proposal, default_CONFIG
+from apps.wordgenAgent.app.word_artifacts import artifact_key, get_word_artifact_cache
 from apps.api.services.supabase_service import (
+    get_word_object_md5,
     upload_word_and_update_table,
 )
 
 logger = logging.getLogger("document")
 
+WORD_FILENAME = "proposal.docx"
 
-class HTMLStripper(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = []
 
-    def handle_data(self, d):
-        self.text.append(d)
+def _default_title(language: str) -> str:
+    return "Generated Proposal" if (language or "").lower() != "arabic" else "المقترح المُنشأ"
 
-    def get_data(self):
-        return "".join(self.text)
 
+# Bullet marker removal as the Word output has always done it (numbered items keep their number)
+_POINT_MARKER = re.compile(r"^[\-\*\+\d\.]\s+")
 
-def strip_html(text: str) -> str:
-    s = HTMLStripper()
-    try:
-        s.feed(text)
-        return s.get_data()
-    except Exception:
-        return text
 
+class MarkdownProposalParser:
+    """
+    Builds the proposal JSON (title + sections with content/points/table) from
+    markdown AST blocks. feed() markdown text as it arrives and close() at the
+    end, or hand it already tokenized blocks via add_block(). A section is
+    complete once the next heading starts, and is handed to on_section right
+    then; the title goes to on_title when first seen.
+    """
 
-def parse_markdown_to_json(markdown: str, language: str = "english") -> Dict[str, Any]:
-    if not markdown or not markdown.strip():
-        default_title = "Generated Proposal" if language.lower() != "arabic" else "المقترح المُنشأ"
-        return {"title": default_title, "sections": []}
-    
-    markdown = re.sub(r'```[\w]*\n', '', markdown)
-    markdown = re.sub(r'```', '', markdown)
-    markdown = re.sub(r'``', '', markdown)
-    markdown = re.sub(r'`', '', markdown)
-    
-    lines = markdown.split("\n")
-    title = ""
-    sections: List[Dict[str, Any]] = []
-    current_section: Optional[Dict[str, Any]] = None
-    content_buffer: List[str] = []
-    points_buffer: List[str] = []
-    in_table = False
-    table_headers: List[str] = []
-    table_rows: List[List[str]] = []
-
-    def flush_content():
-        nonlocal content_buffer
-        if content_buffer and current_section is not None:
-            text = "\n".join(content_buffer).strip()
+    def __init__(
+        self,
+        language: str = "english",
+        on_section: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_title: Optional[Callable[[str], None]] = None,
+    ):
+        self.language = language
+        self.on_section = on_section
+        self.on_title = on_title
+        self.title = ""
+        self.sections: List[Dict[str, Any]] = []
+        self.current_section: Optional[Dict[str, Any]] = None
+        self.content_buffer: List[str] = []
+        self.points_buffer: List[str] = []
+        self.tokenizer = MarkdownTokenizer(on_block=self.add_block)
+
+    # ---- text intake ---------------------------------------------------
+
+    def feed(self, text: str) -> None:
+        self.tokenizer.feed(text)
+
+    def close(self) -> Dict[str, Any]:
+        self.tokenizer.close()
+        self._flush_content()
+        self._flush_points()
+        self._emit_current()
+        if not self.title:
+            self.title = _default_title(self.language)
+        return {"title": self.title, "sections": self.sections}
+
+    # ---- section state -------------------------------------------------
+
+    def _flush_content(self) -> None:
+        if self.content_buffer and self.current_section is not None:
+            text = "\n".join(self.content_buffer).strip()
             if text:
-                if current_section["content"]:
-                    current_section["content"] += "\n\n" + text
+                if self.current_section["content"]:
+                    self.current_section["content"] += "\n\n" + text
                 else:
-                    current_section["content"] = text
-            content_buffer = []
-
-    def flush_points():
-        nonlocal points_buffer
-        if points_buffer and current_section is not None:
-            current_section["points"].extend(points_buffer)
-            points_buffer = []
-
-    def flush_table():
-        nonlocal in_table, table_headers, table_rows
-        if in_table and current_section is not None:
-            current_section["table"]["headers"] = table_headers
-            current_section["table"]["rows"] = table_rows
-        in_table = False
-        table_headers = []
-        table_rows = []
-
-    def start_new_section(heading: str):
-        nonlocal current_section
-        flush_content()
-        flush_points()
-        flush_table()
-        current_section = {
+                    self.current_section["content"] = text
+            self.content_buffer = []
+
+    def _flush_points(self) -> None:
+        if self.points_buffer and self.current_section is not None:
+            self.current_section["points"].extend(self.points_buffer)
+            self.points_buffer = []
+
+    def _emit_current(self) -> None:
+        if self.current_section is not None and self.on_section is not None:
+            self.on_section(self.current_section)
+
+    def _start_new_section(self, heading: str) -> None:
+        self._flush_content()
+        self._flush_points()
+        self._emit_current()
+        self.current_section = {
             "heading": heading,
             "content": "",
             "points": [],
             "table": {"headers": [], "rows": []},
         }
-        sections.append(current_section)
-
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
-            continue
-        stripped = strip_html(stripped)
-
-        if stripped.startswith("# ") and not title:
-            title = stripped[2:].strip()
-            continue
-
-        if stripped.startswith("## "):
-            heading = stripped[3:].strip()
-            start_new_section(heading)
-            continue
-
-        if stripped.startswith("### ") or (stripped.startswith("**") and stripped.endswith("**") and len(stripped) > 4):
-            subheading = stripped[4:].strip() if stripped.startswith("### ") else stripped.strip("*").strip()
-            start_new_section(subheading)
-            continue
-
-        if "|" in stripped and not in_table:
-            in_table = True
-            flush_content()
-            flush_points()
-            table_headers = [cell.strip() for cell in stripped.split("|") if cell.strip()]
-            continue
-
-        if in_table:
-            if re.match(r"^\|[\s\-:]+\|", stripped):
-                continue
-            if "|" in stripped:
-                row = [cell.strip() for cell in stripped.split("|") if cell.strip()]
-                if row:
-                    table_rows.append(row)
-                continue
-            else:
-                flush_table()
-
-        if re.match(r"^[\-\*\+]\s+", stripped) or re.match(r"^\d+\.\s+", stripped):
-            flush_content()
-            point = re.sub(r"^[\-\*\+\d\.]\s+", "", stripped).strip()
+        self.sections.append(self.current_section)
+
+    def add_block(self, block: Block) -> None:
+        if block.kind == "heading":
+            if block.level == 1 and not self.title:
+                self.title = block.text
+                if self.on_title is not None:
+                    self.on_title(self.title)
+                return
+            if block.level in (2, 3):
+                self._start_new_section(block.text)
+                return
+            # Later H1s and H4+ stay body text
+
+        elif block.kind == "subheading":
+            self._start_new_section(block.text)
+            return
+
+        elif block.kind == "table":
+            self._flush_content()
+            self._flush_points()
+            if self.current_section is not None:
+                self.current_section["table"]["headers"] = list(block.headers)
+                self.current_section["table"]["rows"] = [list(row) for row in block.rows]
+            return
+
+        elif block.kind == "bullet":
+            self._flush_content()
+            point = _POINT_MARKER.sub("", block.lines[0]).strip()
             if point:
-                points_buffer.append(point)
-            continue
+                self.points_buffer.append(point)
+            return
 
-        flush_points()
-        content_buffer.append(stripped)
+        self._flush_points()
+        self.content_buffer.extend(block.lines)
 
-    flush_content()
-    flush_points()
-    flush_table()
 
-    if not title:
-        title = "Generated Proposal" if language.lower() != "arabic" else "المقترح المُنشأ"
+def parse_markdown_to_json(markdown: str, language: str = "english") -> Dict[str, Any]:
+    if not markdown or not markdown.strip():
+        return {"title": _default_title(language), "sections": []}
 
-    return {"title": title, "sections": sections}
+    parser = MarkdownProposalParser(language=language)
+    for block in parse_markdown(markdown).blocks:
+        parser.add_block(block)
+    return parser.close()
+
+
+def _effective_doc_config(doc_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return doc_config if (doc_config and isinstance(doc_config, dict)) else default_CONFIG
+
+
+class StreamingWordBuilder:
+    """
+    Builds the proposal DOCX while the model is still writing: markdown deltas go
+    through MarkdownProposalParser and each section is appended to the document as
+    soon as the next heading closes it. After the last token only the final section
+    and the save remain.
+    """
+
+    def __init__(self, doc_config: Optional[Dict[str, Any]], language: str = "english"):
+        self.language = language
+        self.builder = ProposalDocxBuilder(_effective_doc_config(doc_config), language)
+        self.parser = MarkdownProposalParser(
+            language=language,
+            on_section=self.builder.add_section,
+            on_title=self.builder.set_title,
+        )
+
+    def feed(self, delta: str) -> None:
+        self.parser.feed(delta)
+
+    def finish(self) -> bytes:
+        proposal = self.parser.close()
+        self.builder.set_title(proposal["title"])
+        logger.info(
+            f"Streamed Word doc with title: {proposal['title']} and {self.builder.sections_added} sections"
+        )
+        return self.builder.to_bytes()
+
+
+def _cached_word_url(uuid: str, gen_id: str, key: str) -> Optional[str]:
+    cache = get_word_artifact_cache()
+    if cache is None:
+        return None
+    # The record is per host: confirm the object was not replaced from another one
+    return cache.get(uuid, gen_id, key, lambda: get_word_object_md5(uuid, gen_id, WORD_FILENAME))
+
+
+def _upload_word(uuid: str, gen_id: str, word_bytes: bytes, markdown: str, key: str) -> str:
+    """Upload proposal.docx, update word_gen and record which build (and bytes) now sit at the path"""
+    cache = get_word_artifact_cache()
+    if cache is not None:
+        cache.invalidate(uuid, gen_id)
+    res = upload_word_and_update_table(
+        uuid=uuid,
+        gen_id=gen_id,
+        word_content=word_bytes,
+        filename=WORD_FILENAME,
+        generated_markdown=markdown,
+    )
+    if not (res and "word_url" in res):
+        return ""
+    if cache is not None:
+        content_md5 = hashlib.md5(word_bytes, usedforsecurity=False).hexdigest()
+        cache.put(uuid, gen_id, key, res["word_url"], content_md5)
+    return res["word_url"]
+
+
+def upload_streamed_word(
+    uuid: str,
+    gen_id: str,
+    word_bytes: bytes,
+    markdown: str,
+    doc_config: Optional[Dict[str, Any]],
+    language: str = "english",
+) -> Dict[str, Any]:
+    """Upload a DOCX built by StreamingWordBuilder and update the word_gen row"""
+    key = artifact_key(markdown, doc_config, language)
+    return {"proposal_word_url": _upload_word(uuid, gen_id, word_bytes, markdown, key), "cache_hit": False}
 
 
 def generate_word_from_markdown(
@@ -161,14 +224,22 @@ def generate_word_from_markdown(
     markdown: str,
     doc_config: Optional[Dict[str, Any]],
     language: str = "english",
-) -> Dict[str, str]:
+) -> Dict[str, Any]:
     """
-    Build DOCX from markdown -> upload to Supabase -> update word_gen row
+    Build DOCX from markdown -> upload to Supabase -> update word_gen row.
+    If the current proposal.docx was built from the same markdown, doc_config and
+    language, its URL is returned as-is ("cache_hit": True) with no build.
     """
     try:
+        key = artifact_key(markdown, doc_config, language)
+        cached_url = _cached_word_url(uuid, gen_id, key)
+        if cached_url:
+            logger.info(f"Word artifact unchanged for uuid={uuid}, gen_id={gen_id}; reusing {cached_url}")
+            return {"proposal_word_url": cached_url, "cache_hit": True}
+
         logger.info(f"Parsing markdown to JSON for uuid={uuid}, gen_id={gen_id}")
         proposal_json = parse_markdown_to_json(markdown, language=language)
-        effective_config = doc_config if (doc_config and isinstance(doc_config, dict)) else default_CONFIG
+        effective_config = _effective_doc_config(doc_config)
 
         out_dir = Path("output")
         out_dir.mkdir(parents=True, exist_ok=True)
@@ -187,15 +258,7 @@ def generate_word_from_markdown(
         if os.path.exists(docx_abs):
             with open(docx_abs, "rb") as f:
                 word_bytes = f.read()
-            res = upload_word_and_update_table(
-                uuid=uuid,
-                gen_id=gen_id,
-                word_content=word_bytes,
-                filename="proposal.docx",
-                generated_markdown=markdown,  
-            )
-            if res and "word_url" in res:
-                proposal_word_url = res["word_url"]
+            proposal_word_url = _upload_word(uuid, gen_id, word_bytes, markdown, key)
 
         try:
             if os.path.exists(docx_abs):
@@ -203,7 +266,7 @@ def generate_word_from_markdown(
         except Exception as e:
             logger.warning(f"Cleanup failed for {docx_abs}: {e}")
 
-        return {"proposal_word_url": proposal_word_url}
+        return {"proposal_word_url": proposal_word_url, "cache_hit": False}
 
     except Exception as e:
         logger.exception(f"generate_word_from_markdown failed for uuid={uuid}, gen_id={gen_id}")
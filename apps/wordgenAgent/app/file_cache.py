@@ -0,0 +1,176 @@
+"""
+OpenAI File Cache Module
+Persistent sha256 -> OpenAI file ID map for the PDFs sent to the Responses API.
+
+Every /initialgen used to upload both PDFs again, even when a user retried the same
+RFP or reused one company supporting document across bids. Uploads are now keyed by
+the sha256 of the PDF bytes in a local SQLite table, so identical content is
+uploaded once per TTL. Expiry slides forward on every hit; the sweeper deletes
+expired remote files and their rows.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+from apps.app.config import settings
+
+logger = logging.getLogger("openai_file_cache")
+
+# A hit must stay valid at least this long, so a running generation never sees its
+# file swept from under it
+IN_FLIGHT_GRACE_SECONDS = 15 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS openai_files (
+    file_id      TEXT PRIMARY KEY,
+    sha256       TEXT NOT NULL,
+    filename     TEXT,
+    size_bytes   INTEGER,
+    created_at   REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    expires_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS openai_files_sha256 ON openai_files (sha256, expires_at);
+"""
+
+
+class OpenAIFileCache:
+    """
+    SQLite-backed file ID cache. Each call opens its own short-lived connection, so
+    the cache is safe to use from request threads and the event loop alike.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = float(ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.bytes_skipped = 0
+        self._counter_lock = Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, sha256: str, size_bytes: int = 0) -> Optional[str]:
+        """Cached file ID for this content, or None; a hit extends the expiry"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT file_id FROM openai_files WHERE sha256 = ? AND expires_at > ? "
+                "ORDER BY last_used_at DESC LIMIT 1",
+                (sha256, now + IN_FLIGHT_GRACE_SECONDS),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE openai_files SET last_used_at = ?, expires_at = ? WHERE file_id = ?",
+                    (now, now + self.ttl_seconds, row[0]),
+                )
+        with self._counter_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_skipped += size_bytes
+        return row[0]
+
+    def put(self, sha256: str, file_id: str, filename: str, size_bytes: int) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            # Rows are keyed by file ID: when two requests upload the same content
+            # concurrently, both files are tracked and the unused one expires normally
+            conn.execute(
+                "INSERT OR REPLACE INTO openai_files "
+                "(sha256, file_id, filename, size_bytes, created_at, last_used_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, file_id, filename, size_bytes, now, now, now + self.ttl_seconds),
+            )
+
+    def expired(self) -> List[str]:
+        """File IDs of every entry past its expiry"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT file_id FROM openai_files WHERE expires_at <= ?",
+                (time.time(),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove(self, file_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM openai_files WHERE file_id = ?", (file_id,))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is a PDF upload skipped"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM openai_files").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "bytes_skipped": self.bytes_skipped,
+            "entries": entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+async def sweep_expired_files(cache: OpenAIFileCache, aclient) -> int:
+    """
+    Delete expired files from OpenAI and drop their rows. Files that are already gone
+    remotely are dropped too; other failures keep the row for the next sweep.
+    Returns the number of entries removed. SQLite calls run in worker threads.
+    """
+    from openai import NotFoundError
+
+    removed = 0
+    for file_id in await asyncio.to_thread(cache.expired):
+        try:
+            await aclient.files.delete(file_id)
+        except NotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to delete expired OpenAI file {file_id}: {e}")
+            continue
+        await asyncio.to_thread(cache.remove, file_id)
+        removed += 1
+    if removed:
+        logger.info(f"Swept {removed} expired OpenAI file(s)")
+    return removed
+
+
+# ============================================================================
+# GLOBAL CACHE INSTANCE
+# ============================================================================
+
+_cache: Optional[OpenAIFileCache] = None
+_cache_lock = Lock()
+
+
+def get_openai_file_cache() -> Optional[OpenAIFileCache]:
+    """Get the per-process file ID cache (None when OPENAI_FILE_CACHE_ENABLED is off)"""
+    global _cache
+    if not settings.OPENAI_FILE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OpenAIFileCache(
+                    settings.CACHE_DIR / "openai_files.sqlite3",
+                    settings.OPENAI_FILE_TTL_HOURS * 3600,
+                )
+    return _cache
@@ -0,0 +1,221 @@
+"""
+PDF Store Module
+Size-capped, streaming PDF fetches revalidated against a local content store.
+
+RFP and supporting PDFs were fetched with a bare requests.get(...).content: no
+connection reuse, no size limit, the whole body held in memory and copied again
+into the OpenAI upload. Bodies are now streamed in chunks straight into the store
+(hashing as they arrive), capped at PDF_MAX_BYTES, and revalidated with
+ETag/Last-Modified on the next fetch of the same cleaned URL, so repeated
+Supabase-hosted PDFs come back as a 304 and are served from disk.
+
+Layout under CACHE_DIR/pdf_store:
+    blobs/<sha256>.pdf   content-addressed PDF bodies
+    urls/<url key>.json  validators + sha256 of the last body seen for a URL
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional
+
+from apps.app.config import settings
+
+logger = logging.getLogger("pdf_store")
+
+CHUNK_SIZE = 256 * 1024
+# Blobs used this recently are never evicted (a request may be about to upload one)
+EVICT_MIN_AGE_SECONDS = 10 * 60
+
+
+class PdfTooLargeError(ValueError):
+    """Raised when a PDF exceeds PDF_MAX_BYTES."""
+
+
+@dataclass
+class FetchedPdf:
+    """A PDF body in the store, ready to be streamed into an upload"""
+    url: str
+    path: Path
+    sha256: str
+    size_bytes: int
+    revalidated: bool = False
+
+    def open(self):
+        return open(self.path, "rb")
+
+
+class PdfBlobWriter:
+    """Streams one response body into a temp file in the store, hashing and size-capping it"""
+
+    def __init__(self, store: 'PdfContentStore', url: str, content_length: Optional[str] = None):
+        self.store = store
+        self.url = url
+        self.max_bytes = store.max_pdf_bytes
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise PdfTooLargeError(
+                f"PDF is {int(content_length)} bytes, limit is {self.max_bytes}: {url}"
+            )
+        self._hash = hashlib.sha256()
+        self.size_bytes = 0
+        fd, tmp_name = tempfile.mkstemp(suffix=".part", dir=store.blob_dir)
+        self._tmp_path = Path(tmp_name)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size_bytes += len(chunk)
+        if self.size_bytes > self.max_bytes:
+            raise PdfTooLargeError(f"PDF exceeds {self.max_bytes} bytes: {self.url}")
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self, etag: Optional[str], last_modified: Optional[str]) -> FetchedPdf:
+        self._file.close()
+        sha256 = self._hash.hexdigest()
+        blob_path = self.store.blob_path(sha256)
+        if blob_path.exists():
+            self._tmp_path.unlink(missing_ok=True)
+            blob_path.touch()
+        else:
+            self._tmp_path.replace(blob_path)
+        self.store.save_validators(self.url, sha256, self.size_bytes, etag, last_modified)
+        self.store.evict()
+        return FetchedPdf(self.url, blob_path, sha256, self.size_bytes)
+
+    def abort(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            self._tmp_path.unlink(missing_ok=True)
+
+
+class PdfContentStore:
+    """On-disk PDF bodies keyed by content, plus per-URL revalidation metadata"""
+
+    def __init__(self, root: Path, max_pdf_bytes: int, max_store_bytes: int):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.url_dir = self.root / "urls"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.url_dir.mkdir(parents=True, exist_ok=True)
+        self.max_pdf_bytes = int(max_pdf_bytes)
+        self.max_store_bytes = int(max_store_bytes)
+        self._evict_lock = Lock()
+        self.revalidated = 0
+        self.downloaded = 0
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / f"{sha256}.pdf"
+
+    def _meta_path(self, url: str) -> Path:
+        return self.url_dir / f"{self._url_key(url)}.json"
+
+    def lookup(self, url: str) -> Optional[Dict[str, str]]:
+        """Stored validators for a URL whose body is still on disk, else None"""
+        try:
+            meta = json.loads(self._meta_path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not self.blob_path(meta.get("sha256", "")).is_file():
+            return None
+        return meta
+
+    def conditional_headers(self, meta: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def not_modified(self, url: str, meta: Dict[str, str]) -> FetchedPdf:
+        """Serve a 304 from the store"""
+        blob_path = self.blob_path(meta["sha256"])
+        blob_path.touch()
+        self.revalidated += 1
+        return FetchedPdf(url, blob_path, meta["sha256"], int(meta["size_bytes"]), revalidated=True)
+
+    def writer(self, url: str, content_length: Optional[str] = None) -> PdfBlobWriter:
+        self.downloaded += 1
+        return PdfBlobWriter(self, url, content_length)
+
+    def save_validators(
+        self,
+        url: str,
+        sha256: str,
+        size_bytes: int,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        meta = {
+            "url": url,
+            "sha256": sha256,
+            "size_bytes": size_bytes,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=self.url_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        Path(tmp_name).replace(self._meta_path(url))
+
+    def evict(self) -> None:
+        """Drop least recently used blobs until the store fits PDF_STORE_MAX_BYTES"""
+        with self._evict_lock:
+            blobs = []
+            for path in self.blob_dir.glob("*.pdf"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in blobs)
+            cutoff = time.time() - EVICT_MIN_AGE_SECONDS
+            for mtime, size, path in sorted(blobs):
+                if total <= self.max_store_bytes or mtime > cutoff:
+                    break
+                # URL metadata pointing at a missing blob is treated as a miss
+                path.unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted stored PDF {path.name}")
+
+    def stats(self) -> Dict[str, int]:
+        blobs = list(self.blob_dir.glob("*.pdf"))
+        return {
+            "downloaded": self.downloaded,
+            "revalidated": self.revalidated,
+            "blobs": len(blobs),
+            "bytes": sum(p.stat().st_size for p in blobs if p.exists()),
+        }
+
+
+# ============================================================================
+# GLOBAL STORE INSTANCE
+# ============================================================================
+
+_store: Optional[PdfContentStore] = None
+_store_lock = Lock()
+
+
+def get_pdf_store() -> PdfContentStore:
+    """Get the per-process PDF content store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PdfContentStore(
+                    settings.CACHE_DIR / "pdf_store",
+                    settings.PDF_MAX_BYTES,
+                    settings.PDF_STORE_MAX_BYTES,
+                )
+    return _store
@@ -0,0 +1,161 @@
+"""
+Stream Hub Module
+Resumable /initialgen streams: one background run per (uuid, gen_id), fanned out to
+SSE connections from a bounded replay buffer.
+
+The model run used to live inside the HTTP response, so a dropped client threw
+away the whole generation. Runs now execute as tasks owned by the hub. Every event
+gets an SSE `id:` (a per-run sequence number) and is kept in a ring buffer of
+STREAM_REPLAY_EVENTS; a reconnect with `Last-Event-ID` replays what it missed and
+then follows the live run. If the missed events already fell out of the ring, the
+client first receives one `checkpoint` event with the full markdown so far, then the
+buffered non-chunk events (stage, error, done) it would otherwise never see.
+Finished runs stay attachable for STREAM_RETENTION_SECONDS.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from apps.app.config import settings
+
+logger = logging.getLogger("stream_hub")
+
+RunKey = Tuple[str, str]
+EventSource = Callable[[], AsyncIterator[Tuple[str, Any]]]
+
+
+def sse_frame(seq: int, event: str, payload: Any) -> bytes:
+    """SSE frame with an id; payload is JSON-encoded like the unnumbered events"""
+    data = json.dumps(payload if payload is not None else "", ensure_ascii=False)
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Last-Event-ID header -> sequence number (None if absent or foreign)"""
+    try:
+        return int((value or "").strip())
+    except ValueError:
+        return None
+
+
+class GenerationRun:
+    """One proposal run: its event ring buffer and the markdown produced so far"""
+
+    def __init__(self, key: RunKey, max_events: int):
+        self.key = key
+        self.seq = 0
+        self.events: Deque[Tuple[int, str, bytes]] = deque(maxlen=max(1, max_events))
+        self.markdown_parts: List[str] = []
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: str, payload: Any) -> None:
+        async with self._changed:
+            self.seq += 1
+            if event == "chunk":
+                self.markdown_parts.append(payload)
+            self.events.append((self.seq, event, sse_frame(self.seq, event, payload)))
+            self._changed.notify_all()
+
+    async def finish(self) -> None:
+        async with self._changed:
+            self.finished = True
+            self._changed.notify_all()
+
+    def _frames_after(self, cursor: int) -> Tuple[List[bytes], int]:
+        """
+        Frames with id > cursor. If some were already evicted: a checkpoint snapshot
+        (id = current seq), then the buffered non-chunk frames without their ids, so
+        a reconnect resumes after the checkpoint instead of replaying chunks it holds.
+        """
+        if cursor >= self.seq or not self.events:
+            return [], cursor
+        oldest = self.events[0][0]
+        if cursor < oldest - 1:
+            snapshot = {"markdown": "".join(self.markdown_parts)}
+            frames = [sse_frame(self.seq, "checkpoint", snapshot)]
+            frames.extend(
+                frame[len(f"id: {seq}\n"):] for seq, event, frame in self.events if event != "chunk"
+            )
+            return frames, self.seq
+        return [frame for seq, _, frame in self.events if seq > cursor], self.seq
+
+    async def subscribe(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """Replay after last_event_id (from the start if None), then follow the run"""
+        cursor = last_event_id or 0
+        if cursor > self.seq:
+            # An id from an earlier run of this gen_id: resync from a snapshot
+            cursor = -1
+        while True:
+            async with self._changed:
+                frames, cursor = self._frames_after(cursor)
+                if not frames:
+                    if self.finished:
+                        return
+                    await self._changed.wait()
+                    continue
+            for frame in frames:
+                yield frame
+
+
+class GenerationStreamHub:
+    """Background proposal runs keyed by (uuid, gen_id); lives on the app's event loop"""
+
+    def __init__(self):
+        self._runs: Dict[RunKey, GenerationRun] = {}
+
+    def get(self, uuid: str, gen_id: str) -> Optional[GenerationRun]:
+        return self._runs.get((uuid, gen_id))
+
+    def start(self, uuid: str, gen_id: str, source: EventSource) -> GenerationRun:
+        """Start a run, or return the one still live for this (uuid, gen_id)"""
+        key = (uuid, gen_id)
+        run = self._runs.get(key)
+        if run is not None and not run.finished:
+            return run
+        run = GenerationRun(key, settings.STREAM_REPLAY_EVENTS)
+        self._runs[key] = run
+        run.task = asyncio.create_task(self._drive(run, source))
+        return run
+
+    async def _drive(self, run: GenerationRun, source: EventSource) -> None:
+        try:
+            async for event, payload in source():
+                await run.publish(event, payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Generation run {run.key} failed")
+            await run.publish("error", {"message": str(e)})
+        finally:
+            await run.finish()
+            asyncio.get_running_loop().call_later(
+                settings.STREAM_RETENTION_SECONDS, self._expire, run
+            )
+
+    def _expire(self, run: GenerationRun) -> None:
+        if self._runs.get(run.key) is run:
+            del self._runs[run.key]
+
+    async def shutdown(self) -> None:
+        """Cancel live runs (app shutdown); their last checkpoint stays in word_gen"""
+        runs, self._runs = list(self._runs.values()), {}
+        for run in runs:
+            if run.task is not None and not run.task.done():
+                run.task.cancel()
+        await asyncio.gather(*(r.task for r in runs if r.task is not None), return_exceptions=True)
+
+
+_hub: Optional[GenerationStreamHub] = None
+
+
+def get_stream_hub() -> GenerationStreamHub:
+    """Get the per-process stream hub (only used from the event loop)"""
+    global _hub
+    if _hub is None:
+        _hub = GenerationStreamHub()
+    return _hub
@@ -0,0 +1,163 @@
+"""
+Word Artifact Cache Module
+Remembers which build currently sits at each (uuid, gen_id) proposal.docx.
+
+The Word document for a generation always lives at the same storage path, so its
+public URL never changes; what changes is the content behind it. Every upload
+records a key over everything the build depends on (markdown, resolved
+doc_config, language) and the MD5 of the uploaded bytes. When a later build
+would produce the same key, the existing URL is returned without parsing,
+building, uploading or touching the word_gen row.
+
+Records live in SQLite under CACHE_DIR, shared by all workers on a host but not
+across hosts, so a record only counts once the caller confirms the object still
+holds those bytes (its storage eTag, see get()). A proposal.docx overwritten
+from another host is then a miss, not a stale URL.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from apps.app.config import settings
+from apps.wordgenAgent.app.wordcom import default_CONFIG, resolve_build_config
+
+logger = logging.getLogger("word_artifacts")
+
+# v2 added content_md5; v1 records cannot be verified and are dropped
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS word_artifacts_v2 (
+    uuid         TEXT NOT NULL,
+    gen_id       TEXT NOT NULL,
+    artifact_key TEXT NOT NULL,
+    word_url     TEXT NOT NULL,
+    content_md5  TEXT NOT NULL,
+    updated_at   REAL NOT NULL,
+    PRIMARY KEY (uuid, gen_id)
+)
+"""
+
+
+def artifact_key(markdown: str, doc_config: Optional[Dict[str, Any]], language: str) -> str:
+    """
+    Hash of a Word build's inputs. doc_config is normalized to the config the
+    builder actually applies, so equivalent configs (None vs {}, defaults spelled
+    out) share a key.
+    """
+    effective = doc_config if (doc_config and isinstance(doc_config, dict)) else default_CONFIG
+    cfg, rtl = resolve_build_config(effective, language)
+    digest = hashlib.sha256()
+    digest.update((markdown or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(cfg, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(f"{(language or '').lower()}|{rtl}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class WordArtifactCache:
+    """SQLite-backed map of (uuid, gen_id) -> key, URL and content MD5 of the last uploaded build"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._counter_lock = Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("DROP TABLE IF EXISTS word_artifacts")
+            conn.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(
+        self,
+        uuid: str,
+        gen_id: str,
+        key: str,
+        current_md5: Callable[[], Optional[str]],
+    ) -> Optional[str]:
+        """
+        URL of the current build if it was made from the same inputs, else None.
+        current_md5 returns the MD5 of what the stored object holds now (None if
+        unknown); it is only called for a matching record, and a mismatch drops it.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT word_url, content_md5 FROM word_artifacts_v2 "
+                "WHERE uuid = ? AND gen_id = ? AND artifact_key = ?",
+                (uuid, gen_id, key),
+            ).fetchone()
+        if row is not None and current_md5() != row[1]:
+            logger.info(f"Word artifact for uuid={uuid}, gen_id={gen_id} was replaced elsewhere; rebuilding")
+            self.invalidate(uuid, gen_id)
+            with self._counter_lock:
+                self.stale += 1
+            row = None
+        with self._counter_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def put(self, uuid: str, gen_id: str, key: str, word_url: str, content_md5: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO word_artifacts_v2 "
+                "(uuid, gen_id, artifact_key, word_url, content_md5, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (uuid, gen_id, key, word_url, content_md5, time.time()),
+            )
+
+    def invalidate(self, uuid: str, gen_id: str) -> None:
+        """Forget the current build before its path is overwritten"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM word_artifacts_v2 WHERE uuid = ? AND gen_id = ?", (uuid, gen_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is a Word build + upload skipped"""
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM word_artifacts_v2").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": entries,
+        }
+
+
+# ============================================================================
+# GLOBAL CACHE INSTANCE
+# ============================================================================
+
+_cache: Optional[WordArtifactCache] = None
+_cache_lock = Lock()
+
+
+def get_word_artifact_cache() -> Optional[WordArtifactCache]:
+    """Get the per-process artifact cache (None when WORD_ARTIFACT_CACHE_ENABLED is off)"""
+    global _cache
+    if not settings.WORD_ARTIFACT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WordArtifactCache(settings.CACHE_DIR / "word_artifacts.sqlite3")
+    return _cache
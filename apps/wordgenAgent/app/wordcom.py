@@ -1,6 +1,10 @@
 import os
+import re
 import json
+import hashlib
 import logging
+from io import BytesIO
+from xml.sax.saxutils import escape as _xml_escape
 from pathlib import Path
 from typing import Tuple, Optional, List
 
@@ -8,8 +12,9 @@ from docx import Document
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.section import WD_ORIENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsdecls, qn
 
 from apps.wordgenAgent.app.config_setting import build_updated_config
 
@@ -144,67 +149,6 @@ def _add_page_number_field(paragraph) -> None:
     r.append(OxmlElement('w:t'))
     r.append(fldChar_end)
 
-def _set_table_width_pct(table, pct: int) -> None:
-    """Set table width as percentage using oxml (w:tblW type='pct')."""
-    pct = max(1, min(100, int(pct or 100)))
-    tblPr = table._tbl.tblPr
-    tblW = tblPr.find(qn('w:tblW'))
-    if tblW is None:
-        tblW = OxmlElement('w:tblW')
-        tblPr.append(tblW)
-    tblW.set(qn('w:type'), 'pct')
-    tblW.set(qn('w:w'), str(pct * 50))
-
-def _set_table_borders(table, color_bgr: int, line_style: int, line_width: int, visible: bool) -> None:
-    """Apply borders to a table via oxml."""
-    tblPr = table._tbl.tblPr
-    borders = tblPr.find(qn('w:tblBorders'))
-    if borders is None:
-        borders = OxmlElement('w:tblBorders')
-        tblPr.append(borders)
-    
-    if not visible:
-        for side in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-            el = borders.find(qn(f"w:{side}"))
-            if el is None:
-                el = OxmlElement(f"w:{side}")
-                borders.append(el)
-            el.set(qn('w:val'), 'nil')
-        return
-
-    color_hex = _bgr_int_to_hex(color_bgr) or "000000"
-    style_map = {
-        1: "single",
-        2: "double",
-        3: "dashed",
-        4: "dotted",
-    }
-    val = style_map.get(line_style, "single")
-    size = str(max(4, min(24, int(line_width or 8)))) 
-
-    for side in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV']:
-        el = borders.find(qn(f"w:{side}"))
-        if el is None:
-            el = OxmlElement(f"w:{side}")
-            borders.append(el)
-        el.set(qn('w:val'), val)
-        el.set(qn('w:sz'), size)
-        el.set(qn('w:space'), "0")
-        el.set(qn('w:color'), color_hex)
-
-def _shade_cell(cell, fill_hex: Optional[str]) -> None:
-    if not fill_hex:
-        return
-    tcPr = cell._tc.get_or_add_tcPr()
-    shd = tcPr.find(qn('w:shd'))
-    if shd is None:
-        shd = OxmlElement('w:shd')
-        tcPr.append(shd)
-    shd.set(qn('w:val'), 'clear')
-    shd.set(qn('w:color'), 'auto')
-    shd.set(qn('w:fill'), fill_hex)
-
-
 def _para_format(paragraph, align, rtl: bool, space_before: int = 0, space_after: int = 6) -> None:
     paragraph.alignment = _map_align(align)
     paragraph.paragraph_format.space_before = Pt(space_before or 0)
@@ -232,54 +176,144 @@ def _add_para(doc, text, style=None, align=WD_ALIGN_LEFT, size=None, color=None,
     _para_format(p, align, rtl=rtl, space_before=0, space_after=6)
     return p
 
+# ============================================================================
+# BULK TABLE WRITER
+# ============================================================================
+
+_BORDER_STYLES = {1: "single", 2: "double", 3: "dashed", 4: "dotted"}
+_BORDER_SIDES = ("top", "left", "bottom", "right", "insideH", "insideV")
+# Characters lxml refuses in text nodes
+_XML_ILLEGAL = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _table_borders_xml(color_bgr: int, line_style: int, line_width: int, visible: bool) -> str:
+    """w:tblBorders for the configured border color, style (single/double/dashed/dotted) and width"""
+    if not visible:
+        sides = "".join(f'<w:{side} w:val="nil"/>' for side in _BORDER_SIDES)
+    else:
+        color_hex = _bgr_int_to_hex(color_bgr) or "000000"
+        val = _BORDER_STYLES.get(line_style, "single")
+        size = str(max(4, min(24, int(line_width or 8))))
+        sides = "".join(
+            f'<w:{side} w:val="{val}" w:sz="{size}" w:space="0" w:color="{color_hex}"/>'
+            for side in _BORDER_SIDES
+        )
+    return f"<w:tblBorders>{sides}</w:tblBorders>"
+
+
+def _shd_xml(fill_hex: Optional[str]) -> str:
+    return f'<w:shd w:val="clear" w:color="auto" w:fill="{fill_hex}"/>' if fill_hex else ""
+
+
+def _ensure_table_styles(doc, cfg, rtl: bool) -> Tuple[str, str]:
+    """
+    (table style id, paragraph style id) for the table look in cfg, created once
+    per document. The paragraph style carries font size/color, centering and
+    reading order; the table style carries body shading and, via its firstRow
+    conditional format, header shading.
+    """
+    header_fill = _bgr_int_to_hex(cfg.get("table_header_shading_color"))
+    body_fill = _bgr_int_to_hex(cfg.get("table_body_shading_color"))
+    font_size = cfg.get("table_font_size", 10)
+    font_rgb = _bgr_int_to_rgb_tuple(int(cfg.get("table_font_color", 0) or 0))
+    look = json.dumps([header_fill, body_fill, font_size, font_rgb, rtl], default=str)
+    suffix = hashlib.sha1(look.encode("utf-8")).hexdigest()[:8]
+    table_name, para_name = f"Proposal Table {suffix}", f"Proposal Table Text {suffix}"
+
+    styles = doc.styles
+    try:
+        return styles[table_name].style_id, styles[para_name].style_id
+    except KeyError:
+        pass
+
+    para_style = styles.add_style(para_name, WD_STYLE_TYPE.PARAGRAPH)
+    para_style.base_style = styles["Normal"]
+    para_style.font.size = Pt(font_size)
+    para_style.font.color.rgb = RGBColor(*font_rgb)
+    para_style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    pPr = para_style.element.get_or_add_pPr()
+    bidi = OxmlElement("w:bidi")
+    bidi.set(qn("w:val"), "1" if rtl else "0")
+    pPr.insert(0, bidi)
+
+    table_style = styles.add_style(table_name, WD_STYLE_TYPE.TABLE)
+    if body_fill:
+        table_style.element.append(parse_xml(f"<w:tcPr {nsdecls('w')}>{_shd_xml(body_fill)}</w:tcPr>"))
+    if header_fill:
+        table_style.element.append(parse_xml(
+            f'<w:tblStylePr {nsdecls("w")} w:type="firstRow"><w:tcPr>{_shd_xml(header_fill)}</w:tcPr></w:tblStylePr>'
+        ))
+    return table_style.style_id, para_style.style_id
+
+
+def _cell_xml(value, para_style_id: str) -> str:
+    """One w:tc; tabs/line breaks become w:tab/w:br like python-docx run text"""
+    text = _XML_ILLEGAL.sub("", str(value)) if value is not None else ""
+    runs = []
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            runs.append("<w:br/>")
+        for j, part in enumerate(line.split("\t")):
+            if j:
+                runs.append("<w:tab/>")
+            if part:
+                runs.append(f'<w:t xml:space="preserve">{_xml_escape(part)}</w:t>')
+    run = f"<w:r>{''.join(runs)}</w:r>" if runs else ""
+    return f'<w:tc><w:p><w:pPr><w:pStyle w:val="{para_style_id}"/></w:pPr>{run}</w:p></w:tc>'
+
+
 def _add_table(doc, headers, rows, cfg, rtl: bool):
-    """Create a table with headers/rows and apply width/borders/shading."""
+    """
+    Create a table with headers/rows, width, borders and shading in one pass: the
+    whole w:tbl is serialized and parsed once, and cells carry only a paragraph
+    style reference instead of per-cell shading and run fonts. Same shape as the
+    cell-by-cell writer: columns from the header (or first row), missing cells
+    left empty, extra cells dropped.
+    """
     headers = headers or []
     rows = rows or []
 
     n_rows = max(1, len(rows) + (1 if headers else 0))
     n_cols = max(1, len(headers) if headers else (len(rows[0]) if rows and rows[0] else 1))
-
-    table = doc.add_table(rows=n_rows, cols=n_cols)
-    table.autofit = bool(cfg.get("table_autofit", True))
-    _set_table_width_pct(table, cfg.get("table_preferred_width", 100))
-    _set_table_borders(
-        table=table,
+    table_style_id, para_style_id = _ensure_table_styles(doc, cfg, rtl)
+
+    section = doc.sections[-1]
+    block_width = section.page_width - section.left_margin - section.right_margin
+    col_twips = int(block_width / n_cols / 635)
+    pct = max(1, min(100, int(cfg.get("table_preferred_width", 100) or 100)))
+    layout = "" if bool(cfg.get("table_autofit", True)) else '<w:tblLayout w:type="fixed"/>'
+    borders = _table_borders_xml(
         color_bgr=int(cfg.get("table_border_color", 0) or 0),
         line_style=int(cfg.get("table_border_line_style", 1) or 1),
         line_width=int(cfg.get("table_border_line_width", 1) or 1),
         visible=bool(cfg.get("table_border_visible", True)),
     )
-    header_fill = _bgr_int_to_hex(cfg.get("table_header_shading_color"))
-    body_fill = _bgr_int_to_hex(cfg.get("table_body_shading_color"))
-    font_rgb = _bgr_int_to_rgb_tuple(int(cfg.get("table_font_color", 0) or 0))
-
-    r_idx = 0
-    if headers:
-        for c_idx in range(min(n_cols, len(headers))):
-            cell = table.cell(r_idx, c_idx)
-            cell.text = ""
-            p = cell.paragraphs[0]
-            run = p.add_run(str(headers[c_idx]))
-            run.font.size = Pt(cfg.get("table_font_size", 10))
-            run.font.color.rgb = RGBColor(*font_rgb)
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            _set_paragraph_bidi(p, rtl)
-            _shade_cell(cell, header_fill)
-        r_idx += 1
-
-    for r in rows[: n_rows - r_idx]:
-        for c_idx in range(min(n_cols, len(r))):
-            cell = table.cell(r_idx, c_idx)
-            cell.text = ""
-            p = cell.paragraphs[0]
-            run = p.add_run(str(r[c_idx]))
-            run.font.size = Pt(cfg.get("table_font_size", 10))
-            run.font.color.rgb = RGBColor(*font_rgb)
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            _set_paragraph_bidi(p, rtl)
-            _shade_cell(cell, body_fill)
-        r_idx += 1
+    first_row = "1" if headers else "0"
+
+    grid_rows = ([headers] if headers else []) + rows[: n_rows - (1 if headers else 0)]
+    empty_cell = _cell_xml("", para_style_id)
+    parts = [
+        f"<w:tbl {nsdecls('w')}><w:tblPr>",
+        f'<w:tblStyle w:val="{table_style_id}"/>',
+        f'<w:tblW w:type="pct" w:w="{pct * 50}"/>',
+        borders,
+        layout,
+        f'<w:tblLook w:val="04A0" w:firstRow="{first_row}" w:lastRow="0" '
+        f'w:firstColumn="0" w:lastColumn="0" w:noHBand="1" w:noVBand="1"/>',
+        "</w:tblPr><w:tblGrid>",
+        f'<w:gridCol w:w="{col_twips}"/>' * n_cols,
+        "</w:tblGrid>",
+    ]
+    for r_idx in range(n_rows):
+        row = grid_rows[r_idx] if r_idx < len(grid_rows) else []
+        cells = [_cell_xml(row[c], para_style_id) for c in range(min(n_cols, len(row)))]
+        cells.extend([empty_cell] * (n_cols - len(cells)))
+        parts.append(f"<w:tr>{''.join(cells)}</w:tr>")
+    parts.append("</w:tbl>")
+
+    tbl = parse_xml("".join(parts))
+    doc.element.body._insert_tbl(tbl)
+    return tbl
 
 
 def _apply_header_footer(doc: Document, cfg: dict, rtl: bool) -> None:
@@ -353,15 +387,8 @@ def _apply_header_footer(doc: Document, cfg: dict, rtl: bool) -> None:
         p.alignment = WD_ALIGN_PARAGRAPH.RIGHT
         _set_paragraph_bidi(p, rtl)
 
-def build_word_from_proposal(proposal_dict, user_config, output_path, language, visible=False):
-    """
-    Build a DOCX using python-docx. Language-aware (Arabic/English) formatting.
-    Renders 'points' as lines prefixed by '- ' (kept from your COM logic).
-    """
-    logger.info("word started to build ra bois")
-    if isinstance(proposal_dict, str):
-        proposal_dict = json.loads(proposal_dict)
-
+def resolve_build_config(user_config, language) -> Tuple[dict, bool]:
+    """Effective formatting config and RTL flag for a build."""
     cfg = build_updated_config(default_CONFIG, user_config)
 
     # --- NEW: Handle text_alignment override ---
@@ -390,28 +417,43 @@ def build_word_from_proposal(proposal_dict, user_config, output_path, language,
     lang = (language or "").lower()
     rtl = (lang == "arabic")
     cfg["reading_order"] = WD_READINGORDER_RTL if rtl else WD_READINGORDER_LTR
+    return cfg, rtl
 
-    title = (proposal_dict.get("title") or "").strip()
-    sections = proposal_dict.get("sections", [])
-    logger.info(f"Generating Word doc with title: {title} and {len(sections)} sections")
 
-    doc = Document()
-    _apply_header_footer(doc, cfg, rtl)
+class ProposalDocxBuilder:
+    """
+    Builds the proposal DOCX one section at a time, so sections can be appended
+    while the markdown is still being generated. The title may arrive at any
+    point; it is always placed at the top of the body.
+    """
 
-    # --- Title ---
-    if title:
-        _add_para(
-            doc, title,
+    def __init__(self, user_config, language):
+        self.cfg, self.rtl = resolve_build_config(user_config, language)
+        self.doc = Document()
+        _apply_header_footer(self.doc, self.cfg, self.rtl)
+        self.has_title = False
+        self.sections_added = 0
+
+    def set_title(self, title) -> None:
+        title = (title or "").strip()
+        if not title or self.has_title:
+            return
+        cfg = self.cfg
+        p = _add_para(
+            self.doc, title,
             style=cfg.get("title_style", "Title"),
             align=cfg.get("default_alignment", WD_ALIGN_LEFT),
             size=cfg.get("title_font_size", 16),
             color=cfg.get("title_font_color", 0),
             bold=True,
-            rtl=rtl
+            rtl=self.rtl
         )
+        # Title first, ahead of any section already appended
+        self.doc.element.body.insert(0, p._p)
+        self.has_title = True
 
-    # --- Sections ---
-    for sec in sections:
+    def add_section(self, sec) -> None:
+        cfg, rtl, doc = self.cfg, self.rtl, self.doc
         heading = (sec.get("heading") or "").strip()
         content = (sec.get("content") or "").strip()
         points = sec.get("points") or []
@@ -465,10 +507,42 @@ def build_word_from_proposal(proposal_dict, user_config, output_path, language,
         # Table
         if headers or rows:
             _add_table(doc, headers, rows, cfg, rtl=rtl)
+        self.sections_added += 1
+
+    def save(self, output_path) -> str:
+        abs_out = str(Path(output_path or default_CONFIG["output_path"]).resolve())
+        Path(abs_out).parent.mkdir(parents=True, exist_ok=True)
+        self.doc.save(abs_out)
+        logger.info(f"Document saved: {abs_out}")
+        return abs_out
+
+    def to_bytes(self) -> bytes:
+        out = BytesIO()
+        self.doc.save(out)
+        return out.getvalue()
+
+
+def build_word_from_proposal(proposal_dict, user_config, output_path, language, visible=False):
+    """
+    Build a DOCX using python-docx. Language-aware (Arabic/English) formatting.
+    Renders 'points' as lines prefixed by '- ' (kept from your COM logic).
+    """
+    logger.info("word started to build ra bois")
+    if isinstance(proposal_dict, str):
+        proposal_dict = json.loads(proposal_dict)
+
+    builder = ProposalDocxBuilder(user_config, language)
+
+    title = (proposal_dict.get("title") or "").strip()
+    sections = proposal_dict.get("sections", [])
+    logger.info(f"Generating Word doc with title: {title} and {len(sections)} sections")
+
+    # --- Title ---
+    builder.set_title(title)
+
+    # --- Sections ---
+    for sec in sections:
+        builder.add_section(sec)
 
     # --- Save the document ---
-    abs_out = str(Path(output_path or default_CONFIG["output_path"]).resolve())
-    Path(abs_out).parent.mkdir(parents=True, exist_ok=True)
-    doc.save(abs_out)
-    logger.info(f"Document saved: {abs_out}")
-    return abs_out
+    return builder.save(output_path)